@@ -46,35 +46,40 @@ def batch_download_from_file(file_path, delay=3):
     if not slskd:
         return
 
-    # Importa função de busca
+    # Importa função de busca e leitor de playlists
     try:
         from cli.main import smart_mp3_search
+        from playlist.playlist_file import PlaylistLineSource
     except ImportError:
         print("❌ Erro ao importar função de busca")
         return
 
     print(f"📖 Lendo arquivo: {file_path}")
 
-    # Lê o arquivo
+    # Lê o arquivo sob demanda (memória constante mesmo com 100k+ linhas)
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f.readlines() if line.strip()]
+        source = PlaylistLineSource(file_path)
+        if not source.has_lines():
+            print("❌ Arquivo vazio ou sem linhas válidas")
+            return
     except Exception as e:
         print(f"❌ Erro ao ler arquivo: {e}")
         return
 
-    if not lines:
-        print("❌ Arquivo vazio ou sem linhas válidas")
-        return
-
-    print(f"🎵 Encontradas {len(lines)} músicas para baixar")
+    print(f"🎵 Arquivo com {source.size / 1024:.0f} KB de músicas para baixar")
     print("=" * 60)
 
     successful_downloads = 0
     failed_downloads = 0
+    i = 0
+
+    for i, search_term in enumerate(source, 1):
+        # Pausa entre downloads
+        if i > 1:
+            print(f"   ⏸️ Pausa de {delay}s...")
+            time.sleep(delay)
 
-    for i, search_term in enumerate(lines, 1):
-        print(f"\n📍 [{i}/{len(lines)}] {search_term}")
+        print(f"\n📍 [{i}] ({source.progress:.0%} do arquivo) {search_term}")
 
         try:
             success = smart_mp3_search(slskd, search_term)
@@ -90,17 +95,12 @@ def batch_download_from_file(file_path, delay=3):
             failed_downloads += 1
             print(f"   ❌ Erro: {e}")
 
-        # Pausa entre downloads
-        if i < len(lines):
-            print(f"   ⏸️ Pausa de {delay}s...")
-            time.sleep(delay)
-
     # Relatório final
     print(f"\n{'='*60}")
     print(f"📊 RELATÓRIO FINAL - BATCH DOWNLOAD")
     print(f"✅ Downloads bem-sucedidos: {successful_downloads}")
     print(f"❌ Downloads com falha: {failed_downloads}")
-    print(f"📊 Total processado: {len(lines)}")
+    print(f"📊 Total processado: {i}")
 
     if successful_downloads > 0:
         print(f"\n💡 {successful_downloads} downloads foram iniciados!")
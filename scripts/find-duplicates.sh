@@ -0,0 +1,18 @@
+#!/bin/bash
+
+# Script para encontrar arquivos duplicados em /media/music por conteúdo
+# Gera dupes.txt (ou o arquivo informado) para o remove-dupes-safe.sh
+# Use --audio para comparar só o áudio (ignora tags e padding)
+
+echo "🔍 Procurando duplicatas em /media/music..."
+
+# Verificar se está no diretório correto
+if [ ! -f "src/playlist/find_duplicates.py" ]; then
+    echo "❌ Execute este script a partir do diretório raiz do projeto"
+    exit 1
+fi
+
+# Executar varredura
+python3 src/playlist/find_duplicates.py "$@"
+
+echo "✅ Varredura de duplicatas concluída"
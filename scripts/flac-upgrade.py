@@ -10,6 +10,8 @@ from dotenv import load_dotenv
 # Adiciona o diretório src ao path para importar módulos
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from utils.download_history import DownloadHistoryStore
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -32,16 +34,15 @@ def get_download_history_file():
         return possible_paths[0]  # Retorna o primeiro como padrão
 
 def load_download_history():
-    """Carrega o histórico de downloads do arquivo JSON"""
+    """Carrega o histórico de downloads (snapshot JSON + log de alterações)"""
     history_file = get_download_history_file()
     
-    if not os.path.exists(history_file):
+    if not os.path.exists(history_file) and not os.path.exists(f"{history_file}.log"):
         print(f"❌ Arquivo de histórico não encontrado: {history_file}")
         return {}
     
     try:
-        with open(history_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return DownloadHistoryStore(history_file).all()
     except Exception as e:
         print(f"⚠️ Erro ao carregar histórico: {e}")
         return {}
@@ -51,11 +52,7 @@ def save_download_history(history):
     history_file = get_download_history_file()
     
     try:
-        # Cria diretório se não existir
-        os.makedirs(os.path.dirname(history_file), exist_ok=True)
-        
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        DownloadHistoryStore(history_file).replace_all(history)
     except Exception as e:
         print(f"⚠️ Erro ao salvar histórico: {e}")
 
@@ -6,7 +6,7 @@ echo "🎵 Iniciando Playlist Processor..."
 # Navegar para o diretório da aplicação
 cd /app
 
-# Executar o playlist processor
-python3 src/playlist/main.py
+# Executar o playlist processor (ex.: --daemon para modo contínuo)
+python3 src/playlist/main.py "$@"
 
 echo "✅ Playlist Processor finalizado"
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import atexit
 import hashlib
 import json
 import os
@@ -7,11 +8,20 @@ import re
 import sys
 import time
 from datetime import datetime
-from difflib import SequenceMatcher
 
 import slskd_api
 from dotenv import load_dotenv
 
+# Adiciona o diretório src ao path para imports entre módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.download_history import DownloadHistoryStore
+from utils.result_selector import ResponseSelector, TopK
+from utils.search_query import canonicalize_query
+from utils.search_singleflight import get_search_flights
+from utils.text_similarity import NON_WORD_RE, QueryMatcher
+from utils.user_presence import get_presence_service
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -70,28 +80,46 @@ def get_download_history_file():
         return os.path.join(os.path.dirname(__file__), "download_history.json")
 
 
-def load_download_history():
-    """Carrega o histórico de downloads do arquivo JSON"""
+_history_stores = {}
+
+
+def get_download_history_store():
+    """Retorna o store indexado do histórico (um por arquivo, reutilizado)"""
     history_file = get_download_history_file()
 
-    if not os.path.exists(history_file):
-        return {}
+    store = _history_stores.get(history_file)
+    if store is None:
+        store = DownloadHistoryStore(history_file)
+        _history_stores[history_file] = store
+    return store
 
+
+def compact_download_history():
+    """Consolida o log de alterações no download_history.json"""
+    for store in _history_stores.values():
+        try:
+            store.compact()
+        except Exception as e:
+            print(f"⚠️ Erro ao compactar histórico: {e}")
+
+
+# Garante que o JSON esteja atualizado para scripts externos (flac-upgrade)
+atexit.register(compact_download_history)
+
+
+def load_download_history():
+    """Carrega o histórico de downloads (formato do JSON legado)"""
     try:
-        with open(history_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return get_download_history_store().all()
     except Exception as e:
         print(f"⚠️ Erro ao carregar histórico: {e}")
         return {}
 
 
 def save_download_history(history):
-    """Salva o histórico de downloads no arquivo JSON"""
-    history_file = get_download_history_file()
-
+    """Substitui o histórico completo (importa no formato JSON legado)"""
     try:
-        with open(history_file, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        get_download_history_store().replace_all(history)
     except Exception as e:
         print(f"⚠️ Erro ao salvar histórico: {e}")
 
@@ -99,7 +127,7 @@ def save_download_history(history):
 def normalize_search_term(search_term):
     """Normaliza termo de busca para comparação"""
     # Remove caracteres especiais e converte para minúsculas
-    normalized = re.sub(r"[^\w\s]", "", search_term.lower())
+    normalized = NON_WORD_RE.sub("", search_term.lower())
     # Remove espaços extras
     normalized = " ".join(normalized.split())
     return normalized
@@ -113,11 +141,10 @@ def generate_search_hash(search_term):
 
 def is_duplicate_download(search_term):
     """Verifica se já foi feito download desta música"""
-    history = load_download_history()
     search_hash = generate_search_hash(search_term)
+    entry = get_download_history_store().get(search_hash)
 
-    if search_hash in history:
-        entry = history[search_hash]
+    if entry is not None:
         print(f"🔄 Música já baixada anteriormente:")
         print(f"   📅 Data: {entry['date']}")
         print(f"   🎵 Busca: {entry['original_search']}")
@@ -128,12 +155,11 @@ def is_duplicate_download(search_term):
     return False
 
 
-def add_to_download_history(search_term, filename, username, file_size=0):
-    """Adiciona download ao histórico"""
-    history = load_download_history()
+def build_history_entry(search_term, filename, username, file_size=0):
+    """Monta entrada do histórico no formato do JSON legado"""
     search_hash = generate_search_hash(search_term)
 
-    entry = {
+    return search_hash, {
         "original_search": search_term,
         "normalized_search": normalize_search_term(search_term),
         "filename": filename,
@@ -143,12 +169,38 @@ def add_to_download_history(search_term, filename, username, file_size=0):
         "hash": search_hash,
     }
 
-    history[search_hash] = entry
-    save_download_history(history)
+
+def add_to_download_history(search_term, filename, username, file_size=0):
+    """Adiciona download ao histórico"""
+    search_hash, entry = build_history_entry(search_term, filename, username, file_size)
+
+    try:
+        get_download_history_store().put(search_hash, entry)
+    except Exception as e:
+        print(f"⚠️ Erro ao salvar histórico: {e}")
+        return
 
     print(f"📝 Adicionado ao histórico: {search_term}")
 
 
+def add_many_to_download_history(items):
+    """Adiciona vários downloads ao histórico com uma única escrita
+
+    items: lista de tuplas (search_term, filename, username, file_size)
+    """
+    entries = [build_history_entry(*item) for item in items]
+    if not entries:
+        return
+
+    try:
+        get_download_history_store().put_many(entries)
+    except Exception as e:
+        print(f"⚠️ Erro ao salvar histórico: {e}")
+        return
+
+    print(f"📝 Adicionados ao histórico: {len(entries)} entradas")
+
+
 def show_download_history(limit=10):
     """Mostra histórico de downloads recentes"""
     history = load_download_history()
@@ -183,11 +235,11 @@ def show_download_history(limit=10):
 
 def clear_download_history():
     """Limpa todo o histórico de downloads"""
-    history_file = get_download_history_file()
+    store = get_download_history_store()
 
     try:
-        if os.path.exists(history_file):
-            os.remove(history_file)
+        if any(os.path.exists(path) for path in (store.history_file, store.log_file)):
+            store.clear()
             print("🗑️ Histórico de downloads limpo com sucesso!")
         else:
             print("📝 Histórico já estava vazio")
@@ -197,12 +249,10 @@ def clear_download_history():
 
 def remove_from_history(search_term):
     """Remove entrada específica do histórico"""
-    history = load_download_history()
     search_hash = generate_search_hash(search_term)
+    removed_entry = get_download_history_store().delete(search_hash)
 
-    if search_hash in history:
-        removed_entry = history.pop(search_hash)
-        save_download_history(history)
+    if removed_entry is not None:
         print(f"🗑️ Removido do histórico: {removed_entry['original_search']}")
         return True
     else:
@@ -1024,12 +1074,15 @@ def create_search_variations(search_text):
             ]
         )
 
-    # Remove duplicatas e limita
+    # Remove duplicatas (mesma forma canônica = mesma busca no slskd) e limita
     seen = set()
     unique_variations = []
     for var in variations:
-        if var and var not in seen and len(var.strip()) > 0:
-            seen.add(var)
+        if not var or not var.strip():
+            continue
+        canonical = canonicalize_query(var)
+        if canonical not in seen:
+            seen.add(canonical)
             unique_variations.append(var)
 
     # Usa configuração do ambiente ou padrão
@@ -1037,40 +1090,30 @@ def create_search_variations(search_text):
     return unique_variations[:max_variations]
 
 
+AUDIOBOOK_EXTENSIONS = (".m4b", ".m4a", ".mp3", ".aac", ".flac")
+AUDIOBOOK_FORMAT_BONUS = {".m4b": 40, ".m4a": 30, ".mp3": 20, ".aac": 15, ".flac": 10}
+AUDIOBOOK_KEYWORDS = ("audiobook", "unabridged", "narrated", "read by")
+AUDIOBOOK_BAD_WORDS = ("sample", "preview", "demo", "excerpt", "chapter 1")
+MP3_BAD_WORDS = ("sample", "preview", "demo", "test", "snippet")
+
+
 def calculate_similarity(search_text, filename):
     """Calcula similaridade entre busca e nome do arquivo"""
-    search_normalized = re.sub(r"[^\w\s]", "", search_text.lower())
-    filename_normalized = re.sub(r"[^\w\s]", "", filename.lower())
-    similarity = SequenceMatcher(None, search_normalized, filename_normalized).ratio()
-    return similarity
+    return QueryMatcher(search_text).similarity(filename)
 
 
-def score_audiobook_file(file_info, search_text):
-    """Pontua arquivo de audiobook baseado em critérios de qualidade"""
-    filename = file_info.get("filename", "")
+def audiobook_file_bonus(file_info):
+    """Pontos de um audiobook além da similaridade (None se formato inválido)"""
+    filename_lower = file_info.get("filename", "").lower()
     size = file_info.get("size", 0)
-    
+
     # FILTRO OBRIGATÓRIO: Apenas formatos de audiobook
-    audiobook_extensions = [".m4b", ".m4a", ".mp3", ".aac", ".flac"]
-    if not any(filename.lower().endswith(ext) for ext in audiobook_extensions):
-        return 0
-    
-    # Pontução base por similaridade
-    similarity_score = calculate_similarity(search_text, filename) * 100
-    
-    # Bônus por formato preferido
-    format_bonus = 0
-    if filename.lower().endswith(".m4b"):
-        format_bonus = 40  # M4B é o melhor formato para audiobooks
-    elif filename.lower().endswith(".m4a"):
-        format_bonus = 30
-    elif filename.lower().endswith(".mp3"):
-        format_bonus = 20
-    elif filename.lower().endswith(".aac"):
-        format_bonus = 15
-    elif filename.lower().endswith(".flac"):
-        format_bonus = 10
-    
+    if not filename_lower.endswith(AUDIOBOOK_EXTENSIONS):
+        return None
+
+    # Bônus por formato preferido (M4B é o melhor formato para audiobooks)
+    format_bonus = AUDIOBOOK_FORMAT_BONUS[os.path.splitext(filename_lower)[1]]
+
     # Bônus por tamanho (audiobooks são grandes)
     size_bonus = 0
     if size > 100 * 1024 * 1024:  # > 100MB
@@ -1079,33 +1122,40 @@ def score_audiobook_file(file_info, search_text):
         size_bonus = 20
     elif size > 20 * 1024 * 1024:  # > 20MB
         size_bonus = 10
-    
+
     # Bônus por palavras-chave de audiobook
-    filename_lower = filename.lower()
-    audiobook_keywords = ["audiobook", "unabridged", "narrated", "read by"]
-    keyword_bonus = sum(15 for keyword in audiobook_keywords if keyword in filename_lower)
-    
+    keyword_bonus = sum(15 for keyword in AUDIOBOOK_KEYWORDS if keyword in filename_lower)
+
     # Penalidades
     penalty = 0
-    bad_words = ["sample", "preview", "demo", "excerpt", "chapter 1"]
-    if any(word in filename_lower for word in bad_words):
+    if any(word in filename_lower for word in AUDIOBOOK_BAD_WORDS):
         penalty = -30
-    
-    total_score = similarity_score + format_bonus + size_bonus + keyword_bonus + penalty
-    return max(0, total_score)
 
-def score_mp3_file(file_info, search_text):
-    """Pontua arquivo MP3 baseado em critérios de qualidade"""
-    filename = file_info.get("filename", "")
-    size = file_info.get("size", 0)
-    bitrate = file_info.get("bitRate", 0)
+    return format_bonus + size_bonus + keyword_bonus + penalty
 
-    # FILTRO OBRIGATÓRIO: Apenas MP3
-    if not filename.lower().endswith(".flac"):
+
+def score_audiobook_file(file_info, search_text, matcher=None):
+    """Pontua arquivo de audiobook baseado em critérios de qualidade"""
+    bonus = audiobook_file_bonus(file_info)
+    if bonus is None:
         return 0
 
-    # Pontuação base por similaridade
-    similarity_score = calculate_similarity(search_text, filename) * 100
+    # Pontução base por similaridade
+    matcher = matcher or QueryMatcher(search_text)
+    similarity_score = matcher.similarity(file_info.get("filename", "")) * 100
+
+    return max(0, similarity_score + bonus)
+
+
+def mp3_file_bonus(file_info):
+    """Pontos de um arquivo de música além da similaridade (None se não é FLAC)"""
+    filename_lower = file_info.get("filename", "").lower()
+    size = file_info.get("size", 0)
+    bitrate = file_info.get("bitRate", 0)
+
+    # FILTRO OBRIGATÓRIO: Apenas FLAC
+    if not filename_lower.endswith(".flac"):
+        return None
 
     # Bônus por qualidade de áudio
     quality_bonus = 0
@@ -1131,117 +1181,55 @@ def score_mp3_file(file_info, search_text):
 
     # Penalidades
     penalty = 0
-    filename_lower = filename.lower()
-    bad_words = ["sample", "preview", "demo", "test", "snippet"]
-    if any(word in filename_lower for word in bad_words):
+    if any(word in filename_lower for word in MP3_BAD_WORDS):
         penalty = -30
 
-    total_score = similarity_score + quality_bonus + size_bonus + penalty
-    return max(0, total_score)
+    return quality_bonus + size_bonus + penalty
 
 
-def find_best_audiobook(search_responses, search_text):
-    """Encontra o melhor arquivo de audiobook"""
-    best_file = None
-    best_score = 0
-    best_user = None
-
-    total_files = 0
-    audiobook_files = 0
-
-    for response in search_responses:
-        username = response.get("username", "")
-        files = response.get("files", [])
+def score_mp3_file(file_info, search_text, matcher=None):
+    """Pontua arquivo MP3 baseado em critérios de qualidade"""
+    bonus = mp3_file_bonus(file_info)
+    if bonus is None:
+        return 0
 
-        for file_info in files:
-            total_files += 1
-            filename = file_info.get("filename", "")
+    # Pontuação base por similaridade
+    matcher = matcher or QueryMatcher(search_text)
+    similarity_score = matcher.similarity(file_info.get("filename", "")) * 100
 
-            audiobook_extensions = [".m4b", ".m4a", ".mp3", ".aac", ".flac"]
-            if not any(filename.lower().endswith(ext) for ext in audiobook_extensions):
-                continue
+    return max(0, similarity_score + bonus)
 
-            audiobook_files += 1
-            score = score_audiobook_file(file_info, search_text)
 
-            if score > best_score:
-                best_score = score
-                best_file = file_info
-                best_user = username
+def find_best_audiobook(search_responses, search_text):
+    """Encontra o melhor arquivo de audiobook"""
+    selector = ResponseSelector(search_text, audiobook_file_bonus)
+    selector.add_responses(search_responses)
 
-    print(f"📊 Arquivos analisados: {total_files} | Audiobooks: {audiobook_files}")
+    print(
+        f"📊 Arquivos analisados: {selector.total_files} | Audiobooks: {selector.eligible_files}"
+    )
 
-    return best_file, best_user, best_score
+    return selector.best()
 
 def find_best_mp3(search_responses, search_text):
     """Encontra o melhor arquivo MP3"""
-    best_file = None
-    best_score = 0
-    best_user = None
-
-    total_files = 0
-    mp3_files = 0
-
-    for response in search_responses:
-        username = response.get("username", "")
-        files = response.get("files", [])
-
-        for file_info in files:
-            total_files += 1
-            filename = file_info.get("filename", "")
-
-            if not filename.lower().endswith(".flac"):
-                continue
-
-            mp3_files += 1
-            score = score_mp3_file(file_info, search_text)
-
-            if score > best_score:
-                best_score = score
-                best_file = file_info
-                best_user = username
+    selector = ResponseSelector(search_text, mp3_file_bonus)
+    selector.add_responses(search_responses)
 
-    print(f"📊 Arquivos analisados: {total_files} | MP3s: {mp3_files}")
+    print(f"📊 Arquivos analisados: {selector.total_files} | MP3s: {selector.eligible_files}")
 
-    return best_file, best_user, best_score
+    return selector.best()
 
 
 def check_user_online(slskd, username):
-    """Verifica se o usuário está online/conectado"""
-    try:
-        # Tenta fazer browse do usuário (mais confiável que status)
-        browse_result = slskd.users.browse(username)
-        
-        if browse_result and "directories" in browse_result:
-            print(f"✅ Usuário {username} está online")
-            return True
-        else:
-            print(f"❌ Usuário {username} não respondeu ao browse")
-            return False
-
-    except Exception as e:
-        print(f"⚠️ Erro ao verificar usuário {username}: {e}")
-        # Se não conseguir verificar, assume que pode tentar
-        print(f"🤔 Tentando download mesmo assim...")
+    """Verifica se o usuário está online/conectado (status com cache TTL)"""
+    # Em caso de erro na consulta, assume que pode tentar o download
+    if get_presence_service(slskd).is_online(username, default=True):
+        print(f"✅ Usuário {username} está online")
         return True
 
-
-def get_user_browse_info(slskd, username):
-    """Obtém informações de browse do usuário para verificar conectividade"""
-    try:
-        # Tenta fazer browse do usuário (mais confiável que status)
-        browse_result = slskd.users.browse(username)
-
-        if browse_result and "directories" in browse_result:
-            print(f"✅ Usuário {username} respondeu ao browse - está ativo")
-            return True
-        else:
-            print(f"❌ Usuário {username} não respondeu ao browse")
-            return False
-
-    except Exception as e:
-        print(f"⚠️ Browse falhou para {username}: {e}")
-        return False
+    print(f"❌ Usuário {username} está offline")
+    return False
 
 
 def download_audiobook(slskd, username, filename, file_size=0, search_term=None, custom_dir=None):
@@ -1249,15 +1237,11 @@ def download_audiobook(slskd, username, filename, file_size=0, search_term=None,
     try:
         print(f"🔍 Verificando conectividade do usuário {username}...")
 
-        # Primeira verificação: status do usuário
         user_online = check_user_online(slskd, username)
 
         if not user_online:
-            print(f"⚠️ Usuário parece offline, tentando browse para confirmar...")
-            browse_ok = get_user_browse_info(slskd, username)
-            if not browse_ok:
-                print(f"❌ Usuário {username} não está respondendo - pulando download")
-                return False
+            print(f"❌ Usuário {username} não está online - pulando download")
+            return False
 
         print(f"📥 Iniciando download de audiobook: {os.path.basename(filename)}")
         
@@ -1295,17 +1279,11 @@ def download_mp3(slskd, username, filename, file_size=0, search_term=None):
     try:
         print(f"🔍 Verificando conectividade do usuário {username}...")
 
-        # Primeira verificação: status do usuário
         user_online = check_user_online(slskd, username)
 
         if not user_online:
-            print(f"⚠️ Usuário parece offline, tentando browse para confirmar...")
-            # Segunda verificação: browse do usuário
-            browse_ok = get_user_browse_info(slskd, username)
-
-            if not browse_ok:
-                print(f"❌ Usuário {username} não está respondendo - pulando download")
-                return False
+            print(f"❌ Usuário {username} não está online - pulando download")
+            return False
 
         print(f"📥 Iniciando download de: {os.path.basename(filename)}")
 
@@ -1342,8 +1320,31 @@ def download_mp3(slskd, username, filename, file_size=0, search_term=None):
         return False
 
 
+def start_search(slskd, search_term):
+    """Inicia a busca no slskd e retorna o ID
+
+    Buscas idênticas em andamento (bot, CLI, playlists) são reaproveitadas:
+    o ID retornado pode ser compartilhado e deve ser liberado com
+    cleanup_search/cancel_search.
+    """
+    return get_search_flights().acquire(slskd, search_term)
+
+
 def wait_for_search_completion(slskd, search_id, max_wait=30, check_interval=2):
-    """Aguarda a busca finalizar completamente"""
+    """Aguarda a busca finalizar completamente
+
+    Consumidores da mesma busca compartilham a espera e as respostas.
+    """
+    return get_search_flights().shared(
+        slskd,
+        search_id,
+        "responses",
+        lambda: _poll_search_completion(slskd, search_id, max_wait, check_interval),
+    )
+
+
+def _poll_search_completion(slskd, search_id, max_wait, check_interval):
+    """Consulta as respostas até estabilizarem ou esgotar o tempo"""
     print(f"⏳ Aguardando finalização da busca (máx {max_wait}s)...")
 
     start_time = time.time()
@@ -1385,7 +1386,10 @@ def wait_for_search_completion(slskd, search_id, max_wait=30, check_interval=2):
 
 def find_alternative_users(search_responses, target_filename, original_user):
     """Encontra usuários alternativos que têm o mesmo arquivo"""
-    alternatives = []
+    # Mantém apenas as 3 alternativas mais similares
+    alternatives = TopK(3)
+    matcher = QueryMatcher(target_filename)
+    target_basename = os.path.basename(target_filename).lower()
 
     for response in search_responses:
         username = response.get("username", "")
@@ -1399,21 +1403,20 @@ def find_alternative_users(search_responses, target_filename, original_user):
             # Verifica se é o mesmo arquivo (nome similar)
             if (
                 filename.lower().endswith(".flac")
-                and os.path.basename(filename).lower()
-                == os.path.basename(target_filename).lower()
+                and os.path.basename(filename).lower() == target_basename
             ):
-
-                alternatives.append(
+                similarity = matcher.similarity(filename)
+                alternatives.push(
+                    similarity,
                     {
                         "username": username,
                         "file_info": file_info,
-                        "similarity": calculate_similarity(target_filename, filename),
-                    }
+                        "similarity": similarity,
+                    },
                 )
 
-    # Ordena por similaridade
-    alternatives.sort(key=lambda x: x["similarity"], reverse=True)
-    return alternatives[:3]  # Retorna até 3 alternativas
+    # Ordenadas por similaridade
+    return [alternative for _, alternative in alternatives.items()]
 
 
 def smart_download_with_fallback(
@@ -1554,7 +1557,38 @@ def improve_filename_with_tags(file_path):
 
 
 def cleanup_search(slskd, search_id):
-    """Remove busca finalizada para liberar recursos"""
+    """Remove busca finalizada para liberar recursos
+
+    Buscas compartilhadas só são removidas pelo último consumidor.
+    """
+    if not _release_search(slskd, search_id):
+        return
+    _delete_search(slskd, search_id)
+
+
+def cancel_search(slskd, search_id):
+    """Interrompe busca ainda em andamento e remove do slskd"""
+    if not _release_search(slskd, search_id):
+        return
+    try:
+        slskd.searches.stop(search_id)
+    except Exception as e:
+        print(f"⚠️ Erro ao interromper busca: {e}")
+    _delete_search(slskd, search_id)
+
+
+def _release_search(slskd, search_id):
+    """Libera a referência da busca. Retorna True se ela deve ser removida"""
+    flights = get_search_flights()
+    if flights.release(slskd, search_id):
+        return True
+    # Só avisa quando outra solicitação realmente compartilha a busca
+    if flights.held_elsewhere(slskd, search_id):
+        print(f"🔗 Busca {search_id} ainda em uso por outra solicitação")
+    return False
+
+
+def _delete_search(slskd, search_id):
     try:
         slskd.searches.delete(search_id)
         print(f"🧹 Busca {search_id} removida")
@@ -1562,6 +1596,93 @@ def cleanup_search(slskd, search_id):
         print(f"⚠️ Erro ao remover busca: {e}")
 
 
+def iter_parallel_search_results(
+    slskd, variations, query, parallelism, min_score, max_wait=30, check_interval=2
+):
+    """Executa variações de busca em paralelo e gera os resultados adequados
+
+    Mantém até `parallelism` buscas ativas no slskd e pontua as respostas
+    conforme chegam. Cada vez que uma variação produz um arquivo com score
+    acima de `min_score`, gera (search_term, search_responses, best_file,
+    best_user, best_score). Ao fechar o gerador, todas as buscas ainda
+    ativas são interrompidas e removidas via cleanup_search.
+    """
+    pending = list(variations)
+    active = []
+
+    try:
+        while pending or active:
+            # Completa o lote de buscas ativas
+            while pending and len(active) < parallelism:
+                search_term = pending.pop(0)
+                try:
+                    print(f"🔍 Buscando (paralelo): '{search_term}'")
+                    search_id = start_search(slskd, search_term)
+                    active.append(
+                        {
+                            "term": search_term,
+                            "id": search_id,
+                            "started": time.time(),
+                            "count": 0,
+                            "stable": 0,
+                        }
+                    )
+                except Exception as e:
+                    print(f"❌ Erro ao iniciar busca '{search_term}': {e}")
+
+            time.sleep(check_interval)
+
+            for search in list(active):
+                try:
+                    search_responses = slskd.searches.search_responses(search["id"])
+                except Exception as e:
+                    print(f"⚠️ Erro ao verificar busca '{search['term']}': {e}")
+                    search_responses = []
+
+                current_count = len(search_responses)
+                elapsed = time.time() - search["started"]
+
+                if current_count != search["count"]:
+                    search["count"] = current_count
+                    search["stable"] = 0
+
+                    # Pontua apenas quando chegam novas respostas
+                    best_file, best_user, best_score = find_best_mp3(
+                        search_responses, query
+                    )
+                    if best_file and best_score > min_score:
+                        print(
+                            f"🎯 '{search['term']}' encontrou arquivo adequado após {int(elapsed)}s"
+                        )
+                        active.remove(search)
+                        try:
+                            yield (
+                                search["term"],
+                                search_responses,
+                                best_file,
+                                best_user,
+                                best_score,
+                            )
+                        finally:
+                            cancel_search(slskd, search["id"])
+                        continue
+                else:
+                    search["stable"] += 1
+
+                # Busca estabilizada ou esgotada sem resultado adequado
+                finished = search["stable"] >= 3 and current_count > 0
+                if finished or elapsed >= max_wait:
+                    print(
+                        f"❌ '{search['term']}' finalizada sem MP3 adequado ({current_count} respostas)"
+                    )
+                    active.remove(search)
+                    cleanup_search(slskd, search["id"])
+    finally:
+        # Cancela buscas restantes (primeiro bom resultado já encontrado)
+        for search in active:
+            cancel_search(slskd, search["id"])
+
+
 def check_existing_download_in_queue(slskd, query):
     """Verifica se música já está na fila de download"""
     try:
@@ -1632,6 +1753,11 @@ def smart_mp3_search(slskd, query):
     variations = create_search_variations(query)
     print(f"📝 {len(variations)} variações criadas")
 
+    # Modo paralelo: dispara várias variações ao mesmo tempo
+    parallelism = int(os.getenv("PARALLEL_SEARCH_VARIATIONS", 1))
+    if parallelism > 1:
+        return smart_mp3_search_parallel(slskd, query, variations, parallelism)
+
     for i, search_term in enumerate(variations, 1):
         print(f"\n📍 Tentativa {i}/{len(variations)}: '{search_term}'")
         search_id = None
@@ -1639,8 +1765,7 @@ def smart_mp3_search(slskd, query):
         try:
             print(f"🔍 Buscando: '{search_term}'")
 
-            search_result = slskd.searches.search_text(search_term)
-            search_id = search_result.get("id")
+            search_id = start_search(slskd, search_term)
 
             # Aguarda a busca finalizar completamente
             search_responses = wait_for_search_completion(
@@ -1695,6 +1820,42 @@ def smart_mp3_search(slskd, query):
     return False
 
 
+def smart_mp3_search_parallel(slskd, query, variations, parallelism):
+    """Busca MP3 disparando variações em paralelo (primeiro bom resultado vence)"""
+    min_score = int(os.getenv("MIN_MP3_SCORE", 15))
+    max_wait = int(os.getenv("SEARCH_WAIT_TIME", 25))
+
+    print(f"⚡ Modo paralelo: até {parallelism} variações simultâneas")
+
+    results = iter_parallel_search_results(
+        slskd, variations, query, parallelism, min_score, max_wait=max_wait
+    )
+
+    try:
+        for search_term, search_responses, best_file, best_user, best_score in results:
+            print(f"\n🎵 Melhor MP3 (score: {best_score:.1f}) via '{search_term}':")
+            print(f"   👤 Usuário: {best_user}")
+            print(f"   📄 Arquivo: {best_file.get('filename')}")
+            print(f"   💾 Tamanho: {best_file.get('size', 0) / 1024 / 1024:.2f} MB")
+            print(f"   🎧 Bitrate: {best_file.get('bitRate', 0)} kbps")
+
+            success = smart_download_with_fallback(
+                slskd, search_responses, best_file, best_user, query
+            )
+
+            if success:
+                print(f"✅ Sucesso com '{search_term}' - cancelando demais buscas!")
+                return True
+
+            print(f"❌ Falha no download - aguardando outras variações")
+    except Exception as e:
+        print(f"❌ Erro na busca paralela: {e}")
+    finally:
+        results.close()
+
+    return False
+
+
 def smart_album_search(slskd, query):
     """Busca inteligente por álbum com múltiplas variações"""
     print(f"💿 Busca inteligente por ÁLBUM: '{query}'")
@@ -1723,8 +1884,7 @@ def smart_album_search(slskd, query):
         try:
             print(f"🔍 Buscando álbum: '{search_term}'")
 
-            search_result = slskd.searches.search_text(search_term)
-            search_id = search_result.get("id")
+            search_id = start_search(slskd, search_term)
 
             # Aguarda a busca finalizar
             search_responses = wait_for_search_completion(
@@ -1874,62 +2034,130 @@ def find_album_candidates(search_responses, query):
     return good_candidates
 
 
-def download_album_tracks(slskd, album_info, search_term):
-    """Baixa todas as faixas de um álbum"""
+def enqueue_files_batch(slskd, username, files):
+    """Enfileira vários arquivos do mesmo usuário em uma única requisição
+
+    Retorna lista de (file_info, sucesso, erro) na ordem de `files`.
+    """
+    file_dicts = [
+        {"filename": f.get("filename", ""), "size": f.get("size", 0)} for f in files
+    ]
+
+    try:
+        if slskd.transfers.enqueue(username, file_dicts):
+            return [(f, True, None) for f in files]
+        batch_error = "enqueue recusado"
+    except Exception as e:
+        batch_error = str(e)
+
+    # Lote recusado: o slskd pode ter aceitado parte dele antes do erro.
+    # Arquivos que já estão na fila contam como enfileirados; o resto é
+    # tentado arquivo a arquivo para saber quais falharam
+    print(f"⚠️ Enfileiramento em lote falhou ({batch_error}), tentando por arquivo...")
+    queued = _queued_filenames(slskd, username)
+    results = []
+    for file_info, file_dict in zip(files, file_dicts):
+        if file_dict["filename"] in queued:
+            results.append((file_info, True, None))
+            continue
+        try:
+            ok = slskd.transfers.enqueue(username, [file_dict])
+            results.append((file_info, bool(ok), None if ok else "enqueue recusado"))
+        except Exception as e:
+            results.append((file_info, False, str(e)))
+
+    return results
+
+
+def _queued_filenames(slskd, username):
+    """Arquivos do usuário já na fila de downloads (não finalizados)"""
+    queued = set()
+    try:
+        transfers = slskd.transfers.get_downloads(username) or {}
+        for directory in transfers.get("directories", []):
+            for file_info in directory.get("files", []):
+                if not file_info.get("state", "").startswith("Completed"):
+                    queued.add(file_info.get("filename", ""))
+    except Exception as e:
+        # Sem a fila, tenta todos os arquivos de novo
+        print(f"⚠️ Erro ao consultar fila de {username}: {e}")
+        return set()
+    return queued
+
+
+def enqueue_album_tracks(slskd, album_info, search_term, record_album=False):
+    """Enfileira todas as faixas de um álbum com uma verificação do usuário
+
+    Retorna dict com contagem de sucessos/falhas e o resultado por arquivo.
+    """
     username = album_info["username"]
     files = album_info["files"]
 
-    print(f"\n📥 Iniciando download de {len(files)} faixas do álbum...")
+    print(f"\n📥 Enfileirando {len(files)} faixas do álbum de {username}...")
 
-    successful_downloads = 0
-    failed_downloads = 0
+    if not check_user_online(slskd, username):
+        print(f"❌ Usuário {username} não está online - pulando álbum")
+        results = [(f, False, "usuário offline") for f in files]
+    else:
+        results = enqueue_files_batch(slskd, username, files)
 
-    for i, file_info in enumerate(files, 1):
+    history_items = []
+    report = []
+    for i, (file_info, success, error) in enumerate(results, 1):
         filename = file_info.get("filename", "")
         file_size = file_info.get("size", 0)
 
-        print(f"\n📍 [{i}/{len(files)}] {os.path.basename(filename)}")
-        print(f"   💾 Tamanho: {file_size / 1024 / 1024:.2f} MB")
-        print(f"   🎧 Bitrate: {file_info.get('bitRate', 0)} kbps")
-
-        # Tenta fazer o download
-        success = download_mp3(
-            slskd,
-            username,
-            filename,
-            file_size,
-            f"{search_term} - {os.path.basename(filename)}",
+        print(f"📍 [{i}/{len(files)}] {os.path.basename(filename)}")
+        print(
+            f"   💾 {file_size / 1024 / 1024:.2f} MB | 🎧 {file_info.get('bitRate', 0)} kbps"
         )
 
         if success:
-            successful_downloads += 1
-            print(f"   ✅ Download iniciado com sucesso")
+            print(f"   ✅ Download enfileirado")
+            track_term = f"{search_term} - {os.path.basename(filename)}"
+            history_items.append((track_term, filename, username, file_size))
         else:
-            failed_downloads += 1
-            print(f"   ❌ Falha no download")
+            print(f"   ❌ Falha: {error}")
+
+        report.append({"filename": filename, "success": success, "error": error})
+
+    successful = sum(1 for r in report if r["success"])
+    failed = len(report) - successful
+
+    # Registra o álbum se pelo menos metade das faixas foi enfileirada
+    album_recorded = record_album and successful >= len(files) // 2
+    if album_recorded:
+        history_items.append(
+            (
+                search_term,
+                f"Álbum: {album_info['directory']}",
+                username,
+                album_info["total_size"],
+            )
+        )
+
+    add_many_to_download_history(history_items)
+
+    return {
+        "successful": successful,
+        "failed": failed,
+        "results": report,
+        "album_recorded": album_recorded,
+    }
 
-        # Pausa entre downloads
-        if i < len(files):
-            time.sleep(1)
+
+def download_album_tracks(slskd, album_info, search_term):
+    """Baixa todas as faixas de um álbum"""
+    result = enqueue_album_tracks(slskd, album_info, search_term, record_album=True)
 
     # Relatório final
     print(f"\n{'='*50}")
     print(f"📊 RELATÓRIO FINAL - Álbum")
-    print(f"✅ Downloads bem-sucedidos: {successful_downloads}")
-    print(f"❌ Falhas: {failed_downloads}")
-    print(f"📊 Total de faixas: {len(files)}")
-
-    # Adiciona ao histórico se pelo menos metade foi baixada com sucesso
-    if successful_downloads >= len(files) // 2:
-        add_to_download_history(
-            search_term,
-            f"Álbum: {album_info['directory']}",
-            username,
-            album_info["total_size"],
-        )
-        return True
+    print(f"✅ Downloads bem-sucedidos: {result['successful']}")
+    print(f"❌ Falhas: {result['failed']}")
+    print(f"📊 Total de faixas: {len(album_info['files'])}")
 
-    return False
+    return result["album_recorded"]
 
 
 def list_audiobook_options(slskd, query, limit=10):
@@ -1938,68 +2166,48 @@ def list_audiobook_options(slskd, query, limit=10):
     
     variations = create_audiobook_search_variations(query)
     print(f"📝 Variações criadas: {variations}")
-    all_options = []
+
+    # Um único heap para todas as buscas: melhores opções por usuário + arquivo
+    selector = ResponseSelector(
+        query,
+        audiobook_file_bonus,
+        limit=limit,
+        min_score=10,  # Score mínimo reduzido
+        key=lambda option: f"{option['username']}:{os.path.basename(option['filename'])}",
+    )
     
     # Executa todas as buscas e acumula resultados
     for i, search_term in enumerate(variations, 1):
+        search_id = None
         try:
             print(f"🔍 Busca {i}/{len(variations)}: '{search_term}'")
-            search_result = slskd.searches.search_text(search_term)
-            search_id = search_result.get("id")
+            search_id = start_search(slskd, search_term)
             
             search_responses = wait_for_search_completion(
                 slskd, search_id, max_wait=15
             )
             
             if search_responses:
-                total_files = sum(len(response.get("files", [])) for response in search_responses)
-                print(f"📊 Arquivos encontrados: {total_files}")
-                
-                # Coleta todos os audiobooks encontrados
-                found_in_this_search = 0
-                for response in search_responses:
-                    username = response.get("username", "")
-                    files = response.get("files", [])
-                    
-                    for file_info in files:
-                        filename = file_info.get("filename", "")
-                        audiobook_extensions = [".m4b", ".m4a", ".mp3", ".aac", ".flac"]
-                        
-                        if any(filename.lower().endswith(ext) for ext in audiobook_extensions):
-                            score = score_audiobook_file(file_info, query)
-                            
-                            if score > 10:  # Score mínimo reduzido
-                                all_options.append({
-                                    'filename': filename,
-                                    'username': username,
-                                    'size': file_info.get('size', 0),
-                                    'score': score,
-                                    'file_info': file_info
-                                })
-                                found_in_this_search += 1
-                
-                print(f"✅ Audiobooks válidos nesta busca: {found_in_this_search}")
+                total_before = selector.total_files
+                eligible_before = selector.eligible_files
+                selector.add_responses(search_responses)
+
+                print(f"📊 Arquivos encontrados: {selector.total_files - total_before}")
+                print(f"✅ Audiobooks nesta busca: {selector.eligible_files - eligible_before}")
             else:
                 print(f"❌ Nenhuma resposta para '{search_term}'")
         
         except Exception as e:
             print(f"⚠️ Erro na busca '{search_term}': {e}")
             continue  # Continua para próxima busca mesmo com erro
+        finally:
+            # Libera a busca (e a referência compartilhada) mesmo com erro
+            if search_id:
+                cleanup_search(slskd, search_id)
     
-    print(f"📋 Total de opções coletadas de todas as buscas: {len(all_options)}")
-    
-    # Remove duplicatas e ordena por score
-    unique_options = {}
-    for option in all_options:
-        key = f"{option['username']}:{os.path.basename(option['filename'])}"
-        if key not in unique_options or option['score'] > unique_options[key]['score']:
-            unique_options[key] = option
-    
-    # Ordena por score e limita a 10 melhores
-    sorted_options = sorted(unique_options.values(), key=lambda x: x['score'], reverse=True)
-    final_options = sorted_options[:10]  # Sempre limita a 10
+    print(f"📋 Total de audiobooks analisados em todas as buscas: {selector.eligible_files}")
     
-    print(f"✅ Opções únicas após filtro: {len(sorted_options)}")
+    final_options = selector.results()
     print(f"📋 Apresentando os {len(final_options)} melhores audiobooks encontrados")
     
     # Mostra os resultados finais
@@ -2046,8 +2254,7 @@ def smart_audiobook_search(slskd, query, custom_dir=None):
         try:
             print(f"🔍 Buscando audiobook: '{search_term}'")
             
-            search_result = slskd.searches.search_text(search_term)
-            search_id = search_result.get("id")
+            search_id = start_search(slskd, search_term)
             
             search_responses = wait_for_search_completion(
                 slskd, search_id, max_wait=int(os.getenv("SEARCH_WAIT_TIME", 30))
@@ -2111,11 +2318,11 @@ def smart_mp3_search_force(slskd, query):
         print(f"\n📍 Tentativa {i}/{len(variations)}: '{search_term}'")
 
         # Executa a busca e verifica quantos arquivos encontrou
+        search_id = None
         try:
             print(f"🔍 Buscando: '{search_term}'")
 
-            search_result = slskd.searches.search_text(search_term)
-            search_id = search_result.get("id")
+            search_id = start_search(slskd, search_term)
 
             # Aguarda a busca finalizar completamente
             search_responses = wait_for_search_completion(
@@ -2159,7 +2366,6 @@ def smart_mp3_search_force(slskd, query):
                     success = smart_download_with_fallback(
                         slskd, search_responses, best_file, best_user, query
                     )
-                    cleanup_search(slskd, search_id)
                     if success:
                         print(
                             f"✅ Sucesso com '{search_term}' ({total_files} arquivos)!"
@@ -2203,10 +2409,10 @@ def smart_mp3_search_force(slskd, query):
 
         except Exception as e:
             print(f"❌ Erro na busca: {e}")
-            try:
+        finally:
+            # Libera a busca em todos os caminhos (sucesso, falha ou sem respostas)
+            if search_id:
                 cleanup_search(slskd, search_id)
-            except:
-                pass
 
         # Pausa maior entre buscas para evitar sobrecarga
         if i < len(variations):
@@ -11,20 +11,44 @@ __author__ = "Solia Assistant"
 # Importar classes implementadas
 from .database_manager import DatabaseManager
 from .duplicate_detector import DuplicateDetector
+from .file_hasher import FileHasher
+from .file_index import FileIndex
 from .file_organizer import FileOrganizer
+from .batch_organizer import BatchOrganizer
 from .process_lock import ProcessLock
 from .rate_limiter import RateLimiter
+from .memory_cache import LRUMemoryCache
+from .negative_cache import NegativeCache
 from .cache_manager import CacheManager
 from .slskd_api_client import SlskdApiClient
+from .download_monitor import DownloadMonitor
+from .search_watcher import SearchCompletionWatcher
+from .line_pipeline import LinePipeline, PeerLimiter
+from .playlist_file import PlaylistLineSource, RemainingLinesWriter
+from .playlist_journal import PlaylistJournal
+from .playlist_watcher import PlaylistWatcher
 from .playlist_processor import PlaylistProcessor
 
 __all__ = [
     "DatabaseManager",
     "DuplicateDetector",
+    "FileHasher",
+    "FileIndex",
     "FileOrganizer", 
+    "BatchOrganizer",
     "ProcessLock",
     "RateLimiter",
+    "LRUMemoryCache",
+    "NegativeCache",
     "CacheManager",
     "SlskdApiClient",
+    "DownloadMonitor",
+    "SearchCompletionWatcher",
+    "LinePipeline",
+    "PeerLimiter",
+    "PlaylistLineSource",
+    "RemainingLinesWriter",
+    "PlaylistJournal",
+    "PlaylistWatcher",
     "PlaylistProcessor"
 ]
@@ -0,0 +1,202 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .file_index import FileIndex
+
+logger = logging.getLogger(__name__)
+
+
+def move_file(source: str, destination: str) -> str:
+    """Move arquivo com os.rename quando origem e destino estão no mesmo
+    sistema de arquivos (operação atômica, sem copiar dados); senão copia
+    com shutil.move. Retorna o método usado ("rename" ou "copy")."""
+    if os.stat(source).st_dev == os.stat(os.path.dirname(destination)).st_dev:
+        os.rename(source, destination)
+        return "rename"
+    shutil.move(source, destination)
+    return "copy"
+
+
+class BatchOrganizer:
+    """Organiza vários downloads em ARTISTA/ALBUM de uma vez.
+
+    Primeiro planeja todas as movimentações. Downloads com local registrado
+    na base (library_path/size/mtime) são conferidos só com um stat: se o
+    arquivo está lá, intacto e no destino certo, a linha é pulada; se está em
+    outro lugar da biblioteca, ele é a origem da movimentação, sem busca.
+    Sem registro válido, um destino já existente pula a linha e os demais
+    arquivos são localizados no FileIndex. Tudo é agrupado por pasta de
+    destino; depois cada pasta é criada uma única vez e as movimentações
+    rodam em um pool de threads limitado (ORGANIZE_WORKERS). Com db_manager,
+    os locais finais são gravados na base ao término.
+    """
+
+    def __init__(
+        self,
+        source_index: FileIndex,
+        music_path: str,
+        sanitize_name: Callable[[str], str],
+        max_workers: int = None,
+        refresh_index: bool = True,
+        db_manager=None,
+    ):
+        self.source_index = source_index
+        self.music_path = music_path
+        self.sanitize_name = sanitize_name
+        self.max_workers = max_workers or int(os.getenv("ORGANIZE_WORKERS", 4))
+        self.refresh_index = refresh_index
+        self.db_manager = db_manager
+
+    def target_path(self, filename: str, artist: str, album: str) -> Path:
+        file_name = os.path.basename(filename.replace("\\", "/"))
+        return (
+            Path(self.music_path)
+            / self.sanitize_name(artist)
+            / self.sanitize_name(album)
+            / file_name
+        )
+
+    def plan(
+        self,
+        downloads: List[Dict],
+        parse_file_line: Callable[[str], Tuple[str, str, str]],
+    ) -> Dict:
+        """Planeja movimentações. Retorna grupos por pasta e contadores"""
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        planned_sources = set()
+        # destino -> IDs dos registros que devem apontar para ele
+        planned_targets: Dict[str, List[str]] = {}
+        result = {
+            "groups": groups,
+            "in_place": 0,
+            "missing": [],
+            "invalid": [],
+            "targets": planned_targets,
+            "locations": [],
+        }
+
+        for download in downloads:
+            filename = download.get("filename", "")
+            file_line = download.get("file_line", "")
+            artist, album, _ = parse_file_line(file_line) if file_line else ("", "", "")
+
+            if not filename or not artist or not album:
+                result["invalid"].append(download)
+                continue
+
+            target = str(self.target_path(filename, artist, album))
+            recorded = recorded_location(download)
+            if recorded == target:
+                # Caminho rápido: registro confere com o disco (um stat)
+                result["in_place"] += 1
+                continue
+
+            if target in planned_targets:
+                planned_targets[target].append(download.get("id"))
+                result["in_place"] += 1
+                continue
+            if os.path.isfile(target):
+                # Já organizado, mas sem registro (ou registro desatualizado)
+                result["locations"].append((download.get("id"), target))
+                result["in_place"] += 1
+                continue
+
+            source = recorded or self.source_index.find(filename, refresh=self.refresh_index)
+            if not source:
+                result["missing"].append(download)
+                continue
+            if source in planned_sources:
+                # Mesmo arquivo em outra linha da base
+                result["in_place"] += 1
+                continue
+
+            planned_sources.add(source)
+            planned_targets[target] = [download.get("id")]
+            groups.setdefault(os.path.dirname(target), []).append((source, target))
+
+        return result
+
+    def execute(self, plan: Dict) -> Dict[str, int]:
+        """Cria as pastas, executa as movimentações planejadas e grava os locais"""
+        stats = {"moved": 0, "renamed": 0, "failed": 0}
+        moves: List[Tuple[str, str]] = []
+        locations = list(plan.get("locations", []))
+
+        for directory, group in plan["groups"].items():
+            try:
+                os.makedirs(directory, exist_ok=True)
+                moves.extend(group)
+            except OSError as e:
+                print(f"❌ Erro ao criar pasta {directory}: {e}")
+                stats["failed"] += len(group)
+
+        if moves:
+            with ThreadPoolExecutor(
+                max_workers=max(1, self.max_workers), thread_name_prefix="organize"
+            ) as executor:
+                for (_, destination), method in zip(
+                    moves, executor.map(lambda move: self._move(*move), moves)
+                ):
+                    if method is None:
+                        stats["failed"] += 1
+                        continue
+                    stats["moved"] += 1
+                    if method == "rename":
+                        stats["renamed"] += 1
+                    for download_id in plan.get("targets", {}).get(destination, []):
+                        locations.append((download_id, destination))
+
+        self._record_locations(locations)
+        return stats
+
+    def _move(self, source: str, destination: str) -> Optional[str]:
+        try:
+            method = move_file(source, destination)
+        except Exception as e:
+            print(f"❌ Erro ao mover {source}: {e}")
+            return None
+
+        self.source_index.move(source, destination)
+        logger.info(f"Arquivo movido: {source} -> {destination}")
+        return method
+
+    def _record_locations(self, locations: List[Tuple[str, str]]):
+        """Grava caminho, tamanho e mtime finais em uma única transação"""
+        if self.db_manager is None:
+            return
+        records = []
+        for download_id, path in locations:
+            if not download_id:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            records.append((download_id, path, stat.st_size, stat.st_mtime))
+        try:
+            self.db_manager.set_library_locations(records)
+        except Exception as e:
+            print(f"⚠️ Erro ao registrar locais na base: {e}")
+
+
+def recorded_location(download: Dict) -> Optional[str]:
+    """Local registrado do download se o arquivo ainda está lá, intacto.
+
+    Confere apenas com um stat: tamanho e mtime iguais aos gravados
+    (os.rename preserva ambos). Retorna None se não há registro ou se o
+    arquivo sumiu ou mudou.
+    """
+    path = download.get("library_path")
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if stat.st_size != download.get("library_size") or stat.st_mtime != download.get("library_mtime"):
+        return None
+    return path
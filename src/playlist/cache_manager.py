@@ -1,34 +1,138 @@
 import hashlib
 import os
+import threading
+import time
 from typing import List, Dict, Optional
 from datetime import datetime
 
+from .memory_cache import LRUMemoryCache
+from .negative_cache import NegativeCache
+from .result_codec import prune_results
+
+try:
+    from ..utils.search_query import canonicalize_query
+except ImportError:
+    # Executado como pacote de topo (src/ no sys.path)
+    from utils.search_query import canonicalize_query
+
 class CacheManager:
-    def __init__(self, db_manager):
+    """Cache de buscas em duas camadas: LRU em memória na frente do SQLite"""
+    
+    def __init__(self, db_manager, fields: Optional[List[str]] = None):
         self.db_manager = db_manager
+        # Campos mantidos nos resultados cacheados (None = todos)
+        self.fields = fields
         self.ttl_hours = int(os.getenv('CACHE_TTL_HOURS', 12))
         self.auto_cleanup = os.getenv('AUTO_CLEANUP_CACHE', 'true').lower() == 'true'
         
+        # Camada 1: resultados já decodificados, limitados por bytes
+        self.memory = LRUMemoryCache(
+            max_bytes=int(os.getenv('CACHE_MEMORY_MAX_MB', 32)) * 1024 * 1024
+        )
+        
+        # Limpeza de expirados em segundo plano (fora do caminho das consultas)
+        self.sweep_interval = float(os.getenv('CACHE_SWEEP_INTERVAL_SECONDS', 300))
+        self._sweep_thread: Optional[threading.Thread] = None
+        self._sweep_stop = threading.Event()
+        self._sweep_lock = threading.Lock()
+        
+        # Buscas sem resultado: evita repetir a busca até o TTL vencer
+        self.negative = NegativeCache(db_manager)
+        
+        # Limites do SQLite: evicção das entradas menos valiosas
+        self.max_entries = int(os.getenv('CACHE_MAX_ENTRIES', 5000))
+        self.max_bytes = int(os.getenv('CACHE_MAX_MB', 256)) * 1024 * 1024
+        self.hit_bonus_seconds = float(os.getenv('CACHE_HIT_BONUS_SECONDS', 3600))
+        
+        # Uso por query_hash acumulado em memória e gravado em lote
+        self._access_lock = threading.Lock()
+        self._pending_access: Dict[str, tuple] = {}
+        self._pending_hits = 0
+        self._pending_misses = 0
+        
+        self.db_hits = 0
+        self.db_misses = 0
+        self.evictions = 0
+        self.sweeps = 0
+        self.swept_entries = 0
+        
     def get_query_hash(self, query: str) -> str:
-        """Gera hash SHA256 da query"""
-        return hashlib.sha256(query.encode('utf-8')).hexdigest()
+        """Gera hash SHA256 da forma canônica da query
+        
+        Variações equivalentes (caixa, espaços, aspas, ordem dos termos,
+        curingas e exclusões) compartilham a mesma entrada do cache.
+        """
+        return hashlib.sha256(canonicalize_query(query).encode('utf-8')).hexdigest()
     
     def get_cached_results(self, query: str) -> Optional[List[Dict]]:
-        """Busca resultados no cache"""
+        """Busca resultados no cache (memória, depois SQLite)"""
         query_hash = self.get_query_hash(query)
         
         # Cleanup automático se habilitado
         if self.auto_cleanup:
-            self.cleanup_expired()
-            
-        return self.db_manager.get_cached_search(query_hash)
+            self.start_sweeper()
+        
+        results = self.memory.get(query_hash)
+        if results is not None:
+            self._record_access(query_hash)
+            return list(results)
+        
+        entry = self.db_manager.get_cached_search_entry(query_hash)
+        if entry is None:
+            self.db_misses += 1
+            self._record_access(None)
+            return None
+        
+        self.db_hits += 1
+        self._record_access(query_hash)
+        self.memory.put(
+            query_hash, entry['results'], entry['size'], entry['expires_at'].timestamp()
+        )
+        return list(entry['results'])
     
     def save_results(self, query: str, results: List[Dict], ttl_hours: int = None):
         """Salva resultados no cache"""
         query_hash = self.get_query_hash(query)
         ttl = ttl_hours or self.ttl_hours
         
-        self.db_manager.save_search_cache(query_hash, query, results, ttl)
+        results = prune_results(results, self.fields)
+        size = self.db_manager.save_search_cache(
+            query_hash, query, results, ttl, fields=self.fields
+        )
+        self.memory.put(query_hash, list(results), size, time.time() + ttl * 3600)
+        self.enforce_limits()
+    
+    def _record_access(self, query_hash: Optional[str]):
+        """Registra hit (query_hash) ou miss (None) para gravação em lote"""
+        with self._access_lock:
+            if query_hash is None:
+                self._pending_misses += 1
+                return
+            hits, _ = self._pending_access.get(query_hash, (0, 0))
+            self._pending_access[query_hash] = (hits + 1, time.time())
+            self._pending_hits += 1
+    
+    def flush_access_stats(self):
+        """Grava no banco os hits/misses e últimos acessos acumulados"""
+        with self._access_lock:
+            accesses = self._pending_access
+            hits, misses = self._pending_hits, self._pending_misses
+            self._pending_access = {}
+            self._pending_hits = self._pending_misses = 0
+        
+        if accesses or hits or misses:
+            self.db_manager.record_cache_access(accesses, hits, misses)
+    
+    def enforce_limits(self):
+        """Remove do SQLite as entradas menos valiosas acima dos limites"""
+        # Último acesso/hits atualizados antes de decidir o que sai
+        self.flush_access_stats()
+        evicted = self.db_manager.evict_search_cache(
+            self.max_entries, self.max_bytes, self.hit_bonus_seconds
+        )
+        for query_hash in evicted:
+            self.memory.invalidate(query_hash)
+        self.evictions += len(evicted)
     
     def is_cache_valid(self, cached_entry: Dict) -> bool:
         """Verifica se entrada do cache é válida"""
@@ -47,21 +151,71 @@ class CacheManager:
     
     def cleanup_expired(self):
         """Remove cache expirado"""
-        self.db_manager.cleanup_expired_cache()
+        self.memory.sweep()
+        self.flush_access_stats()
+        removed = self.db_manager.cleanup_expired_cache()
+        if self.negative.enabled:
+            self.db_manager.cleanup_negative_cache(self.negative.max_ttl)
+        self.sweeps += 1
+        self.swept_entries += removed or 0
+    
+    def start_sweeper(self):
+        """Inicia (uma vez) a thread que remove expirados periodicamente"""
+        if self._sweep_thread is not None:
+            return
+        with self._sweep_lock:
+            if self._sweep_thread is None:
+                self._sweep_stop.clear()
+                self._sweep_thread = threading.Thread(
+                    target=self._sweep_loop, name="cache-sweeper", daemon=True
+                )
+                self._sweep_thread.start()
+    
+    def stop_sweeper(self):
+        """Interrompe a thread de limpeza"""
+        self._sweep_stop.set()
+        thread = self._sweep_thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._sweep_thread = None
+        self.flush_access_stats()
+    
+    def _sweep_loop(self):
+        while not self._sweep_stop.is_set():
+            try:
+                self.cleanup_expired()
+            except Exception as e:
+                print(f"⚠️ Erro na limpeza do cache: {e}")
+            self._sweep_stop.wait(self.sweep_interval)
     
     def get_cache_stats(self) -> Dict[str, int]:
         """Estatísticas do cache"""
         stats = self.db_manager.get_stats()
+        memory = self.memory.stats()
+        lookups = memory['hits'] + self.db_hits + self.db_misses
+        hits = memory['hits'] + self.db_hits
         return {
             'total_entries': stats.get('cache_entries', 0),
             'ttl_hours': self.ttl_hours,
-            'auto_cleanup': self.auto_cleanup
+            'auto_cleanup': self.auto_cleanup,
+            'memory_entries': memory['entries'],
+            'memory_bytes': memory['bytes'],
+            'memory_hits': memory['hits'],
+            'memory_evictions': memory['evictions'],
+            'db_hits': self.db_hits,
+            'misses': self.db_misses,
+            'evictions': self.evictions,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hit_ratio': round(hits / lookups, 3) if lookups else 0.0,
+            'sweeps': self.sweeps,
+            'swept_entries': self.swept_entries,
         }
     
     def clear_cache(self):
         """Limpa todo o cache"""
-        import sqlite3
-        with sqlite3.connect(self.db_manager.db_path) as conn:
+        self.memory.clear()
+        with self.db_manager.get_connection() as conn:
             conn.execute("DELETE FROM search_cache")
             
     def search_with_cache(self, query: str, search_function) -> List[Dict]:
@@ -72,12 +226,26 @@ class CacheManager:
             print(f"Cache hit para query: {query[:50]}...")
             return cached_results
         
+        # Falha recente: não vale repetir a busca ainda
+        canonical = canonicalize_query(query)
+        if self.negative.is_negative(canonical):
+            print(f"Cache negativo para query: {query[:50]}...")
+            return []
+        
         # Cache miss - executar busca real
         print(f"Cache miss para query: {query[:50]}...")
         results = search_function(query)
         
+        # Mesmo formato em hit e miss: apenas os campos cacheados
+        results = prune_results(results, self.fields)
+        
         # Salvar no cache
         if results:
             self.save_results(query, results)
+            self.negative.clear(canonical)
+        else:
+            ttl = self.negative.record_miss(canonical)
+            if ttl:
+                print(f"Sem resultados - nova busca em {ttl / 60:.0f} min: {query[:50]}...")
             
         return results
@@ -1,20 +1,112 @@
 import sqlite3
-import json
 import hashlib
+import math
 import os
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Sequence
+
+from .result_codec import decode_results_sized, encode_results_sized
+
+
+def connect_database(db_path: str) -> sqlite3.Connection:
+    """Abre conexão SQLite com WAL e pragmas ajustados para acesso concorrente"""
+    busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 30000))
+
+    conn = sqlite3.connect(
+        db_path,
+        timeout=busy_timeout_ms / 1000,
+        cached_statements=int(os.getenv('SQLITE_CACHED_STATEMENTS', 256)),
+        check_same_thread=False,
+    )
+
+    # WAL permite leitores simultâneos a um escritor (bot, processor e métricas)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_SIZE_KB', 16384))}")
+    conn.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class _ConnectionHolder:
+    """Guarda a conexão da thread (alvo do finalizador que a fecha)"""
+
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _close_connection(conn: sqlite3.Connection, connections: List[sqlite3.Connection],
+                      lock: threading.Lock):
+    with lock:
+        if conn in connections:
+            connections.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def text_trigrams(text: str) -> List[str]:
+    """Lista de trigramas (com repetição) do texto em minúsculas"""
+    text = text.lower()
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
 
 class DatabaseManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_database()
     
+    def get_connection(self) -> sqlite3.Connection:
+        """Retorna conexão de longa duração da thread atual (criada sob demanda)
+        
+        A conexão fica em um objeto local da thread; quando a thread termina
+        (ex.: workers do pipeline de cada playlist) o objeto é descartado e
+        o finalizador fecha a conexão, sem acumular arquivos abertos.
+        """
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            conn = connect_database(self.db_path)
+            holder = _ConnectionHolder(conn)
+            with self._connections_lock:
+                self._connections.append(conn)
+            weakref.finalize(
+                holder, _close_connection, conn, self._connections, self._connections_lock
+            )
+            self._local.holder = holder
+        return holder.conn
+    
+    def release_connection(self):
+        """Fecha já a conexão da thread atual (a próxima chamada abre outra)"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            del self._local.holder
+            _close_connection(holder.conn, self._connections, self._connections_lock)
+    
+    def close(self):
+        """Fecha todas as conexões abertas pelo pool"""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = []
+        self._local = threading.local()
+    
     def _init_database(self):
         """Inicializa banco SQLite com tabelas necessárias"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             conn.executescript("""
                 -- Tabela principal de downloads
                 CREATE TABLE IF NOT EXISTS downloads (
@@ -27,28 +119,191 @@ class DatabaseManager:
                     file_size INTEGER,
                     file_hash TEXT,
                     requested_at DATETIME,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    library_path TEXT,
+                    library_size INTEGER,
+                    library_mtime REAL,
+                    file_fingerprint TEXT,
+                    audio_hash TEXT
                 );
                 
                 -- Cache de buscas
                 CREATE TABLE IF NOT EXISTS search_cache (
                     query_hash TEXT PRIMARY KEY,
                     query_text TEXT,
-                    results TEXT,
+                    results BLOB,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    expires_at DATETIME
+                    expires_at DATETIME,
+                    size_bytes INTEGER DEFAULT 0,
+                    hit_count INTEGER DEFAULT 0,
+                    last_access REAL
                 );
                 
+                -- Cache negativo: buscas/linhas sem resultado (TTL crescente)
+                CREATE TABLE IF NOT EXISTS negative_cache (
+                    key_hash TEXT PRIMARY KEY,
+                    key_text TEXT,
+                    miss_count INTEGER NOT NULL DEFAULT 1,
+                    expires_at REAL NOT NULL,
+                    last_miss REAL
+                );
+                
+                -- Contadores acumulados do cache (hits, misses, evictions)
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                );
+                
+                -- Diário de progresso dos arquivos de playlist em processamento
+                CREATE TABLE IF NOT EXISTS playlist_journal (
+                    file_path TEXT NOT NULL,
+                    file_line TEXT NOT NULL,
+                    success INTEGER NOT NULL,
+                    completed_at REAL NOT NULL,
+                    PRIMARY KEY (file_path, file_line)
+                ) WITHOUT ROWID;
+                
                 -- Índices para performance
                 CREATE INDEX IF NOT EXISTS idx_filename_normalized ON downloads(filename_normalized);
                 CREATE INDEX IF NOT EXISTS idx_file_line ON downloads(file_line);
                 CREATE INDEX IF NOT EXISTS idx_status ON downloads(status);
                 CREATE INDEX IF NOT EXISTS idx_cache_expires ON search_cache(expires_at);
+                
+                -- Índice de trigramas para fuzzy match de file_line
+                CREATE TABLE IF NOT EXISTS song_index (
+                    download_id TEXT PRIMARY KEY,
+                    file_line TEXT NOT NULL,
+                    line_length INTEGER NOT NULL
+                );
+                
+                CREATE TABLE IF NOT EXISTS song_trigrams (
+                    trigram TEXT NOT NULL,
+                    download_id TEXT NOT NULL,
+                    PRIMARY KEY (trigram, download_id)
+                ) WITHOUT ROWID;
+                
+                CREATE INDEX IF NOT EXISTS idx_song_index_length ON song_index(line_length);
+                CREATE INDEX IF NOT EXISTS idx_song_trigrams_download ON song_trigrams(download_id);
             """)
+            
+            self._migrate_downloads(conn)
+            self._migrate_search_cache(conn)
+            self._backfill_song_index(conn)
+    
+    def _migrate_downloads(self, conn: sqlite3.Connection):
+        """Adiciona colunas de localização e hashes de conteúdo em bancos antigos"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(downloads)")}
+        for column, definition in (
+            ('library_path', 'TEXT'),
+            ('library_size', 'INTEGER'),
+            ('library_mtime', 'REAL'),
+            ('file_fingerprint', 'TEXT'),
+            ('audio_hash', 'TEXT'),
+        ):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE downloads ADD COLUMN {column} {definition}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_fingerprint ON downloads(file_fingerprint)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON downloads(file_hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_audio_hash ON downloads(audio_hash)")
+    
+    def _migrate_search_cache(self, conn: sqlite3.Connection):
+        """Adiciona colunas de uso do cache em bancos criados antes delas"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(search_cache)")}
+        for column, definition in (
+            ('size_bytes', 'INTEGER DEFAULT 0'),
+            ('hit_count', 'INTEGER DEFAULT 0'),
+            ('last_access', 'REAL'),
+        ):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE search_cache ADD COLUMN {column} {definition}")
+        
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON search_cache(last_access)")
+    
+    def _backfill_song_index(self, conn: sqlite3.Connection):
+        """Indexa downloads SUCCESS gravados antes da existência do índice"""
+        cursor = conn.execute("""
+            SELECT id, file_line FROM downloads
+            WHERE status = 'SUCCESS'
+              AND id NOT IN (SELECT download_id FROM song_index)
+        """)
+        
+        for download_id, file_line in cursor.fetchall():
+            self._index_song(conn, download_id, file_line)
+    
+    def _index_song(self, conn: sqlite3.Connection, download_id: str, file_line: str):
+        """Adiciona (ou reindexa) file_line no índice de trigramas"""
+        self._unindex_song(conn, download_id)
+        
+        line = (file_line or '').lower()
+        conn.execute(
+            "INSERT INTO song_index (download_id, file_line, line_length) VALUES (?, ?, ?)",
+            (download_id, file_line or '', len(line))
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO song_trigrams (trigram, download_id) VALUES (?, ?)",
+            [(trigram, download_id) for trigram in set(text_trigrams(line))]
+        )
+    
+    def _unindex_song(self, conn: sqlite3.Connection, download_id: str):
+        conn.execute("DELETE FROM song_trigrams WHERE download_id = ?", (download_id,))
+        conn.execute("DELETE FROM song_index WHERE download_id = ?", (download_id,))
+    
+    def find_song_candidates(self, text: str, threshold: float) -> List[str]:
+        """Retorna file_lines que podem ter similaridade >= threshold com text
+        
+        Usa filtro de tamanho e de contagem de trigramas: com ratio >= threshold
+        o número de trigramas em comum tem um limite inferior, então nenhuma
+        linha descartada aqui poderia passar no SequenceMatcher.
+        """
+        text = text.lower()
+        len_a = len(text)
+        if len_a == 0 or threshold <= 0:
+            return [row[0] for row in self.get_connection().execute(
+                "SELECT file_line FROM song_index"
+            )]
+        
+        min_len = math.ceil(len_a * threshold / (2 - threshold) - 1e-9)
+        max_len = math.floor(len_a * (2 - threshold) / threshold + 1e-9)
+        
+        grams = text_trigrams(text)
+        distinct_grams = set(grams)
+        repeated = len(grams) - len(distinct_grams)
+        
+        def required_shared(len_b: int) -> int:
+            # Cada caractere não casado destrói até 3 trigramas de text e cada
+            # quebra de bloco causada por caractere extra em file_line até 2
+            matched = math.ceil(threshold * (len_a + len_b) / 2 - 1e-9)
+            unmatched_a = max(0, len_a - matched)
+            unmatched_b = max(0, len_b - matched)
+            return len(grams) - 3 * unmatched_a - 2 * unmatched_b - repeated
+        
+        with self.get_connection() as conn:
+            if required_shared(min_len) <= 0:
+                # Texto curto demais para o filtro de trigramas: só tamanho
+                cursor = conn.execute(
+                    "SELECT file_line FROM song_index WHERE line_length BETWEEN ? AND ?",
+                    (min_len, max_len)
+                )
+                return [row[0] for row in cursor.fetchall()]
+            
+            placeholders = ','.join('?' * len(distinct_grams))
+            cursor = conn.execute(f"""
+                SELECT s.file_line, s.line_length, COUNT(*) AS shared
+                FROM song_trigrams t
+                JOIN song_index s ON s.download_id = t.download_id
+                WHERE t.trigram IN ({placeholders})
+                  AND s.line_length BETWEEN ? AND ?
+                GROUP BY t.download_id
+            """, (*distinct_grams, min_len, max_len))
+            
+            return [
+                file_line for file_line, line_length, shared in cursor.fetchall()
+                if shared >= required_shared(line_length)
+            ]
     
     def is_downloaded(self, file_line: str) -> bool:
         """Verificação básica por file_line"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM downloads WHERE file_line = ? AND status = 'SUCCESS'",
                 (file_line,)
@@ -57,16 +312,32 @@ class DatabaseManager:
     
     def is_failed_download(self, file_line: str) -> bool:
         """Verifica se já tentou baixar e falhou (NOT_FOUND ou ERROR)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM downloads WHERE file_line = ? AND status IN ('NOT_FOUND', 'ERROR')",
                 (file_line,)
             )
             return cursor.fetchone() is not None
     
+    def get_last_failure(self, file_line: str) -> Optional[tuple]:
+        """(número de falhas, momento da última em epoch) da linha ou None"""
+        with self.get_connection() as conn:
+            count, last = conn.execute(
+                "SELECT COUNT(*), MAX(created_at) FROM downloads "
+                "WHERE file_line = ? AND status IN ('NOT_FOUND', 'ERROR')",
+                (file_line,)
+            ).fetchone()
+        if not count:
+            return None
+        try:
+            failed_at = datetime.fromisoformat(last).timestamp()
+        except (TypeError, ValueError):
+            failed_at = time.time()  # Data ilegível: conta como falha recente
+        return count, failed_at
+    
     def is_duplicate_normalized(self, filename_norm: str) -> bool:
         """Verificação por filename normalizado"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM downloads WHERE filename_normalized = ? AND status = 'SUCCESS'",
                 (filename_norm,)
@@ -78,23 +349,37 @@ class DatabaseManager:
         if not file_hash:
             return False
             
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM downloads WHERE file_hash = ? AND status = 'SUCCESS'",
                 (file_hash,)
             )
             return cursor.fetchone() is not None
     
-    def save_download(self, data: Dict[str, Any], status: str):
-        """Salva registro de download"""
-        with sqlite3.connect(self.db_path) as conn:
+    def is_duplicate_audio_hash(self, audio_hash: str) -> bool:
+        """Verificação por hash do áudio (ignora tags e padding)"""
+        if not audio_hash:
+            return False
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT 1 FROM downloads WHERE audio_hash = ? AND status = 'SUCCESS' LIMIT 1",
+                (audio_hash,)
+            )
+            return cursor.fetchone() is not None
+    
+    def save_download(self, data: Dict[str, Any], status: str) -> str:
+        """Salva registro de download. Retorna o ID do registro"""
+        download_id = data.get('id') or self._generate_id()
+        
+        with self.get_connection() as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO downloads 
                 (id, username, filename, filename_normalized, file_line, status, 
-                 file_size, file_hash, requested_at, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 file_size, file_hash, requested_at, created_at,
+                 library_path, library_size, library_mtime, file_fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                data.get('id', self._generate_id()),
+                download_id,
                 data.get('username', ''),
                 data.get('filename', ''),
                 data.get('filename_normalized', ''),
@@ -103,12 +388,124 @@ class DatabaseManager:
                 data.get('file_size', 0),
                 data.get('file_hash', ''),
                 data.get('requested_at', datetime.now().isoformat()),
-                datetime.now().isoformat()
+                datetime.now().isoformat(),
+                data.get('library_path'),
+                data.get('library_size'),
+                data.get('library_mtime'),
+                data.get('file_fingerprint'),
             ))
+            
+            # Mantém índice de trigramas incremental (apenas SUCCESS)
+            if status == 'SUCCESS':
+                self._index_song(conn, download_id, data.get('file_line', ''))
+            else:
+                self._unindex_song(conn, download_id)
+        
+        return download_id
+    
+    def set_library_locations(self, locations: Sequence[tuple]):
+        """Grava onde os arquivos ficaram na biblioteca.
+        
+        locations: (download_id, caminho, tamanho, mtime) por registro.
+        """
+        if not locations:
+            return
+        with self.get_connection() as conn:
+            conn.executemany("""
+                UPDATE downloads
+                SET library_path = ?, library_size = ?, library_mtime = ?
+                WHERE id = ?
+            """, [(path, size, mtime, download_id) for download_id, path, size, mtime in locations])
+    
+    def set_file_hashes(self, hashes: Sequence[tuple]):
+        """Grava impressão digital e hash completo dos arquivos.
+        
+        hashes: (caminho na biblioteca, tamanho, mtime, impressão, hash
+        completo ou None). Tamanho e mtime são gravados junto, para a
+        próxima varredura reaproveitar os hashes. Um hash None mantém o
+        hash gravado só se a impressão não mudou; se o arquivo mudou
+        (tamanho ou mtime), o hash de áudio antigo também é descartado.
+        """
+        if not hashes:
+            return
+        with self.get_connection() as conn:
+            # No UPDATE as colunas à direita ainda têm os valores antigos
+            conn.executemany("""
+                UPDATE downloads
+                SET file_hash = CASE
+                        WHEN :file_hash IS NOT NULL THEN :file_hash
+                        WHEN file_fingerprint IS :fingerprint THEN file_hash
+                    END,
+                    audio_hash = CASE
+                        WHEN library_size IS :size AND library_mtime IS :mtime THEN audio_hash
+                    END,
+                    file_fingerprint = :fingerprint,
+                    library_size = :size,
+                    library_mtime = :mtime
+                WHERE library_path = :path
+            """, [
+                {'path': path, 'size': size, 'mtime': mtime,
+                 'fingerprint': fingerprint, 'file_hash': file_hash}
+                for path, size, mtime, fingerprint, file_hash in hashes
+            ])
+    
+    def set_audio_hashes(self, hashes: Sequence[tuple]):
+        """Grava hashes de áudio (sem tags): (caminho, tamanho, mtime, hash).
+        
+        Se o arquivo mudou (tamanho ou mtime), impressão e hash completo
+        antigos são descartados.
+        """
+        if not hashes:
+            return
+        with self.get_connection() as conn:
+            conn.executemany("""
+                UPDATE downloads
+                SET file_fingerprint = CASE
+                        WHEN library_size IS :size AND library_mtime IS :mtime THEN file_fingerprint
+                    END,
+                    file_hash = CASE
+                        WHEN library_size IS :size AND library_mtime IS :mtime THEN file_hash
+                    END,
+                    audio_hash = :audio_hash,
+                    library_size = :size,
+                    library_mtime = :mtime
+                WHERE library_path = :path
+            """, [
+                {'path': path, 'size': size, 'mtime': mtime, 'audio_hash': value}
+                for path, size, mtime, value in hashes
+            ])
+    
+    def get_library_files(self) -> Dict[str, Dict[str, Any]]:
+        """Downloads com local na biblioteca: caminho -> dados de hash.
+        
+        Usado para reaproveitar impressões e hashes de arquivos que não
+        mudaram (mesmo tamanho e mtime) entre varreduras.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT library_path, library_size, library_mtime, file_fingerprint, file_hash, audio_hash
+                FROM downloads
+                WHERE status = 'SUCCESS' AND library_path IS NOT NULL
+            """)
+            return {
+                path: {
+                    'size': size,
+                    'mtime': mtime,
+                    'fingerprint': fingerprint,
+                    'file_hash': file_hash,
+                    'audio_hash': audio_hash,
+                }
+                for path, size, mtime, fingerprint, file_hash, audio_hash in cursor
+            }
     
     def get_cached_search(self, query_hash: str) -> Optional[List[Dict]]:
         """Busca resultado no cache"""
-        with sqlite3.connect(self.db_path) as conn:
+        entry = self.get_cached_search_entry(query_hash)
+        return entry['results'] if entry else None
+    
+    def get_cached_search_entry(self, query_hash: str) -> Optional[Dict[str, Any]]:
+        """Busca entrada do cache com expiração e tamanho armazenado (bytes)"""
+        with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT results, expires_at FROM search_cache WHERE query_hash = ?",
                 (query_hash,)
@@ -118,43 +515,224 @@ class DatabaseManager:
             if not row:
                 return None
                 
-            results_json, expires_at = row
+            stored, expires_at = row
             expires_dt = datetime.fromisoformat(expires_at)
             
             if datetime.now() > expires_dt:
                 # Cache expirado
                 conn.execute("DELETE FROM search_cache WHERE query_hash = ?", (query_hash,))
                 return None
-                
-            return json.loads(results_json)
+            
+            results, size = decode_results_sized(stored)
+            return {
+                'results': results,
+                'expires_at': expires_dt,
+                'size': size,
+            }
     
-    def save_search_cache(self, query_hash: str, query_text: str, results: List[Dict], ttl_hours: int = 24):
-        """Salva resultado no cache"""
+    def save_search_cache(self, query_hash: str, query_text: str, results: List[Dict],
+                          ttl_hours: int = 24, fields: Optional[Sequence[str]] = None) -> int:
+        """Salva resultado no cache (colunar + zlib, opcionalmente só com fields)
+        
+        Retorna o tamanho descomprimido (bytes), usado como estimativa de memória.
+        """
         expires_at = datetime.now() + timedelta(hours=ttl_hours)
+        stored, size = encode_results_sized(results, fields)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO search_cache 
-                (query_hash, query_text, results, expires_at)
-                VALUES (?, ?, ?, ?)
+                (query_hash, query_text, results, expires_at, size_bytes, hit_count, last_access)
+                VALUES (?, ?, ?, ?, ?, 0, ?)
             """, (
                 query_hash,
                 query_text,
-                json.dumps(results),
-                expires_at.isoformat()
+                sqlite3.Binary(stored),
+                expires_at.isoformat(),
+                len(stored),
+                time.time()
             ))
+        
+        return size
     
-    def cleanup_expired_cache(self):
-        """Remove cache expirado"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
+    def cleanup_expired_cache(self) -> int:
+        """Remove cache expirado. Retorna quantas entradas foram removidas"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(
                 "DELETE FROM search_cache WHERE expires_at < ?",
                 (datetime.now().isoformat(),)
             )
+            return cursor.rowcount
+    
+    def get_negative_cache(self, key_hash: str) -> Optional[Dict[str, Any]]:
+        """Entrada do cache negativo (miss_count, expires_at) ou None"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT miss_count, expires_at FROM negative_cache WHERE key_hash = ?",
+                (key_hash,)
+            ).fetchone()
+            if not row:
+                return None
+            return {'miss_count': row[0], 'expires_at': row[1]}
+    
+    def save_negative_cache(self, key_hash: str, key_text: str, miss_count: int, expires_at: float):
+        """Grava (ou atualiza) entrada do cache negativo"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO negative_cache
+                (key_hash, key_text, miss_count, expires_at, last_miss)
+                VALUES (?, ?, ?, ?, ?)
+            """, (key_hash, key_text, miss_count, expires_at, time.time()))
+    
+    def delete_negative_cache(self, key_hash: str):
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM negative_cache WHERE key_hash = ?", (key_hash,))
+    
+    def cleanup_negative_cache(self, older_than_seconds: float) -> int:
+        """Remove entradas vencidas há mais de older_than_seconds (zera o crescimento)"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM negative_cache WHERE expires_at < ?",
+                (time.time() - older_than_seconds,)
+            )
+            return cursor.rowcount
+    
+    def get_playlist_journal(self, file_path: str) -> Dict[str, bool]:
+        """Linhas já concluídas do arquivo (linha -> saiu do arquivo)"""
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT file_line, success FROM playlist_journal WHERE file_path = ?",
+                (file_path,)
+            ).fetchall()
+            return {row[0]: bool(row[1]) for row in rows}
+    
+    def get_playlist_line(self, file_path: str, file_line: str) -> Optional[bool]:
+        """Resultado registrado da linha (True = saiu do arquivo) ou None"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT success FROM playlist_journal WHERE file_path = ? AND file_line = ?",
+                (file_path, file_line)
+            ).fetchone()
+            return bool(row[0]) if row else None
+    
+    def count_playlist_journal(self, file_path: str) -> int:
+        with self.get_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM playlist_journal WHERE file_path = ?", (file_path,)
+            ).fetchone()[0]
+    
+    def record_playlist_line(self, file_path: str, file_line: str, success: bool):
+        """Registra o resultado de uma linha assim que ela termina.
+        
+        Um sucesso já registrado não é rebaixado por uma repetição da linha.
+        """
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO playlist_journal (file_path, file_line, success, completed_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(file_path, file_line) DO UPDATE SET
+                    success = MAX(success, excluded.success),
+                    completed_at = excluded.completed_at
+            """, (file_path, file_line, int(success), time.time()))
+    
+    def clear_playlist_journal(self, file_path: str):
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM playlist_journal WHERE file_path = ?", (file_path,))
+    
+    def prune_playlist_journal(self, existing_paths: List[str]) -> int:
+        """Remove diários de arquivos que não existem mais"""
+        existing = set(existing_paths)
+        with self.get_connection() as conn:
+            journal_paths = [
+                row[0] for row in conn.execute("SELECT DISTINCT file_path FROM playlist_journal")
+            ]
+            stale = [path for path in journal_paths if path not in existing]
+            for path in stale:
+                conn.execute("DELETE FROM playlist_journal WHERE file_path = ?", (path,))
+            return len(stale)
+    
+    def record_cache_access(self, accesses: Dict[str, tuple], hits: int = 0, misses: int = 0):
+        """Acumula uso do cache: {query_hash: (hits, último acesso)} e totais"""
+        with self.get_connection() as conn:
+            conn.executemany("""
+                UPDATE search_cache
+                SET hit_count = hit_count + ?,
+                    last_access = MAX(COALESCE(last_access, 0), ?)
+                WHERE query_hash = ?
+            """, [(count, last_access, query_hash)
+                  for query_hash, (count, last_access) in accesses.items()])
+            self._add_cache_stats(conn, {'hits': hits, 'misses': misses})
+    
+    def _add_cache_stats(self, conn: sqlite3.Connection, deltas: Dict[str, int]):
+        conn.executemany("""
+            INSERT INTO cache_stats (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+        """, [(name, value) for name, value in deltas.items() if value])
+    
+    def get_cache_counters(self) -> Dict[str, int]:
+        """Contadores acumulados do cache (hits, misses, evictions)"""
+        with self.get_connection() as conn:
+            return dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+    
+    def get_cache_usage(self) -> Dict[str, int]:
+        """Número de entradas e bytes armazenados no cache"""
+        with self.get_connection() as conn:
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM search_cache"
+            ).fetchone()
+            return {'entries': entries, 'bytes': total_bytes}
+    
+    def evict_search_cache(self, max_entries: int, max_bytes: int,
+                           hit_bonus_seconds: float = 3600) -> List[str]:
+        """Remove as entradas menos valiosas até respeitar os limites
+        
+        Valor = último acesso + hit_count * hit_bonus_seconds: entradas
+        antigas e pouco usadas saem primeiro (LRU ponderado por hits).
+        Retorna os query_hash removidos.
+        """
+        usage = self.get_cache_usage()
+        excess_entries = usage['entries'] - max_entries if max_entries else 0
+        excess_bytes = usage['bytes'] - max_bytes if max_bytes else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return []
+        
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT query_hash, size_bytes FROM search_cache
+                ORDER BY COALESCE(last_access, 0) + hit_count * ? ASC
+            """, (hit_bonus_seconds,))
+            
+            evicted = []
+            for query_hash, size_bytes in cursor:
+                if excess_entries <= 0 and excess_bytes <= 0:
+                    break
+                evicted.append(query_hash)
+                excess_entries -= 1
+                excess_bytes -= size_bytes or 0
+            
+            conn.executemany(
+                "DELETE FROM search_cache WHERE query_hash = ?",
+                [(query_hash,) for query_hash in evicted]
+            )
+            self._add_cache_stats(conn, {'evictions': len(evicted)})
+            return evicted
+    
+    def get_top_cached_queries(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Consultas cacheadas com mais hits"""
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT query_text, hit_count, last_access, size_bytes FROM search_cache
+                ORDER BY hit_count DESC, last_access DESC
+                LIMIT ?
+            """, (limit,))
+            return [
+                {'query': query, 'hits': hits, 'last_access': last_access, 'size_bytes': size}
+                for query, hits, last_access, size in cursor.fetchall()
+            ]
     
     def get_stats(self) -> Dict[str, int]:
         """Estatísticas do banco"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.execute("""
                 SELECT 
                     status,
@@ -175,10 +753,12 @@ class DatabaseManager:
     
     def get_successful_downloads(self):
         """Retorna todos os downloads com sucesso"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT filename, file_line, username, file_size, created_at
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute("""
+                SELECT id, filename, file_line, username, file_size, created_at,
+                       library_path, library_size, library_mtime
                 FROM downloads 
                 WHERE status = 'SUCCESS'
                 ORDER BY created_at DESC
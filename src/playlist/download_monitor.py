@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+STATE_SUCCEEDED = "Completed, Succeeded"
+STATE_QUEUED_REMOTELY = "Queued, Remotely"
+FAILED_STATES = {
+    "Completed, Errored",
+    "Completed, Cancelled",
+    "Completed, Rejected",
+    "Completed, TimedOut",
+}
+
+# Resultados sintéticos (não vêm do slskd)
+RESULT_QUEUE_TIMEOUT = "Queue timeout"
+RESULT_TIMEOUT = "Timeout"
+
+
+class _Waiter:
+    """Download acompanhado pelo monitor"""
+
+    def __init__(
+        self,
+        download_info: Dict,
+        timeout_seconds: float,
+        on_state: Optional[Callable[[str], None]],
+    ):
+        self.download_id = download_info.get("id") or ""
+        self.username = download_info.get("username", "")
+        self.filename = download_info.get("filename", "")
+
+        # IDs no formato "username:filename" gerados pelo SlskdApiClient
+        if not (self.username and self.filename) and ":" in self.download_id:
+            self.username, self.filename = self.download_id.split(":", 1)
+
+        self.deadline = time.time() + timeout_seconds
+        self.on_state = on_state
+        self.future: Future = Future()
+        self.last_state: Optional[str] = None
+        self.queued_since: Optional[float] = None
+
+
+class DownloadMonitor:
+    """Acompanha vários downloads com uma única consulta à fila por ciclo.
+
+    Cada chamada a watch() registra um download e devolve um Future que é
+    resolvido com o estado final ("Completed, Succeeded", "Completed, Errored",
+    "Queue timeout", "Timeout", ...). Uma thread em segundo plano busca a fila
+    completa do slskd uma vez por ciclo e distribui o estado para todos os
+    downloads registrados, em vez de cada download consultar a fila sozinho.
+    """
+
+    def __init__(
+        self,
+        slskd_client,
+        poll_interval: float = None,
+        queue_stall_seconds: float = 60,
+    ):
+        self.slskd_client = slskd_client
+        self.poll_interval = poll_interval or int(
+            os.getenv("DOWNLOAD_MONITOR_POLL_SECONDS", 10)
+        )
+        self.queue_stall_seconds = queue_stall_seconds
+
+        self._waiters: List[_Waiter] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(
+        self,
+        download_info: Dict,
+        timeout_seconds: float,
+        on_state: Optional[Callable[[str], None]] = None,
+    ) -> Future:
+        """Registra download para monitoramento e retorna Future com estado final"""
+        waiter = _Waiter(download_info, timeout_seconds, on_state)
+
+        with self._lock:
+            self._waiters.append(waiter)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="download-monitor", daemon=True
+                )
+                self._thread.start()
+
+        # Novo download: consultar a fila já no próximo ciclo
+        self._wakeup.set()
+        return waiter.future
+
+    def active_count(self) -> int:
+        """Número de downloads ainda sendo acompanhados"""
+        with self._lock:
+            return len(self._waiters)
+
+    def poll_once(self) -> int:
+        """Executa um ciclo: uma consulta à fila para todos os downloads.
+
+        Retorna quantos downloads continuam pendentes.
+        """
+        with self._lock:
+            waiters = list(self._waiters)
+
+        if not waiters:
+            return 0
+
+        by_id, by_file = self._index_queue(self.slskd_client.get_download_queue())
+        now = time.time()
+        finished = []
+
+        for waiter in waiters:
+            file_info = by_id.get(waiter.download_id) or by_file.get(
+                (waiter.username, waiter.filename)
+            )
+            state = file_info.get("state", "") if file_info else ""
+
+            result = self._evaluate(waiter, state, now)
+            if result is not None:
+                finished.append((waiter, result))
+
+        with self._lock:
+            for waiter, _ in finished:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            pending = len(self._waiters)
+
+        for waiter, result in finished:
+            if not waiter.future.done():
+                waiter.future.set_result(result)
+
+        return pending
+
+    def _evaluate(self, waiter: _Waiter, state: str, now: float) -> Optional[str]:
+        """Atualiza waiter com o estado atual. Retorna resultado final ou None"""
+        if state and state != waiter.last_state:
+            waiter.last_state = state
+            if waiter.on_state:
+                try:
+                    waiter.on_state(state)
+                except Exception as e:
+                    print(f"⚠️ Erro no callback de status: {e}")
+
+        if state == STATE_SUCCEEDED or state in FAILED_STATES:
+            return state
+
+        # Fila remota parada por muito tempo: desistir deste usuário
+        if state == STATE_QUEUED_REMOTELY:
+            if waiter.queued_since is None:
+                waiter.queued_since = now
+            elif now - waiter.queued_since >= self.queue_stall_seconds:
+                return RESULT_QUEUE_TIMEOUT
+        elif state:
+            waiter.queued_since = None
+
+        if now >= waiter.deadline:
+            return RESULT_TIMEOUT
+
+        return None
+
+    def _run(self):
+        """Loop da thread de monitoramento (termina quando não há downloads)"""
+        while True:
+            self._wakeup.clear()
+
+            try:
+                pending = self.poll_once()
+            except Exception as e:
+                print(f"❌ Erro no monitoramento de downloads: {e}")
+                pending = self.active_count()
+
+            with self._lock:
+                if not self._waiters:
+                    self._thread = None
+                    return
+
+            if pending:
+                self._wakeup.wait(self.poll_interval)
+
+    @staticmethod
+    def _index_queue(queue) -> Tuple[Dict[str, Dict], Dict[Tuple[str, str], Dict]]:
+        """Indexa a fila do slskd por ID e por (username, filename)"""
+        by_id = {}
+        by_file = {}
+
+        for user_data in queue or []:
+            username = user_data.get("username")
+            for directory in user_data.get("directories", []):
+                for file_info in directory.get("files", []):
+                    if file_info.get("id"):
+                        by_id[file_info["id"]] = file_info
+                    by_file[(username, file_info.get("filename"))] = file_info
+
+        return by_id, by_file
@@ -1,9 +1,10 @@
 import re
-import hashlib
 import os
 from typing import List, Dict, Tuple
 from difflib import SequenceMatcher
 
+from .file_hasher import audio_hash, fingerprint, full_hash
+
 class DuplicateDetector:
     def __init__(self, db_manager):
         self.db_manager = db_manager
@@ -39,33 +40,38 @@ class DuplicateDetector:
         search_text = f"{artist} {song}".lower()
         matches = []
         
-        # Buscar no banco por similaridade
-        import sqlite3
-        with sqlite3.connect(self.db_manager.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT file_line FROM downloads WHERE status = 'SUCCESS'"
-            )
+        # Índice de trigramas reduz a busca a poucos candidatos
+        candidates = self.db_manager.find_song_candidates(search_text, threshold)
+        
+        for file_line in candidates:
+            similarity = SequenceMatcher(None, search_text, file_line.lower()).ratio()
             
-            for row in cursor.fetchall():
-                file_line = row[0].lower()
-                similarity = SequenceMatcher(None, search_text, file_line).ratio()
-                
-                if similarity >= threshold:
-                    matches.append(row[0])
+            if similarity >= threshold:
+                matches.append(file_line)
                     
         return matches
     
     def calculate_file_hash(self, filepath: str) -> str:
-        """Calcula hash MD5 do arquivo"""
+        """Calcula hash MD5 do arquivo (leitura em blocos de 1 MB)"""
         if not os.path.exists(filepath):
             return ""
             
-        hash_md5 = hashlib.md5()
         try:
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return full_hash(filepath)
+        except Exception:
+            return ""
+    
+    def calculate_fingerprint(self, filepath: str) -> str:
+        """Impressão digital barata (tamanho + início/meio/fim do arquivo)"""
+        try:
+            return fingerprint(filepath)
+        except Exception:
+            return ""
+    
+    def calculate_audio_hash(self, filepath: str) -> str:
+        """Hash apenas do áudio (STREAMINFO do FLAC ou frames sem tags)"""
+        try:
+            return audio_hash(filepath) or ""
         except Exception:
             return ""
     
@@ -0,0 +1,277 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+AUDIO_EXTENSIONS = (".flac", ".mp3", ".m4a", ".ogg", ".opus", ".wav", ".aiff", ".ape", ".wv")
+
+# Leitura do hash completo em blocos grandes (menos syscalls em arquivos de 30+ MB)
+FULL_HASH_BUFFER = 1024 * 1024
+
+FLAC_MAGIC = b"fLaC"
+FLAC_STREAMINFO = 0
+
+
+def fingerprint(file_path: str, block_size: int = 64 * 1024) -> str:
+    """Impressão digital barata: tamanho + MD5 dos blocos do início, meio e fim.
+
+    Lê no máximo 3 blocos, qualquer que seja o tamanho do arquivo. Arquivos
+    com impressões diferentes certamente são diferentes; impressões iguais
+    precisam do hash completo para confirmar.
+    """
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= 3 * block_size:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - block_size) // 2, size - block_size):
+                f.seek(offset)
+                digest.update(f.read(block_size))
+    return f"{size}:{digest.hexdigest()}"
+
+
+def full_hash(file_path: str, buffer_size: int = FULL_HASH_BUFFER) -> str:
+    """MD5 do arquivo inteiro, lido com readinto em um buffer grande reutilizado"""
+    digest = hashlib.md5()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.hexdigest()
+
+
+def audio_hash(file_path: str, buffer_size: int = FULL_HASH_BUFFER) -> Optional[str]:
+    """Hash apenas do áudio, ignorando tags, capas e padding.
+
+    FLAC: usa o MD5 do STREAMINFO (calculado pelo encoder sobre o áudio
+    decodificado) quando presente, lendo só o cabeçalho; sem ele, MD5 dos
+    frames depois do último bloco de metadados. MP3: MD5 dos bytes entre a
+    tag ID3v2 e a ID3v1. Nada é decodificado. Retorna None para outros
+    formatos ou arquivos inválidos.
+    """
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        start = _id3v2_size(f)
+        f.seek(start)
+
+        if f.read(4) == FLAC_MAGIC:
+            offset = start + 4
+            last = False
+            while not last:
+                header = f.read(4)
+                if len(header) < 4:
+                    return None  # Metadados truncados
+                last = bool(header[0] & 0x80)
+                block_type = header[0] & 0x7F
+                length = int.from_bytes(header[1:4], "big")
+                if block_type == FLAC_STREAMINFO and length >= 34:
+                    md5 = f.read(34)[18:34]
+                    if any(md5):
+                        return f"flac:{md5.hex()}"
+                offset += 4 + length
+                f.seek(offset)
+            return f"frames:{_hash_range(f, offset, size, buffer_size)}"
+
+        if file_path.lower().endswith(".mp3"):
+            end = size
+            if size - start >= 128:
+                f.seek(size - 128)
+                if f.read(3) == b"TAG":
+                    end = size - 128
+            return f"frames:{_hash_range(f, start, end, buffer_size)}"
+
+    return None
+
+
+def _id3v2_size(f) -> int:
+    """Tamanho da tag ID3v2 no início do arquivo (0 se não houver)"""
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _hash_range(f, start: int, end: int, buffer_size: int) -> str:
+    digest = hashlib.md5()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        count = f.readinto(view[:min(buffer_size, remaining)])
+        if not count:
+            break
+        digest.update(view[:count])
+        remaining -= count
+    return digest.hexdigest()
+
+
+def iter_library(root: str, extensions: Tuple[str, ...] = AUDIO_EXTENSIONS) -> Iterator[str]:
+    """Percorre a biblioteca com os.scandir devolvendo arquivos de áudio"""
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file() and entry.name.lower().endswith(extensions):
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class FileHasher:
+    """Calcula hashes de muitos arquivos em duas etapas, em um pool de threads.
+
+    1. Impressão digital (tamanho + 3 blocos) de todos os arquivos.
+    2. Hash completo só dos arquivos cuja impressão colidiu com outra.
+
+    Em uma biblioteca sem duplicatas quase nada é lido além dos 3 blocos por
+    arquivo. Resultados anteriores (known: caminho -> registro com size,
+    mtime, fingerprint e file_hash) são reaproveitados quando tamanho e mtime
+    não mudaram, sem abrir o arquivo.
+
+    hash_audio é o modo alternativo que compara só o áudio (audio_hash).
+    """
+
+    def __init__(self, max_workers: int = None, block_size: int = None):
+        self.max_workers = max_workers or int(os.getenv("HASH_WORKERS", 4))
+        self.block_size = block_size or int(os.getenv("HASH_BLOCK_SIZE", 64 * 1024))
+
+        self.fingerprinted = 0
+        self.fully_hashed = 0
+        self.audio_hashed = 0
+
+    def hash_files(self, paths: Iterable[str], known: Dict[str, Dict] = None) -> Dict[str, Dict]:
+        """Retorna caminho -> {size, mtime, fingerprint, file_hash}.
+
+        file_hash fica None para arquivos com impressão única.
+        """
+        known = known or {}
+        results: Dict[str, Dict] = {}
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, self.max_workers), thread_name_prefix="hash"
+        ) as executor:
+            for path, record, computed in executor.map(
+                lambda path: (path, *self._fingerprint_record(path, known.get(path))), paths
+            ):
+                if record is not None:
+                    results[path] = record
+                    self.fingerprinted += computed
+
+            by_fingerprint: Dict[str, List[str]] = {}
+            for path, record in results.items():
+                by_fingerprint.setdefault(record["fingerprint"], []).append(path)
+
+            colliding = [
+                path
+                for group in by_fingerprint.values() if len(group) > 1
+                for path in group if not results[path]["file_hash"]
+            ]
+            for path, value in executor.map(lambda path: (path, self._full_hash(path)), colliding):
+                if value:
+                    results[path]["file_hash"] = value
+                    self.fully_hashed += 1
+
+        return results
+
+    def hash_audio(self, paths: Iterable[str], known: Dict[str, Dict] = None) -> Dict[str, Dict]:
+        """Modo áudio: retorna caminho -> {size, mtime, audio_hash}.
+
+        Uma passada por arquivo (FLAC com MD5 no STREAMINFO lê só o
+        cabeçalho). Cópias do mesmo áudio com tags ou padding diferentes
+        (ex.: de peers diferentes) recebem o mesmo hash. audio_hash fica
+        None para formatos não suportados.
+        """
+        known = known or {}
+        results: Dict[str, Dict] = {}
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, self.max_workers), thread_name_prefix="hash"
+        ) as executor:
+            for path, record, computed in executor.map(
+                lambda path: (path, *self._audio_record(path, known.get(path))), paths
+            ):
+                if record is not None:
+                    results[path] = record
+                    self.audio_hashed += computed
+
+        return results
+
+    def duplicate_groups(self, results: Dict[str, Dict], key: str = "file_hash") -> List[List[str]]:
+        """Grupos de arquivos com o mesmo hash (file_hash ou audio_hash)"""
+        by_hash: Dict[str, List[str]] = {}
+        for path, record in results.items():
+            if record.get(key):
+                by_hash.setdefault(record[key], []).append(path)
+        return [sorted(group) for group in by_hash.values() if len(group) > 1]
+
+    def _fingerprint_record(self, path: str, previous: Optional[Dict]) -> Tuple[Optional[Dict], bool]:
+        """Registro do arquivo e se a impressão precisou ser calculada"""
+        try:
+            stat = os.stat(path)
+            if (
+                previous
+                and previous.get("fingerprint")
+                and previous.get("size") == stat.st_size
+                and previous.get("mtime") == stat.st_mtime
+            ):
+                value = previous["fingerprint"]
+                file_hash = previous.get("file_hash") or None
+                computed = False
+            else:
+                value = fingerprint(path, self.block_size)
+                file_hash = None
+                computed = True
+        except OSError as e:
+            print(f"⚠️ Erro ao ler {path}: {e}")
+            return None, False
+        record = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "fingerprint": value,
+            "file_hash": file_hash,
+        }
+        return record, computed
+
+    def _audio_record(self, path: str, previous: Optional[Dict]) -> Tuple[Optional[Dict], bool]:
+        """Registro do arquivo e se o hash de áudio precisou ser calculado"""
+        try:
+            stat = os.stat(path)
+            if (
+                previous
+                and previous.get("audio_hash")
+                and previous.get("size") == stat.st_size
+                and previous.get("mtime") == stat.st_mtime
+            ):
+                value = previous["audio_hash"]
+                computed = False
+            else:
+                value = audio_hash(path)
+                computed = True
+        except OSError as e:
+            print(f"⚠️ Erro ao ler {path}: {e}")
+            return None, False
+        return {"size": stat.st_size, "mtime": stat.st_mtime, "audio_hash": value}, computed
+
+    def _full_hash(self, path: str) -> Optional[str]:
+        try:
+            return full_hash(path)
+        except OSError as e:
+            print(f"⚠️ Erro ao calcular hash de {path}: {e}")
+            return None
@@ -0,0 +1,212 @@
+import bisect
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class FileIndex:
+    """Índice em memória dos arquivos de uma árvore (nome base -> caminhos).
+
+    Substitui "find <raiz> -name *<nome>" por arquivo: a árvore é percorrida
+    uma vez com os.scandir e as buscas por nome exato são O(1). Buscas por
+    sufixo (o "*" do find, ex.: cópias renomeadas pelo slskd) usam uma lista
+    ordenada dos nomes invertidos, com busca binária.
+
+    O índice é mantido atualizado por diferença de mtime das pastas: uma
+    pasta só é relida se seu mtime mudou (arquivo criado, removido ou
+    renomeado nela). Quem move arquivos pode avisar com add/remove/move para
+    evitar releituras.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._by_name: Dict[str, List[str]] = {}
+        self._reversed_names: List[str] = []
+        # pasta -> (mtime_ns, arquivos, subpastas)
+        self._dirs: Dict[str, Tuple[int, Set[str], Set[str]]] = {}
+        self._lock = threading.RLock()
+        self._built = False
+
+        self.scanned_dirs = 0
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(paths) for paths in self._by_name.values())
+
+    def build(self):
+        """Lê a árvore inteira (descarta o índice anterior)"""
+        with self._lock:
+            self._by_name = {}
+            self._reversed_names = []
+            self._dirs = {}
+            if os.path.isdir(self.root):
+                self._scan_tree(self.root)
+            self._built = True
+
+    def refresh(self) -> int:
+        """Relê apenas pastas cujo mtime mudou. Retorna quantas foram relidas"""
+        with self._lock:
+            if not self._built:
+                self.build()
+                return self.scanned_dirs
+
+            self.refreshes += 1
+            changed = 0
+            for directory in list(self._dirs):
+                if directory not in self._dirs:
+                    continue  # Removida junto com a pasta pai nesta atualização
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    self._forget_tree(directory)
+                    changed += 1
+                    continue
+                if mtime != self._dirs[directory][0]:
+                    self._rescan_dir(directory)
+                    changed += 1
+            return changed
+
+    def find(self, file_name: str, refresh: bool = True) -> Optional[str]:
+        """Caminho de um arquivo pelo nome base (exato ou sufixo).
+
+        O caminho encontrado é confirmado com um stat. Se não encontrar e
+        refresh=True, atualiza o índice pelas pastas alteradas e tenta de
+        novo (arquivo baixado ou removido depois da leitura).
+        """
+        base_name = os.path.basename(file_name.replace("\\", "/"))
+        if not base_name:
+            return None
+
+        with self._lock:
+            if not self._built:
+                self.build()
+                refresh = False
+
+            found = self._lookup(base_name)
+            if found is not None and not os.path.isfile(found):
+                found = None  # Removido depois da leitura
+            if found is None and refresh:
+                self.refresh()
+                found = self._lookup(base_name)
+            return found
+
+    def add(self, path: str):
+        """Registra arquivo criado ou movido para dentro da árvore"""
+        directory, name = os.path.split(path)
+        if not self._in_tree(directory):
+            return
+        with self._lock:
+            entry = self._dirs.get(directory)
+            if entry is None:
+                # Pasta criada para receber o arquivo (ex.: ARTISTA/ALBUM)
+                if self._built:
+                    self._scan_tree(directory)
+                return
+            if name not in entry[1]:
+                entry[1].add(name)
+                self._add_name(name, path)
+
+    def remove(self, path: str):
+        """Registra arquivo removido ou movido para fora da árvore"""
+        directory, name = os.path.split(path)
+        with self._lock:
+            entry = self._dirs.get(directory)
+            if entry is not None and name in entry[1]:
+                entry[1].discard(name)
+                self._remove_name(name, path)
+
+    def move(self, source: str, destination: str):
+        self.remove(source)
+        self.add(destination)
+
+    def _lookup(self, base_name: str) -> Optional[str]:
+        paths = self._by_name.get(base_name)
+        if paths:
+            return paths[0]
+
+        # Sufixo: nomes invertidos que começam com o nome invertido
+        reversed_name = base_name[::-1]
+        position = bisect.bisect_left(self._reversed_names, reversed_name)
+        if position < len(self._reversed_names):
+            candidate = self._reversed_names[position]
+            if candidate.startswith(reversed_name):
+                return self._by_name[candidate[::-1]][0]
+        return None
+
+    def _in_tree(self, path: str) -> bool:
+        root = os.path.abspath(self.root)
+        path = os.path.abspath(path)
+        return path == root or path.startswith(root + os.sep)
+
+    def _scan_tree(self, top: str):
+        pending = [top]
+        while pending:
+            pending.extend(self._scan_dir(pending.pop()))
+
+    def _scan_dir(self, directory: str) -> List[str]:
+        """Lê uma pasta e registra seus arquivos. Retorna as subpastas"""
+        files: Set[str] = set()
+        subdirs: Set[str] = set()
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.add(entry.name)
+                        elif entry.is_file():
+                            files.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return []
+
+        self.scanned_dirs += 1
+        if directory in self._dirs:
+            # Já indexada (ex.: registrada por add): evita caminhos repetidos
+            for name in self._dirs[directory][1]:
+                self._remove_name(name, os.path.join(directory, name))
+        self._dirs[directory] = (mtime, files, subdirs)
+        for name in files:
+            self._add_name(name, os.path.join(directory, name))
+        return [os.path.join(directory, name) for name in subdirs]
+
+    def _rescan_dir(self, directory: str):
+        _, old_files, old_subdirs = self._dirs.pop(directory)
+        for name in old_files:
+            self._remove_name(name, os.path.join(directory, name))
+
+        new_subdirs = self._scan_dir(directory)
+        current = set(os.path.basename(path) for path in new_subdirs)
+
+        for name in old_subdirs - current:
+            self._forget_tree(os.path.join(directory, name))
+        for name in current - old_subdirs:
+            self._scan_tree(os.path.join(directory, name))
+
+    def _forget_tree(self, top: str):
+        prefix = top + os.sep
+        for directory in [d for d in self._dirs if d == top or d.startswith(prefix)]:
+            _, files, _ = self._dirs.pop(directory)
+            for name in files:
+                self._remove_name(name, os.path.join(directory, name))
+
+    def _add_name(self, name: str, path: str):
+        paths = self._by_name.setdefault(name, [])
+        if not paths:
+            bisect.insort(self._reversed_names, name[::-1])
+        if path not in paths:
+            paths.append(path)
+
+    def _remove_name(self, name: str, path: str):
+        paths = self._by_name.get(name)
+        if not paths or path not in paths:
+            return
+        paths.remove(path)
+        if not paths:
+            del self._by_name[name]
+            reversed_name = name[::-1]
+            position = bisect.bisect_left(self._reversed_names, reversed_name)
+            if position < len(self._reversed_names) and self._reversed_names[position] == reversed_name:
+                del self._reversed_names[position]
@@ -1,23 +1,34 @@
 import os
 import shutil
-import subprocess
 import logging
 from pathlib import Path
 
+from .file_hasher import audio_hash, fingerprint
+from .file_index import FileIndex
+
 logger = logging.getLogger(__name__)
 
 class FileOrganizer:
-    def __init__(self, slskd_path="/media/slskd", music_path="/media/music"):
+    def __init__(self, slskd_path="/media/slskd", music_path="/media/music", db_manager=None):
         self.slskd_path = slskd_path
         self.music_path = music_path
+        # Quando informado, grava na base onde cada arquivo ficou
+        self.db_manager = db_manager
+        self.calculate_hashes = os.getenv("CALCULATE_FILE_HASHES", "true").lower() == "true"
+        # Índice da pasta de downloads, lido na primeira busca
+        self.slskd_index = FileIndex(slskd_path)
     
-    def organize_file(self, filename, artist, album):
-        """Organiza arquivo baixado para estrutura ARTISTA/ALBUM/musica.ext"""
+    def organize_file(self, filename, artist, album, download_id=None):
+        """Organiza arquivo baixado para estrutura ARTISTA/ALBUM/musica.ext
+        
+        Com download_id e db_manager, registra caminho final, tamanho e mtime
+        no download para que organizer/fixer pulem o arquivo com um stat.
+        """
         try:
             # Extrai nome do arquivo do filename completo
             file_name = os.path.basename(filename.replace('\\', '/'))
             
-            # Procura arquivo usando find
+            # Procura arquivo no índice da pasta de downloads
             found_file = self._find_file(filename)
             if not found_file:
                 logger.error(f"Arquivo não encontrado: {filename}")
@@ -33,30 +44,43 @@ class FileOrganizer:
             # Move arquivo mantendo apenas o nome base
             dest_file = album_path / file_name
             shutil.move(found_file, dest_file)
+            self.slskd_index.remove(found_file)
             
             logger.info(f"Arquivo movido: {found_file} -> {dest_file}")
+            self._record_location(download_id, dest_file)
             return True
             
         except Exception as e:
             logger.error(f"Erro ao organizar arquivo {filename}: {e}")
             return False
     
-    def _find_file(self, file_name):
-        """Procura arquivo usando find command"""
+    def _record_location(self, download_id, dest_file):
+        """Grava o local final e a impressão digital do arquivo no registro do download"""
+        if not download_id or self.db_manager is None:
+            return
         try:
-            # Extrair apenas o nome do arquivo (última parte após \ ou /)
-            base_name = os.path.basename(file_name.replace('\\', '/'))
-            
-            cmd = ["find", self.slskd_path, "-type", "f", "-name", f"*{base_name}"]
-            logger.info(f"Buscando arquivo: {' '.join(cmd)}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            files = result.stdout.strip().split('\n')
-            return files[0] if files and files[0] else None
-            
-        except subprocess.CalledProcessError:
-            return None
+            stat = os.stat(dest_file)
+            self.db_manager.set_library_locations(
+                [(download_id, str(dest_file), stat.st_size, stat.st_mtime)]
+            )
+            if self.calculate_hashes:
+                # Impressão digital barata (3 blocos): base para deduplicação por hash
+                self.db_manager.set_file_hashes([
+                    (str(dest_file), stat.st_size, stat.st_mtime, fingerprint(dest_file), None)
+                ])
+                # Hash só do áudio: acha a mesma faixa vinda de outro peer com outras tags
+                self.db_manager.set_audio_hashes([
+                    (str(dest_file), stat.st_size, stat.st_mtime, audio_hash(str(dest_file)))
+                ])
+        except Exception as e:
+            logger.error(f"Erro ao registrar local de {dest_file}: {e}")
+    
+    def _find_file(self, file_name):
+        """Procura arquivo pelo nome base no índice de slskd_path"""
+        found = self.slskd_index.find(file_name)
+        if found:
+            logger.info(f"Arquivo encontrado: {found}")
+        return found
     
     def _sanitize_name(self, name):
         """Remove caracteres inválidos para nomes de pasta"""
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Script para encontrar arquivos duplicados em /media/music por conteúdo
+
+Gera uma lista (padrão: dupes.txt) compatível com scripts/remove-dupes-safe.sh
+
+Uso:
+    python find_duplicates.py [saida]           # Conteúdo idêntico (bytes)
+    python find_duplicates.py --audio [saida]   # Mesmo áudio, tags diferentes
+"""
+
+import os
+import sys
+import logging
+
+# Adicionar src ao path para imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from playlist.database_manager import DatabaseManager
+from playlist.file_hasher import FileHasher, iter_library
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class LibraryDuplicateFinder:
+    def __init__(self, db_path="/app/data/downloads.db", music_path="/media/music"):
+        self.db_manager = DatabaseManager(db_path)
+        self.music_path = music_path
+        self.hasher = FileHasher()
+
+    def find_duplicates(self, output_path="dupes.txt", mode="content"):
+        """Varre a biblioteca e grava as cópias excedentes em output_path
+        
+        mode="content" compara os bytes do arquivo; mode="audio" compara só
+        o áudio (STREAMINFO do FLAC ou frames sem tags), achando a mesma
+        faixa vinda de peers diferentes.
+        """
+        known = self.db_manager.get_library_files()
+
+        if mode == "audio":
+            print(f"🔍 Calculando hashes de áudio em {self.music_path} "
+                  f"({self.hasher.max_workers} threads)")
+            results = self.hasher.hash_audio(iter_library(self.music_path), known)
+            unsupported = sum(1 for record in results.values() if not record['audio_hash'])
+            print(f"📊 {len(results)} arquivos: {self.hasher.audio_hashed} hashes de áudio calculados, "
+                  f"{unsupported} em formato não suportado")
+
+            self.db_manager.set_audio_hashes([
+                (path, record['size'], record['mtime'], record['audio_hash'])
+                for path, record in results.items() if path in known and record['audio_hash']
+            ])
+            groups = self.hasher.duplicate_groups(results, key='audio_hash')
+        else:
+            print(f"🔍 Calculando impressões digitais em {self.music_path} "
+                  f"({self.hasher.max_workers} threads)")
+            results = self.hasher.hash_files(iter_library(self.music_path), known)
+
+            print(f"📊 {len(results)} arquivos: {self.hasher.fingerprinted} impressões calculadas, "
+                  f"{self.hasher.fully_hashed} hashes completos (colisões)")
+
+            # Guarda impressões e hashes (com tamanho e mtime atuais) dos
+            # arquivos registrados na base
+            self.db_manager.set_file_hashes([
+                (path, record['size'], record['mtime'], record['fingerprint'], record['file_hash'])
+                for path, record in results.items() if path in known
+            ])
+            groups = self.hasher.duplicate_groups(results)
+
+        if not groups:
+            print("✅ Nenhuma duplicata encontrada")
+            return []
+
+        extras = []
+        for group in groups:
+            keep = self._choose_original(group, known)
+            print(f"\n🎵 Mantendo: {keep}")
+            for path in group:
+                if path != keep:
+                    print(f"   🗑️ Duplicata: {path}")
+                    extras.append(path)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for path in extras:
+                f.write(path + '\n')
+
+        print(f"\n📝 {len(extras)} duplicatas em {len(groups)} grupos gravadas em {output_path}")
+        print("   Revise e remova com: scripts/remove-dupes-safe.sh --dry-run " + output_path)
+        return extras
+
+    def _choose_original(self, group, known):
+        """Mantém a cópia registrada na base; senão o menor caminho"""
+        registered = [path for path in group if path in known]
+        return min(registered or group, key=lambda path: (len(path), path))
+
+def main():
+    """Função principal"""
+    db_path = os.getenv("DATABASE_PATH", "/app/data/downloads.db")
+    music_path = os.getenv("MUSIC_PATH", "/media/music")
+    args = sys.argv[1:]
+    mode = os.getenv("DUPLICATE_HASH_MODE", "content")
+    if "--audio" in args:
+        args.remove("--audio")
+        mode = "audio"
+    output_path = args[0] if args else "dupes.txt"
+
+    if not os.path.exists(db_path):
+        print(f"❌ Base de dados não encontrada: {db_path}")
+        return
+
+    if not os.path.exists(music_path):
+        print(f"❌ Pasta de música não encontrada: {music_path}")
+        return
+
+    finder = LibraryDuplicateFinder(db_path, music_path)
+    finder.find_duplicates(output_path, mode)
+
+if __name__ == "__main__":
+    main()
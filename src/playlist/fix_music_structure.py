@@ -5,15 +5,15 @@ Script para corrigir estrutura de pastas em /media/music usando dados da base SQ
 
 import os
 import sys
-import shutil
-import subprocess
 import logging
 from pathlib import Path
 
 # Adicionar src ao path para imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from playlist.batch_organizer import BatchOrganizer
 from playlist.database_manager import DatabaseManager
+from playlist.file_index import FileIndex
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -22,6 +22,8 @@ class MusicStructureFixer:
     def __init__(self, db_path="/app/data/downloads.db", music_path="/media/music"):
         self.db_manager = DatabaseManager(db_path)
         self.music_path = music_path
+        # Índice de /media/music: uma leitura da árvore para todos os arquivos
+        self.music_index = FileIndex(music_path)
         
     def fix_all_structure(self):
         """Corrige estrutura de todos os arquivos em /media/music"""
@@ -33,88 +35,32 @@ class MusicStructureFixer:
             
         print(f"🔧 Corrigindo estrutura de {len(downloads)} downloads")
         
-        fixed = 0
-        errors = 0
+        # O próprio fixer avisa o índice de cada movimentação: sem releituras.
+        # Registros com local válido são conferidos só com stat, sem o índice
+        batch = BatchOrganizer(
+            self.music_index, self.music_path, self._sanitize_name,
+            refresh_index=False, db_manager=self.db_manager,
+        )
+        plan = batch.plan(downloads, self._parse_file_line)
         
-        for download in downloads:
-            if self._fix_file_structure(download):
-                fixed += 1
-            else:
-                errors += 1
-                
-        print(f"\n✅ Corrigidos: {fixed}")
-        print(f"❌ Erros: {errors}")
-        
-    def _fix_file_structure(self, download):
-        """Corrige estrutura de um arquivo específico"""
-        filename = download.get('filename', '')
-        file_line = download.get('file_line', '')
-        
-        if not filename or not file_line:
-            return False
-            
-        # Parse da linha para extrair artista e álbum
-        artist, album, song = self._parse_file_line(file_line)
-        
-        if not artist or not album:
-            print(f"⚠️ Não foi possível extrair artista/álbum: {file_line}")
-            return False
-            
-        # Nome do arquivo (apenas a parte final)
-        file_name = os.path.basename(filename.replace('\\', '/'))
-        
-        # Procurar arquivo atual em /media/music
-        current_file = self._find_file_in_music(file_name)
-        
-        if not current_file:
+        for download in plan['invalid']:
+            print(f"⚠️ Não foi possível extrair artista/álbum: {download.get('file_line', '')}")
+        for download in plan['missing']:
+            file_name = os.path.basename(download.get('filename', '').replace('\\', '/'))
             print(f"❌ Arquivo não encontrado em /media/music: {file_name}")
-            return False
-            
-        # Estrutura correta
-        correct_artist = self._sanitize_name(artist)
-        correct_album = self._sanitize_name(album)
-        correct_path = Path(self.music_path) / correct_artist / correct_album
-        correct_file = correct_path / file_name
         
-        # Verificar se já está na estrutura correta
-        if str(current_file) == str(correct_file):
-            return True
-            
-        print(f"🔧 Corrigindo: {artist} - {album} - {file_name}")
-        print(f"   De: {current_file}")
-        print(f"   Para: {correct_file}")
+        stats = batch.execute(plan)
         
-        try:
-            # Criar pastas se necessário
-            correct_path.mkdir(parents=True, exist_ok=True)
-            
-            # Mover arquivo
-            shutil.move(str(current_file), str(correct_file))
-            
-            # Remover pasta vazia se possível
-            self._cleanup_empty_dirs(current_file.parent)
-            
-            print(f"✅ Movido com sucesso")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao mover: {e}")
-            return False
-            
-    def _find_file_in_music(self, file_name):
-        """Procura arquivo em /media/music usando find"""
-        try:
-            # Extrair apenas o nome do arquivo
-            base_name = os.path.basename(file_name.replace('\\', '/'))
-            
-            cmd = ["find", self.music_path, "-type", "f", "-name", f"*{base_name}"]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            files = result.stdout.strip().split('\n')
-            return Path(files[0]) if files and files[0] else None
-            
-        except subprocess.CalledProcessError:
-            return None
+        # Pastas antigas que ficaram vazias, uma vez por pasta
+        for directory in {Path(source).parent for group in plan['groups'].values()
+                          for source, _ in group}:
+            self._cleanup_empty_dirs(directory)
+        
+        fixed = plan['in_place'] + stats['moved']
+        errors = stats['failed'] + len(plan['missing']) + len(plan['invalid'])
+                
+        print(f"\n✅ Corrigidos: {fixed}")
+        print(f"❌ Erros: {errors}")
         
     def _cleanup_empty_dirs(self, path):
         """Remove pastas vazias"""
@@ -0,0 +1,168 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Marca de fim de fluxo entre estágios
+_STOP = object()
+
+
+class Finished:
+    """Resultado final de um item: encerra o item sem passar pelos próximos estágios"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class PeerLimiter:
+    """Limita quantos downloads simultâneos são feitos de um mesmo usuário"""
+
+    def __init__(self, max_per_peer: int):
+        self.max_per_peer = max_per_peer
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, username: str):
+        """Ocupa uma vaga do usuário enquanto o bloco executa"""
+        if self.max_per_peer <= 0 or not username:
+            yield
+            return
+
+        with self._lock:
+            semaphore = self._semaphores.get(username)
+            if semaphore is None:
+                semaphore = threading.Semaphore(self.max_per_peer)
+                self._semaphores[username] = semaphore
+
+        with semaphore:
+            yield
+
+
+class LinePipeline:
+    """Pipeline de estágios com pools de threads ligados por filas limitadas.
+
+    Cada estágio é (nome, função, workers). A função recebe o valor produzido
+    pelo estágio anterior e devolve o valor do próximo estágio, ou Finished
+    para encerrar o item antes do fim. O valor do último estágio é o resultado
+    do item. As filas entre estágios têm tamanho máximo queue_size, então um
+    estágio lento (downloads) segura os anteriores (buscas) em vez de acumular
+    trabalho adiantado.
+
+    on_result(index, item, value) é chamado na thread de run() à medida que
+    os itens terminam (fora de ordem). Exceções de um estágio viram o valor
+    devolvido por on_error(item, exc).
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Tuple[str, Callable[[Any], Any], int]],
+        queue_size: int = 4,
+        on_error: Optional[Callable[[Any, Exception], Any]] = None,
+    ):
+        if not stages:
+            raise ValueError("Pipeline precisa de pelo menos um estágio")
+        self.stages = [(name, func, max(1, workers)) for name, func, workers in stages]
+        self.queue_size = max(1, queue_size)
+        self.on_error = on_error
+
+    def map(self, items: Iterable) -> List[Any]:
+        """Processa todos os itens e devolve os resultados na ordem de entrada"""
+        results: Dict[int, Any] = {}
+        total = self.run(items, lambda index, item, value: results.__setitem__(index, value))
+        return [results[index] for index in range(total)]
+
+    def run(self, items: Iterable, on_result: Callable[[int, Any, Any], None]) -> int:
+        """Executa o pipeline. Retorna quantos itens foram processados"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        # Fila de resultados sem limite: consumida continuamente por esta thread
+        done_queue: queue.Queue = queue.Queue()
+        remaining_workers = [workers for _, _, workers in self.stages]
+        exit_lock = threading.Lock()
+        threads = []
+
+        def finish_worker(stage_index: int):
+            # Último worker do estágio propaga o fim para o próximo
+            with exit_lock:
+                remaining_workers[stage_index] -= 1
+                last = remaining_workers[stage_index] == 0
+            if not last:
+                return
+            if stage_index + 1 < len(self.stages):
+                for _ in range(self.stages[stage_index + 1][2]):
+                    queues[stage_index + 1].put(_STOP)
+            else:
+                done_queue.put(_STOP)
+
+        def worker(stage_index: int):
+            _, func, _ = self.stages[stage_index]
+            is_last = stage_index + 1 == len(self.stages)
+            inbox = queues[stage_index]
+
+            while True:
+                job = inbox.get()
+                if job is _STOP:
+                    finish_worker(stage_index)
+                    return
+
+                index, item, value = job
+                try:
+                    value = func(value)
+                except Exception as e:
+                    value = Finished(self._handle_error(item, e))
+
+                if isinstance(value, Finished):
+                    done_queue.put((index, item, value.value))
+                elif is_last:
+                    done_queue.put((index, item, value))
+                else:
+                    queues[stage_index + 1].put((index, item, value))
+
+        feed_state = {"count": 0, "error": None}
+
+        def feeder():
+            try:
+                for index, item in enumerate(items):
+                    queues[0].put((index, item, item))
+                    feed_state["count"] = index + 1
+            except Exception as e:
+                feed_state["error"] = e
+            finally:
+                for _ in range(self.stages[0][2]):
+                    queues[0].put(_STOP)
+
+        for stage_index, (name, _, workers) in enumerate(self.stages):
+            for number in range(workers):
+                thread = threading.Thread(
+                    target=worker,
+                    args=(stage_index,),
+                    name=f"pipeline-{name}-{number}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        feed_thread = threading.Thread(target=feeder, name="pipeline-feeder", daemon=True)
+        feed_thread.start()
+
+        while True:
+            job = done_queue.get()
+            if job is _STOP:
+                break
+            on_result(*job)
+
+        feed_thread.join()
+        for thread in threads:
+            thread.join()
+
+        if feed_state["error"] is not None:
+            raise feed_state["error"]
+        return feed_state["count"]
+
+    def _handle_error(self, item: Any, error: Exception) -> Any:
+        if self.on_error is None:
+            print(f"❌ Erro no pipeline ({item}): {error}")
+            return None
+        return self.on_error(item, error)
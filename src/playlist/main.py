@@ -9,12 +9,15 @@ Uso:
     python main.py                    # Processamento normal
     python main.py --verbose         # Com logs detalhados  
     python main.py --status          # Apenas estatísticas
+    python main.py --daemon          # Observa a pasta de playlists
     python main.py --help            # Ajuda
 """
 
 import sys
 import argparse
 import os
+import signal
+import threading
 from pathlib import Path
 
 # Adicionar diretório src ao path para imports
@@ -83,6 +86,19 @@ def show_status():
         print(f"❌ Erro ao obter status: {e}")
         sys.exit(1)
 
+def run_daemon(processor):
+    """Executa o processador em modo daemon até SIGTERM/SIGINT"""
+    stop_event = threading.Event()
+    
+    def request_stop(signum, frame):
+        print(f"\n⏹️ Sinal {signum} recebido, encerrando após o arquivo atual...")
+        stop_event.set()
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    
+    processor.watch_playlists(stop_event)
+
 def main():
     """Função principal"""
     parser = argparse.ArgumentParser(
@@ -93,6 +109,7 @@ Exemplos:
   python main.py                    # Processamento normal
   python main.py --verbose         # Com logs detalhados
   python main.py --status          # Apenas estatísticas
+  python main.py --daemon          # Processa playlists assim que chegam
   
 Configuração:
   Configure as variáveis no arquivo .env na raiz do projeto.
@@ -114,6 +131,12 @@ Mais informações:
         help='Mostra apenas estatísticas do sistema'
     )
     
+    parser.add_argument(
+        '--daemon', '-d',
+        action='store_true',
+        help='Fica em execução observando a pasta de playlists (substitui o cron)'
+    )
+    
     args = parser.parse_args()
     
     # Configurar ambiente
@@ -132,7 +155,11 @@ Mais informações:
     try:
         # Executar processamento
         processor = PlaylistProcessor()
-        processor.process_all_playlists()
+        
+        if args.daemon:
+            run_daemon(processor)
+        else:
+            processor.process_all_playlists()
         
     except KeyboardInterrupt:
         print("\n⏹️ Processamento interrompido pelo usuário")
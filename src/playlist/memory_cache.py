@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class LRUMemoryCache:
+    """Cache LRU em memória limitado por bytes, com expiração por entrada.
+
+    Cada entrada guarda o valor, o instante de expiração (timestamp) e um
+    tamanho estimado em bytes. Ao ultrapassar max_bytes (ou max_entries) as
+    entradas menos usadas recentemente são descartadas. Entradas maiores que
+    o orçamento inteiro não são guardadas.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor (e marca como recente) ou None se ausente/expirado"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int, expires_at: float):
+        """Guarda valor com tamanho estimado e expiração (timestamp)"""
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            # Não cabe no orçamento: mantém apenas no SQLite
+            self.invalidate(key)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, expires_at, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes or (
+                self.max_entries and len(self._entries) > self.max_entries
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Remove uma entrada se existir"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def sweep(self) -> int:
+        """Remove entradas expiradas. Retorna quantas foram removidas"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de efetividade do cache"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
@@ -13,6 +13,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from .database_manager import connect_database
+
 class MetricsCollector:
     """Coletor de métricas do sistema"""
     
@@ -47,7 +49,7 @@ class MetricsCollector:
             if not os.path.exists(self.db_path):
                 return {'error': 'Database not found'}
                 
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
             # Estatísticas básicas
@@ -70,6 +72,15 @@ class MetricsCollector:
             cursor.execute("SELECT COUNT(*) FROM search_cache WHERE expires_at > datetime('now')")
             valid_cache_entries = cursor.fetchone()[0]
             
+            # Hits/misses reais registrados pelo CacheManager
+            try:
+                cursor.execute("SELECT name, value FROM cache_stats")
+                cache_counters = dict(cursor.fetchall())
+            except sqlite3.OperationalError:
+                cache_counters = {}
+            cache_hits = cache_counters.get('hits', 0)
+            cache_misses = cache_counters.get('misses', 0)
+            
             # Tamanho do banco
             db_size_bytes = os.path.getsize(self.db_path)
             
@@ -97,7 +108,8 @@ class MetricsCollector:
             conn.close()
             
             success_rate = successful_downloads / total_downloads if total_downloads > 0 else 0
-            cache_hit_rate = valid_cache_entries / cache_entries if cache_entries > 0 else 0
+            cache_lookups = cache_hits + cache_misses
+            cache_hit_rate = cache_hits / cache_lookups if cache_lookups > 0 else 0
             
             return {
                 'timestamp': datetime.now().isoformat(),
@@ -108,6 +120,9 @@ class MetricsCollector:
                 'success_rate': round(success_rate, 3),
                 'cache_entries': cache_entries,
                 'valid_cache_entries': valid_cache_entries,
+                'cache_hits': cache_hits,
+                'cache_misses': cache_misses,
+                'cache_evictions': cache_counters.get('evictions', 0),
                 'cache_hit_rate': round(cache_hit_rate, 3),
                 'database_size_mb': round(db_size_bytes / 1024 / 1024, 2),
                 'daily_downloads': daily_downloads,
@@ -193,7 +208,7 @@ class MetricsCollector:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
             # Estatísticas do período
@@ -392,7 +407,7 @@ class MetricsCollector:
     def _get_quality_metrics(self) -> Dict:
         """Métricas de qualidade"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
             # Distribuição de qualidade (baseado no tamanho do arquivo)
@@ -434,7 +449,7 @@ class MetricsCollector:
     def _check_recent_activity(self) -> bool:
         """Verifica se houve atividade recente"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
             cursor.execute("""
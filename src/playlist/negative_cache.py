@@ -0,0 +1,69 @@
+import hashlib
+import os
+import time
+from typing import Callable, Optional
+
+
+class NegativeCache:
+    """Cache de buscas sem resultado, com TTL crescente a cada nova falha.
+
+    A primeira falha bloqueia novas tentativas por NEGATIVE_CACHE_TTL_MINUTES;
+    cada falha seguinte dobra o prazo, até NEGATIVE_CACHE_MAX_HOURS. Entradas
+    ficam no SQLite para valer entre execuções do processador. Chaves têm um
+    tipo ("query" para termos de busca, "line" para linhas de playlist).
+    """
+
+    def __init__(self, db_manager, base_ttl_minutes: float = None, max_ttl_hours: float = None):
+        self.db_manager = db_manager
+        if base_ttl_minutes is None:
+            base_ttl_minutes = float(os.getenv('NEGATIVE_CACHE_TTL_MINUTES', 60))
+        if max_ttl_hours is None:
+            max_ttl_hours = float(os.getenv('NEGATIVE_CACHE_MAX_HOURS', 168))
+        self.base_ttl = base_ttl_minutes * 60
+        self.max_ttl = max_ttl_hours * 3600
+
+    @property
+    def enabled(self) -> bool:
+        return self.base_ttl > 0
+
+    def get_key(self, text: str, kind: str = 'query') -> str:
+        return hashlib.sha256(f"{kind}:{text}".encode('utf-8')).hexdigest()
+
+    def is_negative(self, text: str, kind: str = 'query', seed: Callable[[], Optional[tuple]] = None) -> bool:
+        """True se uma falha recente ainda bloqueia nova tentativa.
+        
+        seed() é consultado quando não há entrada: devolve (falhas, momento
+        da última) de um histórico anterior ao cache negativo, e a entrada é
+        criada com o prazo contado a partir dessa falha.
+        """
+        if not self.enabled:
+            return False
+        key = self.get_key(text, kind)
+        entry = self.db_manager.get_negative_cache(key)
+        if not entry and seed is not None:
+            failure = seed()
+            if failure:
+                miss_count, failed_at = failure
+                entry = {'miss_count': miss_count, 'expires_at': failed_at + self._ttl(miss_count)}
+                self.db_manager.save_negative_cache(key, text, miss_count, entry['expires_at'])
+        return bool(entry) and time.time() < entry['expires_at']
+
+    def record_miss(self, text: str, kind: str = 'query') -> float:
+        """Registra nova falha. Retorna o TTL aplicado (segundos)"""
+        if not self.enabled:
+            return 0
+        key = self.get_key(text, kind)
+        entry = self.db_manager.get_negative_cache(key)
+        miss_count = (entry['miss_count'] if entry else 0) + 1
+
+        ttl = self._ttl(miss_count)
+        self.db_manager.save_negative_cache(key, text, miss_count, time.time() + ttl)
+        return ttl
+
+    def _ttl(self, miss_count: int) -> float:
+        return min(self.base_ttl * 2 ** min(miss_count - 1, 32), self.max_ttl)
+
+    def clear(self, text: str, kind: str = 'query'):
+        """Remove o bloqueio (a busca voltou a ter resultados)"""
+        if self.enabled:
+            self.db_manager.delete_negative_cache(self.get_key(text, kind))
@@ -11,6 +11,7 @@ from pathlib import Path
 # Adicionar src ao path para imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from playlist.batch_organizer import BatchOrganizer
 from playlist.database_manager import DatabaseManager
 from playlist.file_organizer import FileOrganizer
 
@@ -20,7 +21,7 @@ logger = logging.getLogger(__name__)
 class DownloadedFilesOrganizer:
     def __init__(self, db_path="/app/data/downloads.db"):
         self.db_manager = DatabaseManager(db_path)
-        self.file_organizer = FileOrganizer()
+        self.file_organizer = FileOrganizer(db_manager=self.db_manager)
         
     def organize_all_downloaded(self):
         """Organiza todos os arquivos baixados com sucesso"""
@@ -32,43 +33,28 @@ class DownloadedFilesOrganizer:
             
         print(f"📦 Encontrados {len(downloads)} downloads para organizar")
         
-        organized = 0
-        failed = 0
+        batch = BatchOrganizer(
+            self.file_organizer.slskd_index,
+            self.file_organizer.music_path,
+            self.file_organizer._sanitize_name,
+            db_manager=self.db_manager,
+        )
+        plan = batch.plan(downloads, self._parse_file_line)
         
-        for download in downloads:
-            if self._organize_download(download):
-                organized += 1
-            else:
-                failed += 1
-                
-        print(f"\n✅ Organizados: {organized}")
-        print(f"❌ Falharam: {failed}")
+        for download in plan['invalid']:
+            print(f"⚠️ Não foi possível extrair artista/álbum: {download.get('file_line', '')}")
+        for download in plan['missing']:
+            print(f"❌ Arquivo não encontrado: {os.path.basename(download.get('filename', ''))}")
         
-    def _organize_download(self, download):
-        """Organiza um download específico"""
-        filename = download.get('filename', '')
-        file_line = download.get('file_line', '')
+        pending = sum(len(group) for group in plan['groups'].values())
+        print(f"🗂️ {pending} arquivos para mover em {len(plan['groups'])} pastas "
+              f"({plan['in_place']} já organizados)")
         
-        if not filename or not file_line:
-            return False
-            
-        # Parse da linha para extrair artista e álbum
-        artist, album, song = self._parse_file_line(file_line)
-        
-        if not artist or not album:
-            print(f"⚠️ Não foi possível extrair artista/álbum: {file_line}")
-            return False
-            
-        print(f"🎵 Organizando: {artist} - {album} - {song}")
+        stats = batch.execute(plan)
         
-        success = self.file_organizer.organize_file(filename, artist, album)
-        
-        if success:
-            print(f"✅ Organizado: {os.path.basename(filename)}")
-        else:
-            print(f"❌ Falhou: {os.path.basename(filename)}")
-            
-        return success
+        print(f"\n✅ Organizados: {stats['moved']}")
+        print(f"⏭️ Já organizados: {plan['in_place']}")
+        print(f"❌ Falharam: {stats['failed'] + len(plan['missing']) + len(plan['invalid'])}")
         
     def _parse_file_line(self, file_line):
         """Extrai artista, álbum e música da linha do arquivo"""
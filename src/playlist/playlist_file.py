@@ -0,0 +1,103 @@
+import os
+import stat
+import tempfile
+from typing import Iterable, Iterator
+
+
+class PlaylistLineSource:
+    """Itera as linhas não vazias de uma playlist sem carregar o arquivo inteiro.
+
+    O arquivo é lido linha a linha em modo binário; offset guarda quantos
+    bytes já foram consumidos, o que permite mostrar o progresso por tamanho
+    em playlists grandes (dumps do Last.fm com 100k+ linhas) sem contá-las
+    antes. Linhas são devolvidas sem espaços nas pontas.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.size = os.path.getsize(file_path)
+        self.offset = 0
+        self.line_number = 0
+
+    def __iter__(self) -> Iterator[str]:
+        self.offset = 0
+        self.line_number = 0
+        with open(self.file_path, "rb") as f:
+            for raw in f:
+                self.offset += len(raw)
+                line = raw.decode("utf-8").strip()
+                if line:
+                    self.line_number += 1
+                    yield line
+
+    @property
+    def progress(self) -> float:
+        """Fração do arquivo já lida (0.0 a 1.0)"""
+        return self.offset / self.size if self.size else 1.0
+
+    def has_lines(self) -> bool:
+        """True se existe pelo menos uma linha não vazia"""
+        for _ in PlaylistLineSource(self.file_path):
+            return True
+        return False
+
+
+class RemainingLinesWriter:
+    """Grava as linhas que continuam na playlist em um arquivo temporário.
+
+    Usado como context manager: as linhas vão direto para o disco (memória
+    constante) e, ao sair do bloco sem erro, o temporário substitui o
+    original com rename. Com erro, o original fica intacto.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.count = 0
+        self._file = None
+        self._temp_path = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, self._temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.file_path)}.", suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        return self
+
+    def write(self, line: str):
+        self._file.write(line + "\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self._copy_mode()
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+            if exc_type is None:
+                os.replace(self._temp_path, self.file_path)
+        finally:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+        return False
+
+    def _copy_mode(self):
+        """mkstemp cria 0600: mantém as permissões da playlist (pasta compartilhada)"""
+        try:
+            mode = stat.S_IMODE(os.stat(self.file_path).st_mode)
+        except FileNotFoundError:
+            return
+        os.fchmod(self._file.fileno(), mode)
+
+
+def write_lines_atomic(file_path: str, lines: Iterable[str]) -> int:
+    """Grava linhas em arquivo temporário e substitui o original com rename.
+
+    Um crash durante a escrita deixa o arquivo antigo intacto. Retorna
+    quantas linhas foram gravadas.
+    """
+    with RemainingLinesWriter(file_path) as writer:
+        for line in lines:
+            writer.write(line)
+    return writer.count
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Set
+
+from .playlist_file import PlaylistLineSource, RemainingLinesWriter
+
+
+class PlaylistJournal:
+    """Diário de progresso de um arquivo de playlist no SQLite.
+
+    Cada linha concluída é registrada com seu resultado assim que termina.
+    Se o processo cair no meio do arquivo, a próxima execução pula as linhas
+    já registradas. Periodicamente o arquivo é compactado: as linhas
+    concluídas com sucesso saem do .txt com escrita atômica (temp + rename).
+    A compactação ocorre a cada compact_interval segundos, ou quando as
+    linhas removidas somam compact_every_lines e ao menos compact_fraction
+    do tamanho do arquivo: cada reescrita lê o arquivo inteiro, e o limite
+    proporcional mantém o custo total linear em arquivos grandes.
+
+    Os resultados ficam só no banco; em memória fica apenas o conjunto de
+    linhas removidas desde a última compactação.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        file_path: str,
+        compact_every_lines: int = None,
+        compact_interval: float = None,
+        compact_fraction: float = None,
+    ):
+        self.db_manager = db_manager
+        self.file_path = os.path.abspath(file_path)
+        if compact_every_lines is None:
+            compact_every_lines = int(os.getenv("PLAYLIST_COMPACT_EVERY_LINES", 25))
+        if compact_interval is None:
+            compact_interval = float(os.getenv("PLAYLIST_COMPACT_INTERVAL_SECONDS", 60))
+        if compact_fraction is None:
+            compact_fraction = float(os.getenv("PLAYLIST_COMPACT_FRACTION", 0.1))
+        self.compact_every_lines = compact_every_lines
+        self.compact_interval = compact_interval
+        self.compact_fraction = compact_fraction
+        self.compactions = 0
+
+        self.resumed_lines = self.db_manager.count_playlist_journal(self.file_path)
+        self._removed: Set[str] = set()
+        self._removed_bytes = 0
+        self._file_size = self._current_size()
+        self._lock = threading.Lock()
+        self._last_compaction = time.time()
+
+    @property
+    def resumed(self) -> bool:
+        return self.resumed_lines > 0
+
+    def outcome(self, file_line: str) -> Optional[bool]:
+        """Resultado registrado da linha (True = sai do arquivo) ou None"""
+        return self.db_manager.get_playlist_line(self.file_path, file_line)
+
+    def pending(self, lines: Iterable[str]) -> Iterator[str]:
+        """Filtra as linhas ainda não concluídas.
+
+        Linhas concluídas com sucesso antes de uma queda (ou repetidas mais
+        adiante no arquivo) são marcadas para sair na próxima compactação.
+        """
+        for line in lines:
+            outcome = self.outcome(line)
+            if outcome is None:
+                yield line
+            elif outcome:
+                with self._lock:
+                    self._mark_removed(line)
+
+    def record(self, file_line: str, success: bool):
+        """Registra o resultado da linha e compacta o arquivo se for a hora"""
+        self.db_manager.record_playlist_line(self.file_path, file_line, success)
+        with self._lock:
+            if success:
+                self._mark_removed(file_line)
+            due = bool(self._removed) and self._compaction_due()
+
+        if due:
+            self.compact()
+
+    def compact(self) -> int:
+        """Reescreve o arquivo sem as linhas concluídas. Retorna linhas restantes"""
+        with self._lock:
+            removed = set(self._removed)
+
+        with RemainingLinesWriter(self.file_path) as writer:
+            for line in PlaylistLineSource(self.file_path):
+                if line not in removed:
+                    writer.write(line)
+
+        with self._lock:
+            self._removed -= removed
+            self._removed_bytes = sum(_line_bytes(line) for line in self._removed)
+        self._file_size = self._current_size()
+        self._last_compaction = time.time()
+        self.compactions += 1
+        return writer.count
+
+    def clear(self):
+        """Encerra o diário (arquivo concluído ou removido)"""
+        self.db_manager.clear_playlist_journal(self.file_path)
+        with self._lock:
+            self._removed = set()
+            self._removed_bytes = 0
+        self.resumed_lines = 0
+
+    def _mark_removed(self, line: str):
+        if line not in self._removed:
+            self._removed.add(line)
+            self._removed_bytes += _line_bytes(line)
+
+    def _current_size(self) -> int:
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return 0
+
+    def _compaction_due(self) -> bool:
+        if (
+            self.compact_every_lines > 0
+            and len(self._removed) >= self.compact_every_lines
+            and self._removed_bytes >= self.compact_fraction * self._file_size
+        ):
+            return True
+        return (
+            self.compact_interval > 0
+            and time.time() - self._last_compaction >= self.compact_interval
+        )
+
+
+def _line_bytes(line: str) -> int:
+    """Bytes que a linha ocupa no arquivo (com a quebra de linha)"""
+    return len(line.encode("utf-8")) + 1
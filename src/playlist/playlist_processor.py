@@ -1,14 +1,30 @@
 import glob
 import os
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from .database_manager import DatabaseManager
+from .download_monitor import RESULT_QUEUE_TIMEOUT, STATE_SUCCEEDED, DownloadMonitor
 from .duplicate_detector import DuplicateDetector
 from .file_organizer import FileOrganizer
+from .line_pipeline import Finished, LinePipeline, PeerLimiter
+from .negative_cache import NegativeCache
+from .playlist_file import PlaylistLineSource, write_lines_atomic
+from .playlist_journal import PlaylistJournal
+from .playlist_watcher import PlaylistWatcher
 from .process_lock import ProcessLock
 from .slskd_api_client import SlskdApiClient
 
+try:
+    from ..utils.search_query import canonicalize_query
+except ImportError:
+    # Executado como pacote de topo (src/ no sys.path)
+    from utils.search_query import canonicalize_query
+
+# Intervalo (em linhas concluídas) das mensagens de progresso do arquivo
+PROGRESS_EVERY_LINES = 100
+
 
 class PlaylistProcessor:
     def __init__(self):
@@ -18,13 +34,26 @@ class PlaylistProcessor:
         self.lock_path = os.getenv("PROCESSOR_LOCK_PATH", "/app/processor.lock")
         self.file_pause = int(os.getenv("FILE_PROCESSING_PAUSE_SECONDS", 30))
         self.queue_timeout = int(os.getenv("QUEUE_TIMEOUT_MINUTES", 5))
+        self.max_concurrent_downloads = max(
+            1, int(os.getenv("MAX_CONCURRENT_DOWNLOADS", 1))
+        )
+        # Pools do pipeline de linhas (downloads usam MAX_CONCURRENT_DOWNLOADS)
+        self.prepare_workers = int(os.getenv("PIPELINE_PREPARE_WORKERS", 1))
+        self.search_workers = int(os.getenv("PIPELINE_SEARCH_WORKERS", 2))
+        self.rank_workers = int(os.getenv("PIPELINE_RANK_WORKERS", 1))
+        self.pipeline_queue_size = int(
+            os.getenv("PIPELINE_QUEUE_SIZE", 2 * self.max_concurrent_downloads)
+        )
+        self.peer_limiter = PeerLimiter(int(os.getenv("MAX_DOWNLOADS_PER_PEER", 1)))
 
         # Inicializar componentes
         self.db_manager = DatabaseManager(self.db_path)
         self.duplicate_detector = DuplicateDetector(self.db_manager)
         self.slskd_client = SlskdApiClient(self.db_manager)
         self.process_lock = ProcessLock(self.lock_path)
-        self.file_organizer = FileOrganizer()
+        self.file_organizer = FileOrganizer(db_manager=self.db_manager)
+        self.download_monitor = DownloadMonitor(self.slskd_client)
+        self.negative_cache = NegativeCache(self.db_manager)
 
         # Estatísticas
         self.stats = {
@@ -35,6 +64,7 @@ class PlaylistProcessor:
             "duplicates_found": 0,
             "errors": 0,
         }
+        self._stats_lock = threading.Lock()
 
     def process_all_playlists(self):
         """Processa todas as playlists na pasta"""
@@ -51,11 +81,16 @@ class PlaylistProcessor:
 
                 print(f"📁 Encontrados {len(playlist_files)} arquivos para processar")
 
-                for file_path in playlist_files:
+                # Diários de arquivos que sumiram desde a última execução
+                self.db_manager.prune_playlist_journal(
+                    [os.path.abspath(path) for path in playlist_files]
+                )
+
+                for position, file_path in enumerate(playlist_files, 1):
                     self.process_playlist_file(file_path)
 
-                    # Pausa entre arquivos
-                    if self.file_pause > 0:
+                    # Pausa entre arquivos (desnecessária após o último)
+                    if self.file_pause > 0 and position < len(playlist_files):
                         print(
                             f"⏸️ Pausando {self.file_pause}s antes do próximo arquivo..."
                         )
@@ -67,49 +102,242 @@ class PlaylistProcessor:
             print(f"🔒 {e}")
         except Exception as e:
             print(f"❌ Erro durante processamento: {e}")
-            self.stats["errors"] += 1
+            self._increment_stat("errors")
+        finally:
+            self._flush_cache()
+
+    def _flush_cache(self):
+        """Para a limpeza do cache e grava hits/misses ainda em memória.
+
+        A execução via cron termina antes da primeira limpeza periódica:
+        sem isso os acessos desde o último save seriam perdidos.
+        """
+        try:
+            self.slskd_client.cache_manager.stop_sweeper()
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar estatísticas do cache: {e}")
+
+    def _process_file_locked(self, file_path: str) -> bool:
+        """Processa um arquivo sob o lock. Retorna False se outro processo o tem"""
+        try:
+            with self.process_lock:
+                self.process_playlist_file(file_path)
+                return True
+        except RuntimeError as e:
+            print(f"🔒 {e}")
+            return False
+
+    def watch_playlists(self, stop_event: Optional[threading.Event] = None, watcher=None):
+        """Modo daemon: processa playlists assim que aparecem ou mudam.
+
+        Usa inotify (ou polling por mtime) para detectar arquivos novos,
+        com debounce e prioridade para arquivos menores. A cada
+        PLAYLIST_RESCAN_MINUTES todos os arquivos são reavaliados, para
+        tentar de novo linhas que falharam.
+        """
+        stop_event = stop_event or threading.Event()
+        watcher = watcher or PlaylistWatcher(self.playlist_path)
+        rescan_interval = float(os.getenv("PLAYLIST_RESCAN_MINUTES", 30)) * 60
+        lock_retry = float(os.getenv("PLAYLIST_LOCK_RETRY_SECONDS", 60))
+
+        print(
+            f"👁️ Observando {self.playlist_path} ({watcher.backend.name}, "
+            f"debounce {watcher.debounce:.0f}s)"
+        )
+        watcher.enqueue_all()
+        next_rescan = time.time() + rescan_interval
+        last_file_at = 0.0
+
+        try:
+            while not stop_event.is_set():
+                if rescan_interval > 0 and time.time() >= next_rescan:
+                    watcher.enqueue_all()
+                    next_rescan = time.time() + rescan_interval
+
+                file_path = watcher.next_ready(timeout=1.0)
+                if not file_path:
+                    continue
+
+                # Mesma pausa entre arquivos do modo cron
+                pause = last_file_at + self.file_pause - time.time()
+                if pause > 0 and stop_event.wait(pause):
+                    watcher.requeue(file_path, 0)
+                    break
+
+                if not self._process_file_locked(file_path):
+                    watcher.requeue(file_path, lock_retry)
+                    continue
+
+                watcher.mark_processed(file_path)
+                last_file_at = time.time()
+        finally:
+            watcher.close()
+            self._flush_cache()
+            self._print_final_stats()
 
     def process_playlist_file(self, file_path: str):
         """Processa um arquivo de playlist específico"""
         print(f"\n📄 Processando: {os.path.basename(file_path)}")
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = [line.strip() for line in f.readlines() if line.strip()]
+            source = PlaylistLineSource(file_path)
+            journal = PlaylistJournal(self.db_manager, file_path)
 
-            if not lines:
+            if not source.has_lines():
                 print("⚠️ Arquivo vazio, deletando...")
                 os.remove(file_path)
+                journal.clear()
                 return
 
-            processed_lines = []
-
-            for line in lines:
-                self.stats["lines_processed"] += 1
-
-                if self._process_single_line(line):
-                    # Linha processada com sucesso, não adicionar de volta
-                    continue
-                else:
-                    # Manter linha no arquivo (erro ou não encontrado)
-                    processed_lines.append(line)
-
-            # Verificar se todas as linhas foram processadas
-            if not processed_lines:
+            # Retomada após queda: linhas já registradas no diário não são
+            # processadas de novo
+            if journal.resumed:
+                print(f"♻️ Retomando arquivo: {journal.resumed_lines} linhas já concluídas")
+
+            finished_lines = 0
+
+            def line_finished(line: str, success: bool):
+                nonlocal finished_lines
+                journal.record(line, success)
+                finished_lines += 1
+                if finished_lines % PROGRESS_EVERY_LINES == 0:
+                    print(
+                        f"📍 {finished_lines} linhas concluídas "
+                        f"({source.progress:.0%} do arquivo lido)"
+                    )
+
+            # O arquivo é lido aos poucos conforme o pipeline tem vaga; cada
+            # resultado vai para o diário e linhas com sucesso saem do
+            # arquivo nas compactações periódicas
+            self._process_stream(journal.pending(source), on_line=line_finished)
+
+            # Erros e não encontrados são mantidos para tentar depois
+            remaining = journal.compact()
+            if not remaining:
                 print("✅ Todas as linhas processadas, deletando arquivo...")
                 os.remove(file_path)
             else:
-                # Reescrever arquivo apenas com linhas não processadas
-                self._update_playlist_file(file_path, processed_lines)
+                print(f"📝 Arquivo atualizado: {remaining} linhas restantes")
+            journal.clear()
 
-            self.stats["files_processed"] += 1
+            self._increment_stat("files_processed")
 
         except Exception as e:
             print(f"❌ Erro ao processar arquivo {file_path}: {e}")
-            self.stats["errors"] += 1
+            self._increment_stat("errors")
+
+    def _process_lines(self, lines: List[str]) -> List[bool]:
+        """Processa uma lista de linhas, mantendo a ordem dos resultados"""
+        if len(lines) <= 1:
+            return [self._process_line_counted(line) for line in lines]
+
+        results: Dict[str, bool] = {}
+        self._process_stream(lines, on_line=results.__setitem__)
+        return [results[line] for line in lines]
+
+    def _process_stream(
+        self,
+        lines: Iterable[str],
+        on_line: Callable[[str, bool], None],
+    ) -> int:
+        """Processa linhas no pipeline de estágios conforme são lidas.
+
+        on_line(linha, sucesso) é chamado assim que cada linha termina. Só as
+        linhas em andamento ficam em memória. Retorna quantas foram processadas.
+        """
+        in_flight: Dict[str, str] = {}
+        in_flight_lock = threading.Lock()
+
+        def feed():
+            for line in lines:
+                key = self._line_key(line)
+                with in_flight_lock:
+                    current = in_flight.get(key)
+                    if current is None:
+                        in_flight[key] = line
+                # Repetição exata de linha em andamento: não é processada;
+                # sai do arquivo junto com a original se ela tiver sucesso
+                if current != line:
+                    yield line
+
+        def finished(index: int, line: str, success: bool):
+            key = self._line_key(line)
+            with in_flight_lock:
+                if in_flight.get(key) == line:
+                    del in_flight[key]
+            on_line(line, success)
+
+        return self._create_pipeline(in_flight, in_flight_lock).run(feed(), finished)
+
+    @staticmethod
+    def _line_key(file_line: str) -> str:
+        return " ".join(file_line.casefold().split())
+
+    def _create_pipeline(self, in_flight: Dict[str, str], in_flight_lock) -> LinePipeline:
+        """Pipeline preparar -> buscar -> classificar -> baixar/monitorar.
+
+        Cada estágio tem seu pool: enquanto downloads são monitorados, as
+        próximas linhas já são buscadas e classificadas. O estágio de download
+        limita o total de downloads (MAX_CONCURRENT_DOWNLOADS) e o PeerLimiter
+        limita downloads simultâneos por usuário (MAX_DOWNLOADS_PER_PEER).
+        in_flight (chave -> linha) guarda as linhas em andamento.
+        """
+
+        def prepare(file_line: str):
+            # Mesma música já em andamento: a primeira ocorrência decide
+            key = self._line_key(file_line)
+            with in_flight_lock:
+                current = in_flight.get(key)
+            if current != file_line:
+                self._increment_stat("lines_processed")
+                print(f"🔄 Linha repetida no arquivo, removendo: {file_line}")
+                self._increment_stat("duplicates_found")
+                return Finished(True)
+            return self._prepare_line(file_line)
+
+        print(
+            f"⚡ Pipeline: {self.search_workers} busca(s), {self.rank_workers} "
+            f"classificação(ões), até {self.max_concurrent_downloads} download(s)"
+        )
+        return LinePipeline(
+            [
+                ("prepare", prepare, self.prepare_workers),
+                ("search", self._search_line, self.search_workers),
+                ("rank", self._rank_line, self.rank_workers),
+                ("transfer", self._transfer_line, self.max_concurrent_downloads),
+            ],
+            queue_size=self.pipeline_queue_size,
+            on_error=self._line_error,
+        )
+
+    def _process_line_counted(self, file_line: str) -> bool:
+        self._increment_stat("lines_processed")
+        try:
+            return self._process_single_line(file_line)
+        except Exception as e:
+            return self._line_error(file_line, e)
+
+    def _line_error(self, file_line: str, error: Exception) -> bool:
+        print(f"❌ Erro ao processar linha {file_line}: {error}")
+        self._increment_stat("errors")
+        return False
+
+    def _increment_stat(self, name: str, amount: int = 1):
+        """Incrementa estatística (seguro entre threads)"""
+        with self._stats_lock:
+            self.stats[name] += amount
 
     def _process_single_line(self, file_line: str) -> bool:
         """Processa uma linha individual. Retorna True se processada com sucesso"""
+        prepared = self._check_line(file_line)
+        if isinstance(prepared, Finished):
+            return prepared.value
+
+        _, artist, song = prepared
+        return self._finish_line(file_line, self._search_and_download(file_line, artist, song))
+
+    def _check_line(self, file_line: str):
+        """Verifica histórico da linha. Retorna Finished ou (linha, artista, música)"""
         print(f"🔍 Processando: {file_line}")
 
         # Extrair artista e música
@@ -118,17 +346,24 @@ class PlaylistProcessor:
         # Verificar se já foi baixado com SUCESSO (remove linha)
         if self.db_manager.is_downloaded(file_line):
             print(f"✅ Duplicata confirmada - removendo linha: {file_line}")
-            self.stats["duplicates_found"] += 1
-            return True  # Remove linha (já baixado com sucesso)
+            self._increment_stat("duplicates_found")
+            return Finished(True)  # Remove linha (já baixado com sucesso)
 
-        # Verificar se já tentou e falhou (NOT_FOUND) - não remove linha mas pula processamento
+        # Verificar se já tentou e falhou (NOT_FOUND ou ERROR) - não remove linha
+        # mas pula processamento enquanto o cache negativo da linha não vencer.
+        # Falhas anteriores ao cache negativo contam o prazo a partir do registro
         if self.db_manager.is_failed_download(file_line):
-            print(f"⏭️ Já tentado anteriormente (não encontrado): {file_line}")
-            return False  # Manter linha para tentar depois
+            if not self.negative_cache.enabled or self.negative_cache.is_negative(
+                file_line, "line", seed=lambda: self.db_manager.get_last_failure(file_line)
+            ):
+                print(f"⏭️ Já tentado anteriormente (não encontrado ou erro): {file_line}")
+                return Finished(False)  # Manter linha para tentar depois
+            print(f"🔁 Nova tentativa (cache negativo vencido): {file_line}")
 
-        # Buscar música
-        download_result = self._search_and_download(file_line, artist, song)
+        return file_line, artist, song
 
+    def _finish_line(self, file_line: str, download_result: str) -> bool:
+        """Registra o resultado da linha. Retorna True se ela sai do arquivo"""
         if download_result == "SUCCESS":
             return True  # Remove linha (sucesso)
         elif download_result == "NOT_FOUND":
@@ -136,13 +371,49 @@ class PlaylistProcessor:
             self.db_manager.save_download(
                 {"file_line": file_line, "filename": "", "username": ""}, "NOT_FOUND"
             )
+            self._record_line_miss(file_line)
             return False  # Manter linha
         else:
-            # Erro - manter linha para tentar depois
+            # Erro - manter linha e esperar o cache negativo antes de tentar de novo
+            self._record_line_miss(file_line)
             return False
 
+    def _record_line_miss(self, file_line: str):
+        ttl = self.negative_cache.record_miss(file_line, "line")
+        if ttl:
+            print(f"⏳ Próxima tentativa em {ttl / 3600:.1f}h: {file_line}")
+
+    # Estágios do pipeline: cada um devolve a entrada do próximo ou Finished
+
+    def _prepare_line(self, file_line: str):
+        self._increment_stat("lines_processed")
+        return self._check_line(file_line)
+
+    def _search_line(self, job: Tuple[str, str, str]):
+        file_line, artist, song = job
+        status, results = self._find_results(file_line, artist, song)
+        if status != "FOUND":
+            return Finished(self._finish_line(file_line, status))
+        return file_line, results
+
+    def _rank_line(self, job: Tuple[str, List[Dict]]):
+        file_line, results = job
+        artist, album, song = self._parse_file_line(file_line)
+        return file_line, self._get_sorted_results(results, artist, album, song)
+
+    def _transfer_line(self, job: Tuple[str, List[Dict]]) -> bool:
+        file_line, sorted_results = job
+        return self._finish_line(file_line, self._download_best(file_line, sorted_results))
+
     def _search_and_download(self, file_line: str, artist: str, song: str) -> str:
         """Busca e inicia download. Retorna: SUCCESS, NOT_FOUND, ERROR"""
+        status, results = self._find_results(file_line, artist, song)
+        if status != "FOUND":
+            return status
+        return self._try_download_with_fallback(file_line, results)
+
+    def _find_results(self, file_line: str, artist: str, song: str) -> Tuple[str, List[Dict]]:
+        """Busca com padrões progressivos. Retorna (FOUND|NOT_FOUND|ERROR, resultados)"""
 
         # Padrões de busca progressivos
         search_patterns = [
@@ -151,7 +422,14 @@ class PlaylistProcessor:
             f"{song} *.flac" if song else file_line + " *.flac",
         ]
 
+        tried = set()
         for pattern in search_patterns:
+            # Padrões equivalentes (mesma forma canônica) já foram buscados
+            canonical = canonicalize_query(pattern)
+            if canonical in tried:
+                continue
+            tried.add(canonical)
+
             print(f"🔎 Buscando: {pattern}")
 
             try:
@@ -163,19 +441,16 @@ class PlaylistProcessor:
                 # Se encontrou mais de 10 resultados, usar e parar
                 if len(results) >= 10:
                     print(f"✅ Encontrados {len(results)} resultados - usando melhor")
-                    return self._try_download_with_fallback(file_line, results)
 
-                # Filtrar e priorizar resultados
-                if results:
-                    return self._try_download_with_fallback(file_line, results)
+                return "FOUND", results
 
             except Exception as e:
                 print(f"❌ Erro na busca: {e}")
-                self.stats["errors"] += 1
-                return "ERROR"
+                self._increment_stat("errors")
+                return "ERROR", []
 
         print(f"❌ Música não encontrada: {file_line}")
-        return "NOT_FOUND"
+        return "NOT_FOUND", []
 
     def _parse_file_line(self, file_line: str) -> tuple:
         """Extrai artista, álbum e música da linha do arquivo"""
@@ -202,6 +477,10 @@ class PlaylistProcessor:
         # Extrair artista, album e música para verificação
         artist, album, song = self._parse_file_line(file_line)
         sorted_results = self._get_sorted_results(results, artist, album, song)
+        return self._download_best(file_line, sorted_results)
+
+    def _download_best(self, file_line: str, sorted_results: List[Dict]) -> str:
+        """Tenta os candidatos em ordem até um download concluir"""
         failed_users = set()
 
         for i, result in enumerate(sorted_results):
@@ -216,7 +495,9 @@ class PlaylistProcessor:
                 f"   User: {username} - Quality: {result.get('bitDepth')}bit/{result.get('sampleRate')}Hz"
             )
 
-            download_result = self._initiate_download(file_line, result)
+            # Limite por usuário: não abre vários downloads no mesmo peer
+            with self.peer_limiter.slot(username):
+                download_result = self._initiate_download(file_line, result)
 
             if download_result == "SUCCESS":
                 return "SUCCESS"
@@ -243,13 +524,10 @@ class PlaylistProcessor:
 
         # Filtrar usuários online primeiro
         print(f"🎯 DEBUG: Verificando usuários online...")
-        online_users = set()
         unique_users = set(r.get("username", "") for r in filtered)
         print(f"🎯 Encontrados {len(unique_users)} usuários únicos")
 
-        for username in unique_users:
-            if username and self.slskd_client.is_user_online(username):
-                online_users.add(username)
+        online_users = self.slskd_client.filter_online_users(unique_users)
 
         print(f"🎯 Usuários online: {len(online_users)} de {len(unique_users)}")
 
@@ -396,7 +674,7 @@ class PlaylistProcessor:
             print(f"❌ Falha ao adicionar download à fila")
             return "ERROR"
 
-        self.stats["downloads_started"] += 1
+        self._increment_stat("downloads_started")
 
         # Monitorar download
         download_info = {"id": download_id, "username": username, "filename": filename}
@@ -421,73 +699,38 @@ class PlaylistProcessor:
     ) -> str:
         """Monitora download até conclusão"""
         download_id = download_info.get("id")
-        timeout_seconds = self.queue_timeout * 60
-        start_time = time.time()
+        filename = download_info.get("filename", "")
+        base_filename = os.path.basename(filename.replace("\\", "/"))
 
         print(f"👀 Monitorando download: {download_id}")
 
-        while time.time() - start_time < timeout_seconds:
-            try:
-                status = self.slskd_client.get_download_status(download_id)
-
-                if not status:
-                    time.sleep(10)
-                    continue
-
-                state = status.get("state", "")
-                print(f"📊 Status: {state}")
-
-                if state == "Completed, Succeeded":
-                    self._handle_download_success(file_line, download_info, result)
-                    return "SUCCESS"
-
-                elif state in ["Completed, Errored", "Completed, Cancelled"]:
-                    self._handle_download_error(file_line, download_info, state)
-                    return "ERROR"
-
-                elif state == "Queued, Remotely":
-                    # Aguardar 1 minuto para mudança de status
-                    if not self._wait_for_queue_change(download_id, 60):
-                        self._handle_download_error(
-                            file_line, download_info, "Queue timeout"
-                        )
-                        return "ERROR"
-
-                elif state == "InProgress":
-                    # Continuar monitorando
-                    pass
+        try:
+            # O monitor compartilhado consulta a fila uma vez por ciclo para
+            # todos os downloads em andamento
+            future = self.download_monitor.watch(
+                download_info,
+                self.queue_timeout * 60,
+                on_state=lambda state: print(f"📊 Status ({base_filename}): {state}"),
+            )
+            state = future.result()
+        except Exception as e:
+            print(f"❌ Erro no monitoramento: {e}")
+            self._increment_stat("errors")
+            return "ERROR"
 
-                time.sleep(10)
+        if state == STATE_SUCCEEDED:
+            self._handle_download_success(file_line, download_info, result)
+            return "SUCCESS"
 
-            except Exception as e:
-                print(f"❌ Erro no monitoramento: {e}")
-                self.stats["errors"] += 1
-                return "ERROR"
+        if state == RESULT_QUEUE_TIMEOUT or state.startswith("Completed"):
+            self._handle_download_error(file_line, download_info, state)
+            return "ERROR"
 
         # Timeout - assumir sucesso
         print(f"⏰ Timeout atingido, assumindo sucesso")
         self._handle_download_success(file_line, download_info, result)
         return "SUCCESS"
 
-    def _wait_for_queue_change(self, download_id: str, timeout_seconds: int) -> bool:
-        """Aguarda mudança de status da fila remota"""
-        start_time = time.time()
-
-        while time.time() - start_time < timeout_seconds:
-            try:
-                status = self.slskd_client.get_download_status(download_id)
-                state = status.get("state", "") if status else ""
-
-                if state != "Queued, Remotely":
-                    return True  # Status mudou
-
-                time.sleep(10)
-
-            except Exception:
-                return False
-
-        return False  # Timeout sem mudança
-
     def _handle_download_success(
         self, file_line: str, download_info: Dict, result: Dict
     ):
@@ -498,18 +741,9 @@ class PlaylistProcessor:
         artist, album, song = self._parse_file_line(file_line)
         filename = download_info.get("filename", "")
         
-        # Organizar arquivo baixado
-        if artist and album and filename:
-            organize_success = self.file_organizer.organize_file(filename, artist, album)
-            if organize_success:
-                # Usar apenas nome base do arquivo no log
-                base_filename = os.path.basename(filename.replace('\\', '/'))
-                print(f"📁 Arquivo organizado: {artist}/{album}/{base_filename}")
-            else:
-                print(f"⚠️ Falha ao organizar arquivo: {filename}")
-
-        # Salvar no banco
-        self.db_manager.save_download(
+        # Salvar no banco antes de organizar: o organizador grava no
+        # registro o local final do arquivo na biblioteca
+        download_id = self.db_manager.save_download(
             {
                 "id": download_info.get("id"),
                 "username": download_info.get("username"),
@@ -523,10 +757,22 @@ class PlaylistProcessor:
             "SUCCESS",
         )
 
+        # Organizar arquivo baixado
+        if artist and album and filename:
+            organize_success = self.file_organizer.organize_file(
+                filename, artist, album, download_id=download_id
+            )
+            if organize_success:
+                # Usar apenas nome base do arquivo no log
+                base_filename = os.path.basename(filename.replace('\\', '/'))
+                print(f"📁 Arquivo organizado: {artist}/{album}/{base_filename}")
+            else:
+                print(f"⚠️ Falha ao organizar arquivo: {filename}")
+
         # Remover da fila
         self.slskd_client.remove_download(download_info.get("id"))
 
-        self.stats["downloads_completed"] += 1
+        self._increment_stat("downloads_completed")
 
     def _handle_download_error(
         self, file_line: str, download_info: Dict, error_reason: str
@@ -548,14 +794,12 @@ class PlaylistProcessor:
         # Remover da fila
         self.slskd_client.remove_download(download_info.get("id"))
 
-        self.stats["errors"] += 1
+        self._increment_stat("errors")
 
     def _update_playlist_file(self, file_path: str, remaining_lines: List[str]):
         """Atualiza arquivo removendo linhas processadas"""
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                for line in remaining_lines:
-                    f.write(line + "\n")
+            write_lines_atomic(file_path, remaining_lines)
 
             print(f"📝 Arquivo atualizado: {len(remaining_lines)} linhas restantes")
 
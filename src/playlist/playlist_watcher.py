@@ -0,0 +1,234 @@
+import ctypes
+import ctypes.util
+import glob
+import os
+import select
+import struct
+import time
+from typing import Dict, Optional, Set, Tuple
+
+# Eventos do inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Nome especial devolvido quando eventos foram perdidos: reavaliar tudo
+RESCAN_ALL = "*"
+
+
+def is_playlist_name(name: str) -> bool:
+    """Arquivos .txt visíveis (ignora temporários da compactação)"""
+    return name.endswith(".txt") and not name.startswith(".")
+
+
+class InotifyBackend:
+    """Recebe eventos do kernel (inotify via libc) para a pasta de playlists"""
+
+    name = "inotify"
+
+    def __init__(self, directory: str):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        watch = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), ctypes.c_uint32(WATCH_MASK)
+        )
+        if watch < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch falhou para {directory}")
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Aguarda eventos até timeout. Retorna nomes de arquivos alterados"""
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                names.add(RESCAN_ALL)
+            elif raw_name:
+                names.add(os.fsdecode(raw_name))
+        return names
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingBackend:
+    """Alternativa sem inotify: compara mtime/tamanho dos .txt a cada ciclo"""
+
+    name = "polling"
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def wait(self, timeout: float) -> Set[str]:
+        time.sleep(max(0.0, min(timeout, self.interval)))
+        current = self._scan()
+        changed = {
+            name for name, signature in current.items()
+            if self._snapshot.get(name) != signature
+        }
+        self._snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in glob.glob(os.path.join(self.directory, "*.txt")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[os.path.basename(path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+def create_backend(directory: str, poll_interval: float, backend: str = None):
+    """inotify quando disponível (Linux), senão polling por mtime"""
+    backend = backend or os.getenv("PLAYLIST_WATCH_BACKEND", "auto")
+    if backend != "poll":
+        try:
+            return InotifyBackend(directory)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify indisponível ({e}), usando polling a cada {poll_interval}s")
+    return PollingBackend(directory, poll_interval)
+
+
+class PlaylistWatcher:
+    """Detecta playlists novas ou alteradas e as entrega por prioridade.
+
+    Eventos de um arquivo reiniciam seu prazo de debounce: ele só fica
+    pronto depois de debounce segundos sem alterações (o arquivo terminou de
+    ser escrito). Entre os prontos, o menor arquivo sai primeiro, para que
+    pedidos pequenos (/spotify de uma música) não esperem atrás de uma
+    exportação com milhares de linhas. Arquivos cuja assinatura (mtime e
+    tamanho) não mudou desde o último processamento são ignorados, o que
+    descarta os eventos gerados pelas compactações do próprio processador.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        debounce: float = None,
+        poll_interval: float = None,
+        backend=None,
+    ):
+        self.directory = directory
+        if debounce is None:
+            debounce = float(os.getenv("PLAYLIST_WATCH_DEBOUNCE_SECONDS", 5))
+        if poll_interval is None:
+            poll_interval = float(os.getenv("PLAYLIST_WATCH_POLL_SECONDS", 10))
+        self.debounce = debounce
+        self.backend = backend or create_backend(directory, poll_interval)
+
+        # nome -> (pronto a partir de, ordem de chegada, forçado)
+        self._pending: Dict[str, Tuple[float, int, bool]] = {}
+        self._processed: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._sequence = 0
+
+    def enqueue_all(self):
+        """Agenda todos os .txt da pasta (início do daemon e reavaliações)"""
+        for path in glob.glob(os.path.join(self.directory, "*.txt")):
+            self._touch(os.path.basename(path), forced=True, delay=0)
+
+    def requeue(self, file_path: str, delay: float):
+        """Agenda de novo um arquivo que não pôde ser processado agora"""
+        self._touch(os.path.basename(file_path), forced=True, delay=delay)
+
+    def mark_processed(self, file_path: str):
+        """Guarda a assinatura do arquivo após o processamento"""
+        name = os.path.basename(file_path)
+        self._processed[name] = self._signature(name)
+
+    def next_ready(self, timeout: float) -> Optional[str]:
+        """Próximo arquivo pronto (maior prioridade) ou None após timeout"""
+        deadline = time.time() + timeout
+        while True:
+            ready = self._pop_ready()
+            if ready:
+                return ready
+
+            now = time.time()
+            if now >= deadline:
+                return None
+
+            wait = deadline - now
+            if self._pending:
+                next_due = min(due for due, _, _ in self._pending.values())
+                wait = min(wait, max(0.05, next_due - now))
+
+            for name in self.backend.wait(wait):
+                if name == RESCAN_ALL:
+                    self.enqueue_all()
+                elif is_playlist_name(name):
+                    self._touch(name, forced=False, delay=self.debounce)
+
+    def close(self):
+        self.backend.close()
+
+    def _touch(self, name: str, forced: bool, delay: float):
+        previous = self._pending.get(name)
+        if previous:
+            _, sequence, was_forced = previous
+            forced = forced or was_forced
+        else:
+            self._sequence += 1
+            sequence = self._sequence
+        self._pending[name] = (time.time() + delay, sequence, forced)
+
+    def _pop_ready(self) -> Optional[str]:
+        now = time.time()
+        candidates = []
+        for name, (due, sequence, forced) in list(self._pending.items()):
+            if due > now:
+                continue
+
+            signature = self._signature(name)
+            if signature is None or (not forced and signature == self._processed.get(name)):
+                # Removido ou sem alteração desde o último processamento
+                del self._pending[name]
+                continue
+            candidates.append((signature[1], sequence, name))
+
+        if not candidates:
+            return None
+
+        _, _, name = min(candidates)
+        del self._pending[name]
+        return os.path.join(self.directory, name)
+
+    def _signature(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,91 @@
+import json
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# Prefixo do formato colunar comprimido (versão 1)
+CODEC_MAGIC = b"RC1"
+COMPRESSION_LEVEL = 6
+
+
+def prune_results(results: List[Dict], fields: Optional[Sequence[str]]) -> List[Dict]:
+    """Mantém apenas os campos informados de cada resultado"""
+    if not fields:
+        return results
+    return [{key: result[key] for key in fields if key in result} for result in results]
+
+
+def encode_results(results: List[Dict], fields: Optional[Sequence[str]] = None) -> bytes:
+    """Serializa resultados no formato colunar comprimido"""
+    return encode_results_sized(results, fields)[0]
+
+
+def encode_results_sized(
+    results: List[Dict], fields: Optional[Sequence[str]] = None
+) -> Tuple[bytes, int]:
+    """Serializa resultados em formato colunar comprimido com zlib.
+
+    Em vez de repetir as chaves em cada dicionário, guarda a lista de chaves
+    uma vez e um array de valores por coluna. Linhas sem alguma chave são
+    registradas em "m" (coluna -> índices das linhas) para que a leitura
+    devolva exatamente os mesmos dicionários. Com fields, apenas essas
+    colunas são armazenadas. Retorna (bytes, tamanho descomprimido).
+    """
+    if fields:
+        keys = list(fields)
+    else:
+        keys = []
+        seen = set()
+        for result in results:
+            for key in result:
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+
+    columns = []
+    missing = {}
+    for index, key in enumerate(keys):
+        column = []
+        for row, result in enumerate(results):
+            if key in result:
+                column.append(result[key])
+            else:
+                column.append(None)
+                missing.setdefault(str(index), []).append(row)
+        columns.append(column)
+
+    payload = {"n": len(results), "k": keys, "c": columns}
+    if missing:
+        payload["m"] = missing
+
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return CODEC_MAGIC + zlib.compress(data, COMPRESSION_LEVEL), len(data)
+
+
+def decode_results(stored: Union[bytes, str]) -> List[Dict]:
+    """Lê resultados no formato colunar (ou JSON de linhas legado)"""
+    return decode_results_sized(stored)[0]
+
+
+def decode_results_sized(stored: Union[bytes, str]) -> Tuple[List[Dict], int]:
+    """Lê resultados e retorna (linhas, tamanho descomprimido)"""
+    if isinstance(stored, str):
+        # Entradas gravadas antes do formato comprimido
+        return json.loads(stored), len(stored)
+
+    stored = bytes(stored)
+    if not stored.startswith(CODEC_MAGIC):
+        return json.loads(stored.decode("utf-8")), len(stored)
+
+    data = zlib.decompress(stored[len(CODEC_MAGIC):])
+    payload = json.loads(data)
+    keys = payload["k"]
+    rows = [dict(zip(keys, values)) for values in zip(*payload["c"])] if keys else [
+        {} for _ in range(payload["n"])
+    ]
+
+    for index, missing_rows in payload.get("m", {}).items():
+        key = keys[int(index)]
+        for row in missing_rows:
+            del rows[row][key]
+
+    return rows, len(data)
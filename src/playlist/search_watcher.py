@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+
+class _PendingSearch:
+    """Busca aguardando isComplete"""
+
+    def __init__(self, search_id: str, timeout: float, interval: float):
+        self.search_id = search_id
+        self.started_at = time.time()
+        self.deadline = self.started_at + timeout
+        self.interval = interval
+        self.next_poll = self.started_at
+        self.future: Future = Future()
+
+
+class SearchCompletionWatcher:
+    """Acompanha buscas do slskd e resolve um Future quando isComplete vira True.
+
+    Com poucas buscas pendentes, cada uma é consultada pelo ID
+    (searches.state) com backoff adaptativo: começa rápido e cresce até
+    SEARCH_POLL_MAX_INTERVAL segundos. Com muitas buscas simultâneas, uma
+    única listagem (searches.get_all) por ciclo é compartilhada por todas.
+    """
+
+    def __init__(
+        self,
+        api,
+        min_interval: float = None,
+        max_interval: float = None,
+        snapshot_threshold: int = None,
+    ):
+        self.api = api
+        self.min_interval = min_interval or float(
+            os.getenv("SEARCH_POLL_MIN_INTERVAL", 0.25)
+        )
+        self.max_interval = max_interval or float(
+            os.getenv("SEARCH_POLL_MAX_INTERVAL", 1.0)
+        )
+        self.snapshot_threshold = snapshot_threshold or int(
+            os.getenv("SEARCH_POLL_SNAPSHOT_THRESHOLD", 4)
+        )
+        self.backoff_factor = 1.5
+
+        self._pending: List[_PendingSearch] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, search_id: str, timeout: float) -> Future:
+        """Registra busca e retorna Future com o estado final da busca"""
+        pending = _PendingSearch(search_id, timeout, self.min_interval)
+
+        with self._lock:
+            self._pending.append(pending)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="search-watcher", daemon=True
+                )
+                self._thread.start()
+
+        self._wakeup.set()
+        return pending.future
+
+    def wait(self, search_id: str, timeout: float) -> Dict:
+        """Bloqueia até a busca completar. Lança TimeoutError no timeout"""
+        return self.watch(search_id, timeout).result()
+
+    def poll_once(self) -> Optional[float]:
+        """Consulta as buscas vencidas. Retorna segundos até o próximo ciclo"""
+        now = time.time()
+        with self._lock:
+            pending = list(self._pending)
+
+        due = [p for p in pending if p.next_poll <= now]
+        if due:
+            use_snapshot = len(pending) >= self.snapshot_threshold
+            states = self._fetch_states(due, use_snapshot)
+            now = time.time()
+
+            for search in due:
+                state = states.get(search.search_id)
+                if state and state.get("isComplete") is True:
+                    self._finish(search, result=state)
+                elif now >= search.deadline:
+                    elapsed = int(now - search.started_at)
+                    message = (
+                        f"Timeout ({elapsed}s) aguardando conclusão "
+                        f"da busca {search.search_id}"
+                    )
+                    self._finish(search, error=TimeoutError(message))
+                else:
+                    search.interval = min(
+                        search.interval * self.backoff_factor, self.max_interval
+                    )
+                    search.next_poll = now + search.interval
+
+        with self._lock:
+            if not self._pending:
+                return None
+            next_poll = min(min(p.next_poll, p.deadline) for p in self._pending)
+
+        return max(0.0, next_poll - time.time())
+
+    def _fetch_states(
+        self, due: List[_PendingSearch], use_snapshot: bool
+    ) -> Dict[str, Dict]:
+        """Obtém estado das buscas (listagem única ou consulta por ID)"""
+        states = {}
+
+        if use_snapshot:
+            try:
+                wanted = {p.search_id for p in due}
+                for search in self.api.searches.get_all():
+                    if search.get("id") in wanted:
+                        states[search["id"]] = search
+            except Exception as e:
+                print(f"❌ Erro ao listar buscas: {e}")
+            return states
+
+        for pending in due:
+            try:
+                states[pending.search_id] = self.api.searches.state(pending.search_id)
+            except Exception as e:
+                print(f"❌ Erro ao verificar status da busca {pending.search_id}: {e}")
+
+        return states
+
+    def _finish(
+        self, pending: _PendingSearch, result: Dict = None, error: Exception = None
+    ):
+        with self._lock:
+            if pending in self._pending:
+                self._pending.remove(pending)
+
+        if pending.future.done():
+            return
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(result)
+
+    def _run(self):
+        """Loop da thread (termina quando não há buscas pendentes)"""
+        while True:
+            self._wakeup.clear()
+
+            try:
+                delay = self.poll_once()
+            except Exception as e:
+                print(f"❌ Erro no acompanhamento de buscas: {e}")
+                delay = self.max_interval
+
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+
+            if delay:
+                self._wakeup.wait(delay)
@@ -1,11 +1,23 @@
 import os
 import time
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 
 from slskd_api import SlskdClient
 
 from .cache_manager import CacheManager
 from .rate_limiter import RateLimiter
+from .search_watcher import SearchCompletionWatcher
+
+try:
+    from ..utils.search_singleflight import get_search_flights
+    from ..utils.user_presence import get_presence_service
+except ImportError:
+    # Executado como pacote de topo (src/ no sys.path)
+    from utils.search_singleflight import get_search_flights
+    from utils.user_presence import get_presence_service
+
+# Campos dos resultados usados na seleção/download (únicos guardados no cache)
+CACHED_RESULT_FIELDS = ["username", "filename", "size", "bitDepth", "sampleRate", "isLocked"]
 
 
 class SlskdApiClient:
@@ -19,7 +31,10 @@ class SlskdApiClient:
         # Inicializar componentes
         self.api = SlskdClient(host=self.base_url, api_key=self.api_key)
         self.rate_limiter = RateLimiter()
-        self.cache_manager = CacheManager(db_manager)
+        self.cache_manager = CacheManager(db_manager, fields=CACHED_RESULT_FIELDS)
+        self.presence = get_presence_service(self.api)
+        self.search_watcher = SearchCompletionWatcher(self.api)
+        self.search_flights = get_search_flights()
 
         # Configurações
         self.max_retries = int(os.getenv("MAX_RETRY_ATTEMPTS", 3))
@@ -40,16 +55,20 @@ class SlskdApiClient:
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                # Executar busca
-                search_response = self.api.searches.search_text(query)
-                print(f"🔍 Busca iniciada: {search_response}")
+                # Executar busca (ou reaproveitar busca idêntica em andamento)
+                search_id = self.search_flights.acquire(self.api, query)
+                print(f"🔍 Busca iniciada: {search_id}")
 
                 # Aguardar conclusão da busca
-                search_id = search_response.get("id")
-                if not search_id:
-                    raise Exception("ID da busca não retornado")
-
-                results = self._wait_for_search_completion(search_id)
+                try:
+                    results = self.search_flights.shared(
+                        self.api,
+                        search_id,
+                        "responses",
+                        lambda: self._wait_for_search_completion(search_id),
+                    )
+                finally:
+                    self._release_search(search_id)
 
                 # Sucesso - resetar contadores
                 self.rate_limiter.record_request()
@@ -78,6 +97,15 @@ class SlskdApiClient:
 
         return []
 
+    def _release_search(self, search_id: str):
+        """Remove a busca do slskd quando não há mais consumidores"""
+        if not self.search_flights.release(self.api, search_id):
+            return
+        try:
+            self.api.searches.delete(search_id)
+        except Exception as e:
+            print(f"⚠️ Erro ao remover busca {search_id}: {e}")
+
     def get_user_status(self, username: str) -> Optional[Dict]:
         """Obtém status do usuário (online/offline)"""
         try:
@@ -87,12 +115,12 @@ class SlskdApiClient:
             return None
 
     def is_user_online(self, username: str) -> bool:
-        """Verifica se usuário está online"""
-        status = self.get_user_status(username)
-        if status:
-            presence = status.get("presence", "").lower()
-            return presence == "online"
-        return False
+        """Verifica se usuário está online (com cache de presença)"""
+        return self.presence.is_online(username)
+
+    def filter_online_users(self, usernames: Iterable[str]) -> Set[str]:
+        """Retorna os usuários online, consultando em paralelo os não cacheados"""
+        return self.presence.filter_online(usernames)
 
     def _wait_for_search_completion(
         self, search_id: str, timeout: int = None
@@ -102,71 +130,37 @@ class SlskdApiClient:
             timeout = int(os.getenv("SEARCH_COMPLETION_TIMEOUT", 120))
 
         start_time = time.time()
-        check_interval = 20  # Intervalo fixo de 10 segundos
+        print(f"🔍 Aguardando conclusão da busca {search_id} (timeout: {timeout}s)")
+
+        # Resolve assim que isComplete = True (consulta por ID com backoff)
+        search_status = self.search_watcher.wait(search_id, timeout)
 
+        state = search_status.get("state", "Unknown")
+        file_count = search_status.get("fileCount", 0)
+        elapsed = time.time() - start_time
         print(
-            f"🔍 Aguardando conclusão da busca {search_id} (timeout: {timeout}s, intervalo: {check_interval}s)"
+            f"✅ Busca marcada como completa após {elapsed:.1f}s | Estado: {state} | Arquivos: {file_count}"
         )
 
-        while time.time() - start_time < timeout:
-            try:
-                # Verificar status de todas as buscas
-                all_searches = self.api.searches.get_all()
-                search_status = None
-
-                # Encontrar nossa busca pelo ID
-                for search in all_searches:
-                    if search.get("id") == search_id:
-                        search_status = search
-                        break
-
-                if not search_status:
-                    print(f"⚠️ Busca {search_id} não encontrada na lista")
-                    time.sleep(check_interval)
-                    continue
-
-                state = search_status.get("state", "Unknown")
-                file_count = search_status.get("fileCount", 0)
-                is_complete = search_status.get("isComplete", False)
-                elapsed = int(time.time() - start_time)
+        if file_count <= 0:
+            print("🔍 Busca concluída mas sem resultados (fileCount = 0)")
+            return []
 
+        # Obter respostas usando o ID da busca
+        for attempt in range(3):
+            try:
+                responses = self.api.searches.search_responses(search_id)
                 print(
-                    f"🔍 [{elapsed}s] Estado: {state} | Complete: {is_complete} | Arquivos: {file_count}"
+                    f"🔍 Busca concluída com {len(responses)} respostas e {file_count} arquivos"
                 )
-
-                # Aguardar especificamente por isComplete = True
-                if is_complete is True:
-                    print(f"✅ Busca marcada como completa após {elapsed}s")
-
-                    if file_count > 0:
-                        # Obter respostas usando o ID da busca
-                        try:
-                            responses = self.api.searches.search_responses(search_id)
-                            print(
-                                f"🔍 Busca concluída com {len(responses)} respostas e {file_count} arquivos"
-                            )
-                            return responses
-                        except Exception as e:
-                            print(f"⚠️ Erro ao obter respostas da busca: {e}")
-                            # Continuar tentando por mais algumas iterações
-                            time.sleep(check_interval)
-                            continue
-                    else:
-                        print("🔍 Busca concluída mas sem resultados (fileCount = 0)")
-                        return []
-
-                # Aguardar antes da próxima verificação
-                time.sleep(check_interval)
-
+                return responses
             except Exception as e:
-                elapsed = int(time.time() - start_time)
-                print(f"❌ [{elapsed}s] Erro ao verificar status da busca: {e}")
-                time.sleep(check_interval)
+                print(f"⚠️ Erro ao obter respostas da busca: {e}")
+                if time.time() - start_time >= timeout:
+                    break
+                time.sleep(self.search_watcher.max_interval * (attempt + 1))
 
-        elapsed = int(time.time() - start_time)
-        raise Exception(
-            f"Timeout ({elapsed}s) aguardando conclusão da busca {search_id}"
-        )
+        raise Exception(f"Falha ao obter respostas da busca {search_id}")
 
     def _process_search_results(self, raw_results) -> List[Dict]:
         """Processa resultados da API para formato padrão"""
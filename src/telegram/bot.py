@@ -43,6 +43,7 @@ try:
         connectToSlskd, 
         smart_mp3_search,
         smart_album_search,
+        enqueue_album_tracks,
         list_audiobook_options,
         download_audiobook_by_selection,
         setup_spotify_client, 
@@ -66,6 +67,7 @@ except ImportError as e:
             connectToSlskd, 
             smart_mp3_search,
             smart_album_search,
+            enqueue_album_tracks,
             list_audiobook_options,
             download_audiobook_by_selection,
             setup_spotify_client, 
@@ -110,6 +112,7 @@ except ImportError as e:
             connectToSlskd = slskd_module.connectToSlskd
             smart_mp3_search = slskd_module.smart_mp3_search
             smart_album_search = slskd_module.smart_album_search
+            enqueue_album_tracks = getattr(slskd_module, 'enqueue_album_tracks', None)
             
             # Verifica se as funções existem no módulo
             if hasattr(slskd_module, 'list_audiobook_options'):
@@ -143,6 +146,8 @@ except ImportError as e:
             print("💡 Verifique se os arquivos main.py ou slskd-mp3-search.py existem")
             sys.exit(1)
 
+from utils.result_selector import TopK
+
 # Configuração de logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -1565,49 +1570,14 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
         return await loop.run_in_executor(None, self._download_album_tracks, album_info, search_term)
     
     def _download_album_tracks(self, album_info: dict, search_term: str) -> dict:
-        """Baixa todas as faixas de um álbum"""
-        try:
-            from main import download_mp3
-        except ImportError:
-            from slskd_mp3_search import download_mp3
-        import time
-        import os
-        
-        username = album_info['username']
-        files = album_info['files']
-        
-        print(f"\n📥 Iniciando download de {len(files)} faixas do álbum...")
-        
-        successful_downloads = 0
-        failed_downloads = 0
-        
+        """Baixa todas as faixas de um álbum (um único enqueue para o diretório)"""
         try:
-            for i, file_info in enumerate(files, 1):
-                filename = file_info.get('filename', '')
-                file_size = file_info.get('size', 0)
-                
-                print(f"\n📍 [{i}/{len(files)}] {os.path.basename(filename)}")
-                print(f"   💾 Tamanho: {file_size / 1024 / 1024:.2f} MB")
-                print(f"   🎧 Bitrate: {file_info.get('bitRate', 0)} kbps")
-                
-                # Tenta fazer o download
-                success = download_mp3(self.slskd, username, filename, file_size, f"{search_term} - {os.path.basename(filename)}")
-                
-                if success:
-                    successful_downloads += 1
-                    print(f"   ✅ Download iniciado com sucesso")
-                else:
-                    failed_downloads += 1
-                    print(f"   ❌ Falha no download")
-                
-                # Pausa entre downloads
-                if i < len(files):
-                    time.sleep(1)
-            
+            result = enqueue_album_tracks(self.slskd, album_info, search_term)
             return {
                 'success': True,
-                'successful': successful_downloads,
-                'failed': failed_downloads
+                'successful': result['successful'],
+                'failed': result['failed'],
+                'results': result['results']
             }
             
         except Exception as e:
@@ -1615,8 +1585,8 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
             return {
                 'success': False,
                 'error': str(e),
-                'successful': successful_downloads,
-                'failed': failed_downloads
+                'successful': 0,
+                'failed': len(album_info.get('files', []))
             }
     
     async def _handle_music_selection(self, query):
@@ -1807,12 +1777,12 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
         try:
             from main import (
                 is_duplicate_download, create_search_variations, 
-                wait_for_search_completion
+                wait_for_search_completion, start_search, cleanup_search
             )
         except ImportError:
             from slskd_mp3_search import (
                 is_duplicate_download, create_search_variations, 
-                wait_for_search_completion
+                wait_for_search_completion, start_search, cleanup_search
             )
         import os
         
@@ -1826,16 +1796,23 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
         variations = create_search_variations(search_term)
         print(f"📝 {len(variations)} variações criadas para música")
         
-        all_candidates = []
+        # Mantém só os 5 melhores (bitrate, tamanho), sem repetir usuário + arquivo
+        # (mesma chave do CLI); um repetido só substitui com bitrate maior
+        best_candidates = TopK(
+            5,
+            key=lambda c: f"{c['username']}:{os.path.basename(c['filename'])}",
+            replace_key=lambda score: score[0],
+        )
+        found_candidates = 0
         
         for i, search_variation in enumerate(variations, 1):
             print(f"\n📍 Tentativa {i}/{len(variations)}: '{search_variation}'")
             
+            search_id = None
             try:
                 print(f"🔍 Buscando música: '{search_variation}'")
                 
-                search_result = self.slskd.searches.search_text(search_variation)
-                search_id = search_result.get('id')
+                search_id = start_search(self.slskd, search_variation)
                 
                 # Aguarda a busca finalizar
                 search_responses = wait_for_search_completion(self.slskd, search_id, max_wait=int(os.getenv('SEARCH_WAIT_TIME', 25)))
@@ -1850,36 +1827,31 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
                 
                 if total_files > 0:
                     # Para músicas, procura por arquivos individuais de qualidade
-                    music_candidates = self._extract_music_candidates(search_responses, search_term)
+                    music_candidates = 0
+                    for candidate in self._extract_music_candidates(search_responses, search_term):
+                        best_candidates.push((candidate['bitrate'], candidate['size']), candidate)
+                        music_candidates += 1
                     
                     if music_candidates:
-                        print(f"🎵 Encontrados {len(music_candidates)} candidatos de música")
-                        all_candidates.extend(music_candidates)
+                        print(f"🎵 Encontrados {music_candidates} candidatos de música")
+                        found_candidates += music_candidates
                         
                         # Se encontrou bons candidatos, para a busca
-                        if len(all_candidates) >= 10:
+                        if found_candidates >= 10:
                             break
             
             except Exception as e:
                 print(f"❌ Erro na busca: {e}")
-        
-        # Remove duplicatas e ordena por qualidade
-        unique_candidates = {}
-        for candidate in all_candidates:
-            key = f"{candidate['username']}:{candidate['filename']}"
-            if key not in unique_candidates or candidate['bitrate'] > unique_candidates[key]['bitrate']:
-                unique_candidates[key] = candidate
-        
-        final_candidates = list(unique_candidates.values())
-        final_candidates.sort(key=lambda x: (x['bitrate'], x['size']), reverse=True)
+            finally:
+                # Busca pode estar compartilhada: remove só após o último uso
+                if search_id:
+                    cleanup_search(self.slskd, search_id)
         
         # Retorna os 5 melhores
-        return final_candidates[:5]
+        return [candidate for _, candidate in best_candidates.items()]
     
-    def _extract_music_candidates(self, search_responses: list, search_term: str) -> list:
-        """Extrai candidatos de música dos resultados de busca"""
-        candidates = []
-        
+    def _extract_music_candidates(self, search_responses: list, search_term: str):
+        """Extrai candidatos de música dos resultados de busca (gerador)"""
         for response in search_responses:
             username = response.get('username', 'Unknown')
             files = response.get('files', [])
@@ -1920,9 +1892,7 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
                     'duration': duration_str
                 }
                 
-                candidates.append(candidate)
-        
-        return candidates
+                yield candidate
     
     async def _handle_album_search(self, update: Update, album_query: str):
         """Manipula busca de álbum com seleção de candidatos"""
@@ -1973,13 +1943,13 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
             from main import (
                 is_duplicate_download, extract_artist_and_album, 
                 create_album_search_variations, wait_for_search_completion,
-                find_album_candidates
+                find_album_candidates, start_search, cleanup_search
             )
         except ImportError:
             from slskd_mp3_search import (
                 is_duplicate_download, extract_artist_and_album, 
                 create_album_search_variations, wait_for_search_completion,
-                find_album_candidates
+                find_album_candidates, start_search, cleanup_search
             )
         import os
         
@@ -2002,11 +1972,11 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
         for i, search_term in enumerate(variations, 1):
             print(f"\n📍 Tentativa {i}/{len(variations)}: '{search_term}'")
             
+            search_id = None
             try:
                 print(f"🔍 Buscando álbum: '{search_term}'")
                 
-                search_result = self.slskd.searches.search_text(search_term)
-                search_id = search_result.get('id')
+                search_id = start_search(self.slskd, search_term)
                 
                 # Aguarda a busca finalizar
                 search_responses = wait_for_search_completion(self.slskd, search_id, max_wait=int(os.getenv('SEARCH_WAIT_TIME', 25)))
@@ -2033,6 +2003,9 @@ _Obs: Músicas já baixadas anteriormente serão puladas. Processo totalmente au
             
             except Exception as e:
                 print(f"❌ Erro na busca: {e}")
+            finally:
+                if search_id:
+                    cleanup_search(self.slskd, search_id)
         
         # Remove duplicatas e ordena por qualidade
         unique_candidates = {}
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""
+Armazenamento indexado do histórico de downloads
+
+Mantém o histórico em memória (dict indexado pelo hash da busca) e grava
+cada alteração como uma linha em um log append-only. O arquivo JSON
+tradicional (download_history.json) continua sendo o snapshot canônico:
+é regravado apenas na compactação, que acontece periodicamente.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_COMPACT_EVERY = 500
+
+
+class DownloadHistoryStore:
+    """Histórico de downloads com lookup O(1) e append O(1)"""
+
+    def __init__(self, history_file: str, compact_every: int = None):
+        self.history_file = history_file
+        self.log_file = f"{history_file}.log"
+        self.compact_every = compact_every or int(
+            os.getenv("DOWNLOAD_HISTORY_COMPACT_EVERY", DEFAULT_COMPACT_EVERY)
+        )
+
+        self._entries: Dict[str, Dict] = {}
+        self._snapshot_sig: Optional[Tuple[int, int]] = None
+        self._log_offset = 0
+        self._log_ops = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna entrada do histórico ou None"""
+        with self._lock:
+            self._refresh()
+            return self._entries.get(key)
+
+    def contains(self, key: str) -> bool:
+        """Verifica se hash já está no histórico"""
+        return self.get(key) is not None
+
+    def all(self) -> Dict[str, Dict]:
+        """Cópia do histórico completo no formato do JSON legado"""
+        with self._lock:
+            self._refresh()
+            return dict(self._entries)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, entry: Dict):
+        """Adiciona ou substitui entrada"""
+        self.put_many([(key, entry)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]]):
+        """Adiciona várias entradas com uma única escrita no log"""
+        ops = [{"op": "put", "key": key, "entry": entry} for key, entry in items]
+        if ops:
+            self._append(ops)
+
+    def delete(self, key: str) -> Optional[Dict]:
+        """Remove entrada e retorna o valor removido"""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._append([{"op": "del", "key": key}])
+            return entry
+
+    def clear(self):
+        """Remove todo o histórico (snapshot e log)"""
+        with self._lock:
+            with self._locked_log():
+                for path in (self.history_file, self.log_file):
+                    if os.path.exists(path):
+                        os.remove(path)
+            self._entries = {}
+            self._snapshot_sig = None
+            self._log_offset = 0
+            self._log_ops = 0
+            self._loaded = True
+
+    def replace_all(self, history: Dict[str, Dict]):
+        """Importa um histórico completo no formato JSON legado"""
+        with self._lock:
+            with self._locked_log() as log_fd:
+                self._write_snapshot(history)
+                os.ftruncate(log_fd, 0)
+            self._entries = dict(history)
+            self._log_offset = 0
+            self._log_ops = 0
+            self._snapshot_sig = self._stat_signature(self.history_file)
+            self._loaded = True
+
+    def compact(self):
+        """Regrava o snapshot JSON com o estado atual e zera o log"""
+        with self._lock:
+            with self._locked_log() as log_fd:
+                self._refresh()
+                if self._log_ops == 0 and os.fstat(log_fd).st_size == 0:
+                    return
+                self._write_snapshot(self._entries)
+                os.ftruncate(log_fd, 0)
+            self._log_offset = 0
+            self._log_ops = 0
+            self._snapshot_sig = self._stat_signature(self.history_file)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _append(self, ops):
+        """Grava operações no log e aplica no índice em memória"""
+        payload = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+
+        with self._lock:
+            with self._locked_log() as log_fd:
+                # Aplica o que outros processos gravaram antes de nós
+                self._refresh()
+                os.lseek(log_fd, 0, os.SEEK_END)
+                os.write(log_fd, payload.encode("utf-8"))
+                self._log_offset = os.fstat(log_fd).st_size
+
+            for op in ops:
+                self._apply(op)
+            self._log_ops += len(ops)
+
+            if self._log_ops >= self.compact_every:
+                self.compact()
+
+    def _apply(self, op: Dict):
+        if op.get("op") == "put":
+            self._entries[op["key"]] = op["entry"]
+        elif op.get("op") == "del":
+            self._entries.pop(op["key"], None)
+
+    def _refresh(self):
+        """Recarrega snapshot/log se outro processo os alterou"""
+        snapshot_sig = self._stat_signature(self.history_file)
+        log_size = self._file_size(self.log_file)
+
+        if not self._loaded or snapshot_sig != self._snapshot_sig or log_size < self._log_offset:
+            self._entries = self._load_snapshot()
+            self._snapshot_sig = snapshot_sig
+            self._log_offset = 0
+            self._log_ops = 0
+            self._loaded = True
+
+        if log_size > self._log_offset:
+            self._replay_log()
+
+    def _load_snapshot(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.history_file):
+            return {}
+
+        try:
+            with open(self.history_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar histórico: {e}")
+            return {}
+
+    def _replay_log(self):
+        """Aplica operações do log a partir do último offset lido"""
+        if not os.path.exists(self.log_file):
+            return
+
+        with open(self.log_file, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+
+        # Ignora linha incompleta no final (escrita interrompida)
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            try:
+                self._apply(json.loads(line))
+                self._log_ops += 1
+            except (ValueError, KeyError):
+                continue
+
+        self._log_offset += len(complete)
+
+    def _write_snapshot(self, history: Dict[str, Dict]):
+        """Grava snapshot JSON de forma atômica (arquivo temporário + rename)"""
+        directory = os.path.dirname(self.history_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_file = f"{self.history_file}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.history_file)
+
+    def _locked_log(self):
+        return _LockedFile(self.log_file)
+
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+
+class _LockedFile:
+    """Abre arquivo com flock exclusivo (entre processos)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: Optional[int] = None
+
+    def __enter__(self) -> int:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self.fd
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+Seleção dos melhores arquivos de uma busca em uma única passada
+
+TopK mantém apenas os k melhores itens em um heap limitado (memória
+constante, independente do número de respostas), com deduplicação opcional
+por chave. ResponseSelector percorre as respostas do slskd pontuando cada
+arquivo uma vez: o limite superior barato do QueryMatcher descarta arquivos
+que não conseguem entrar no heap antes de calcular a similaridade exata.
+"""
+
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .text_similarity import QueryMatcher, normalize_text
+
+# Posições na entrada do heap
+_SCORE, _ORDER, _ITEM, _KEY, _ALIVE = range(5)
+
+
+class TopK:
+    """Heap limitado com os k maiores scores (empate: o primeiro inserido vence)
+
+    Com key, itens repetidos ocupam uma única posição; o repetido só
+    substitui o anterior se replace_key(score) for maior (padrão: o score).
+    """
+
+    def __init__(
+        self,
+        k: int,
+        key: Callable[[Any], Any] = None,
+        min_score: Any = None,
+        replace_key: Callable[[Any], Any] = None,
+    ):
+        self.k = k
+        self.key = key
+        self.min_score = min_score
+        self.replace_key = replace_key or (lambda score: score)
+
+        self._heap: List[list] = []
+        self._by_key: Dict[Any, list] = {}
+        self._counter = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def threshold(self) -> Any:
+        """Score que um novo item precisa superar para entrar (None = qualquer)"""
+        if self._size < self.k:
+            return self.min_score
+        self._discard_dead()
+        return self._heap[0][_SCORE]
+
+    def push(self, score: Any, item: Any) -> bool:
+        """Oferece item ao heap. Retorna True se entrou"""
+        key = self.key(item) if self.key else None
+
+        if key is not None and key in self._by_key:
+            existing = self._by_key[key]
+            if not self.replace_key(score) > self.replace_key(existing[_SCORE]):
+                return False
+            # Substitui a versão anterior do mesmo item
+            existing[_ALIVE] = False
+            self._size -= 1
+            del self._by_key[key]
+
+        threshold = self.threshold()
+        if threshold is not None and not score > threshold:
+            return False
+
+        entry = [score, -self._counter, item, key, True]
+        self._counter += 1
+        heapq.heappush(self._heap, entry)
+        self._size += 1
+        if key is not None:
+            self._by_key[key] = entry
+
+        while self._size > self.k:
+            evicted = heapq.heappop(self._heap)
+            if evicted[_ALIVE]:
+                self._size -= 1
+                if evicted[_KEY] is not None:
+                    del self._by_key[evicted[_KEY]]
+
+        # Substituições deixam entradas mortas no heap: compacta de vez em quando
+        if len(self._heap) > 2 * self.k + 16:
+            self._heap = [entry for entry in self._heap if entry[_ALIVE]]
+            heapq.heapify(self._heap)
+
+        return True
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """Lista (score, item) do melhor para o pior"""
+        alive = [entry for entry in self._heap if entry[_ALIVE]]
+        alive.sort(key=lambda entry: (entry[_SCORE], entry[_ORDER]), reverse=True)
+        return [(entry[_SCORE], entry[_ITEM]) for entry in alive]
+
+    def _discard_dead(self):
+        while self._heap and not self._heap[0][_ALIVE]:
+            heapq.heappop(self._heap)
+
+
+class ResponseSelector:
+    """Pontua arquivos das respostas do slskd e mantém os melhores.
+
+    score = max(0, similaridade * weight + bonus_fn(file_info)); arquivos
+    com bonus_fn() None são ignorados. Apenas scores acima de min_score
+    entram no resultado.
+    """
+
+    def __init__(
+        self,
+        search_text: str,
+        bonus_fn: Callable[[Dict], Optional[float]],
+        limit: int = 1,
+        min_score: float = 0,
+        key: Callable[[Dict], Any] = None,
+        weight: float = 100.0,
+    ):
+        self.matcher = QueryMatcher(search_text)
+        self.bonus_fn = bonus_fn
+        self.weight = weight
+        self.top = TopK(limit, key=key, min_score=min_score)
+
+        self.total_files = 0
+        self.eligible_files = 0
+
+    def add_responses(self, search_responses: Iterable[Dict]):
+        """Processa uma lista de respostas de busca"""
+        for response in search_responses:
+            username = response.get("username", "")
+            files = response.get("files", [])
+            self.total_files += len(files)
+
+            for file_info in files:
+                self.add_file(username, file_info)
+
+    def add_file(self, username: str, file_info: Dict):
+        """Pontua um arquivo e oferece ao heap"""
+        bonus = self.bonus_fn(file_info)
+        if bonus is None:
+            return
+        self.eligible_files += 1
+
+        filename = file_info.get("filename", "")
+        normalized = normalize_text(filename)
+
+        # Limite superior barato: descarta sem calcular a similaridade exata
+        threshold = self.top.threshold()
+        similarity_bound = self.matcher.upper_bound_normalized(normalized)
+        bound = similarity_bound * self.weight + bonus
+        if threshold is not None and not bound > threshold:
+            return
+
+        similarity = self.matcher.ratio_normalized(normalized)
+        score = max(0, similarity * self.weight + bonus)
+        self.top.push(
+            score,
+            {
+                "filename": filename,
+                "username": username,
+                "size": file_info.get("size", 0),
+                "score": score,
+                "file_info": file_info,
+            },
+        )
+
+    def results(self) -> List[Dict]:
+        """Melhores arquivos em ordem decrescente de score"""
+        return [item for _, item in self.top.items()]
+
+    def best(self) -> Tuple[Optional[Dict], Optional[str], float]:
+        """(file_info, username, score) do melhor arquivo ou (None, None, 0)"""
+        results = self.results()
+        if not results:
+            return None, None, 0
+        best = results[0]
+        return best["file_info"], best["username"], best["score"]
+
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+Forma canônica de termos de busca do Soulseek
+
+O slskd casa os termos da busca por palavra, sem considerar ordem, caixa
+ou aspas. Por isso "Artist - Song *.flac", "artist  -  song *.flac" e
+'"Song" Artist *.flac' retornam os mesmos arquivos. canonicalize_query
+reduz essas variações a uma única chave, usada pelo cache de buscas e pela
+deduplicação de buscas em andamento.
+"""
+
+import re
+
+# Aspas só nas bordas do termo: apóstrofos internos ("don't") fazem parte da palavra
+QUOTE_CHARS = "\"'“”‘’"
+WILDCARD_RUN_RE = re.compile(r"\*+")
+
+
+def _normalize_term(term: str) -> str:
+    """Colapsa curingas repetidos e remove curingas finais (*abc* -> *abc)"""
+    term = WILDCARD_RUN_RE.sub("*", term)
+    if len(term) > 1:
+        term = term.rstrip("*")
+    return term
+
+
+def canonicalize_query(query: str) -> str:
+    """Termos em minúsculas, sem aspas, ordenados e sem repetição.
+
+    Exclusões (-termo) ficam ao final, também ordenadas. Traços isolados
+    (separador "Artista - Música") são descartados.
+    """
+    terms = set()
+    exclusions = set()
+
+    for token in query.casefold().split():
+        token = token.strip(QUOTE_CHARS)
+        if token.startswith("-"):
+            excluded = _normalize_term(token.lstrip("-").strip(QUOTE_CHARS))
+            if excluded and excluded != "*":
+                exclusions.add(f"-{excluded}")
+            continue
+
+        term = _normalize_term(token)
+        if term and term != "*":
+            terms.add(term)
+
+    canonical = " ".join(sorted(terms) + sorted(exclusions))
+    # Busca só com pontuação/curingas: mantém o texto para não colidir
+    return canonical or " ".join(query.casefold().split())
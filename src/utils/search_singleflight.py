@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+Deduplicação de buscas em andamento no slskd (singleflight)
+
+Quando bot, CLI e processador de playlists pedem a mesma busca ao mesmo
+tempo, apenas o primeiro chama searches.search_text: os demais entram na
+busca já iniciada (mesmo ID) e reaproveitam as respostas coletadas por
+quem aguardou primeiro. Cada solicitante segura uma referência e a busca
+só deve ser removida do slskd (cleanup_search) quando a última referência
+for liberada.
+
+As buscas são agrupadas por servidor slskd (URL da API) e pela forma
+canônica da consulta (utils.search_query), então clientes diferentes
+apontando para o mesmo servidor e variações equivalentes do mesmo termo
+compartilham as buscas.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .search_query import canonicalize_query
+
+DEFAULT_MAX_AGE = 300
+
+
+def normalize_query(query: str) -> str:
+    """Chave da busca: forma canônica (caixa, espaços, aspas e ordem dos termos)"""
+    return canonicalize_query(query)
+
+
+def _server_key(slskd) -> Hashable:
+    """Identifica o servidor slskd do cliente (URL da API ou o próprio cliente)"""
+    searches = slskd.searches
+    api_url = getattr(searches, "api_url", None)
+    return api_url if isinstance(api_url, str) else id(searches)
+
+
+class _Flight:
+    """Busca compartilhada e seus consumidores"""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.search_id: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.started = time.time()
+        self.ready = threading.Event()
+        self.holders: Counter = Counter()
+        self.results: Dict[str, Future] = {}
+
+
+class SearchSingleFlight:
+    """Registro das buscas em andamento, com contagem de referências"""
+
+    def __init__(self, max_age: float = None):
+        if max_age is None:
+            max_age = float(
+                os.getenv("SEARCH_SINGLEFLIGHT_MAX_AGE", DEFAULT_MAX_AGE)
+            )
+        # Buscas mais antigas que isso não recebem novos consumidores
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._by_query: Dict[Tuple[Hashable, str], _Flight] = {}
+        self._by_id: Dict[Tuple[Hashable, str], _Flight] = {}
+
+        self.started_searches = 0
+        self.joined_searches = 0
+
+    def acquire(self, slskd, query: str) -> str:
+        """Inicia a busca ou entra na busca idêntica em andamento. Retorna o ID"""
+        server = _server_key(slskd)
+        key = (server, normalize_query(query))
+        thread_id = threading.get_ident()
+
+        with self._lock:
+            flight = self._by_query.get(key)
+            if flight is not None and time.time() - flight.started > self.max_age:
+                # Busca antiga: continua válida para quem já a usa
+                del self._by_query[key]
+                flight = None
+
+            owner = flight is None
+            if owner:
+                flight = _Flight(query)
+                self._by_query[key] = flight
+                self.started_searches += 1
+            else:
+                self.joined_searches += 1
+            flight.holders[thread_id] += 1
+
+        if not owner:
+            flight.ready.wait()
+            if flight.error is not None:
+                raise flight.error
+            print(f"🔗 Reaproveitando busca em andamento: '{flight.query}'")
+            return flight.search_id
+
+        try:
+            search_result = slskd.searches.search_text(query)
+            search_id = search_result.get("id") if search_result else None
+            if not search_id:
+                raise Exception("ID da busca não retornado")
+        except Exception as e:
+            with self._lock:
+                flight.error = e
+                if self._by_query.get(key) is flight:
+                    del self._by_query[key]
+            flight.ready.set()
+            raise
+
+        with self._lock:
+            flight.search_id = search_id
+            self._by_id[(server, search_id)] = flight
+        flight.ready.set()
+        return search_id
+
+    def release(self, slskd, search_id: str) -> bool:
+        """Libera a referência da thread atual.
+
+        Retorna True quando ninguém mais usa a busca (quem chamou deve
+        removê-la do slskd) e False se outros consumidores ainda a usam.
+        Buscas desconhecidas retornam True.
+        """
+        server = _server_key(slskd)
+        thread_id = threading.get_ident()
+
+        with self._lock:
+            flight = self._by_id.get((server, search_id))
+            if flight is None:
+                return True
+
+            if flight.holders[thread_id] <= 0:
+                # Liberação repetida pela mesma thread: não afeta os outros
+                return False
+
+            flight.holders[thread_id] -= 1
+            if flight.holders[thread_id] == 0:
+                del flight.holders[thread_id]
+            if flight.holders:
+                return False
+
+            del self._by_id[(server, search_id)]
+            for key, registered in list(self._by_query.items()):
+                if registered is flight:
+                    del self._by_query[key]
+            return True
+
+    def held_elsewhere(self, slskd, search_id: str) -> bool:
+        """True se outra thread (outra solicitação) ainda usa a busca"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            flight = self._by_id.get((_server_key(slskd), search_id))
+            if flight is None:
+                return False
+            return any(holder != thread_id for holder in flight.holders)
+
+    def shared(
+        self, slskd, search_id: str, name: str, compute: Callable[[], Any]
+    ) -> Any:
+        """Executa compute() uma única vez por busca e compartilha o resultado.
+
+        Consumidores concorrentes aguardam o mesmo cálculo (ex.: aguardar a
+        conclusão e coletar as respostas). Se compute() falhar, a falha é
+        repassada a quem aguardava e o próximo consumidor tenta de novo.
+        """
+        with self._lock:
+            flight = self._by_id.get((_server_key(slskd), search_id))
+            if flight is None:
+                future, owner = None, True
+            else:
+                future = flight.results.get(name)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    flight.results[name] = future
+
+        if future is None:
+            return compute()
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                if flight.results.get(name) is future:
+                    del flight.results[name]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def active_count(self) -> int:
+        """Número de buscas com consumidores"""
+        with self._lock:
+            return len(self._by_id)
+
+
+_search_flights: Optional[SearchSingleFlight] = None
+_search_flights_lock = threading.Lock()
+
+
+def get_search_flights() -> SearchSingleFlight:
+    """Registro de buscas compartilhado pelo processo"""
+    global _search_flights
+    with _search_flights_lock:
+        if _search_flights is None:
+            _search_flights = SearchSingleFlight()
+        return _search_flights
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Similaridade entre termo de busca e nomes de arquivo
+
+A busca é normalizada uma única vez (QueryMatcher) e comparada contra
+milhares de nomes de arquivo. Para cada arquivo é calculado primeiro um
+limite superior barato: a razão 2*LCS/(len(a)+len(b)) via algoritmo
+bit-paralelo de maior subsequência comum (Allison-Dix/Hyyrö), que nunca é
+menor que SequenceMatcher.ratio(). Quem seleciona os melhores arquivos
+(utils.result_selector) só roda o SequenceMatcher para os arquivos que
+ainda podem vencer, então o ranking final é idêntico ao cálculo com difflib
+em todos os arquivos.
+"""
+
+import re
+from difflib import SequenceMatcher
+
+NON_WORD_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem pontuação (mesma normalização do calculate_similarity)"""
+    return NON_WORD_RE.sub("", text.lower())
+
+
+class QueryMatcher:
+    """Termo de busca pré-processado para comparação com muitos arquivos"""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.normalized = normalize_text(query)
+        self._length = len(self.normalized)
+        self._full_mask = (1 << self._length) - 1
+
+        # Máscara de bits por caractere para o LCS bit-paralelo
+        self._char_masks = {}
+        for position, char in enumerate(self.normalized):
+            self._char_masks[char] = self._char_masks.get(char, 0) | (1 << position)
+
+        self._matcher = SequenceMatcher(None)
+        self._matcher.set_seq1(self.normalized)
+
+    def similarity(self, text: str) -> float:
+        """Similaridade exata (SequenceMatcher.ratio) com o texto"""
+        return self.ratio_normalized(normalize_text(text))
+
+    def ratio_normalized(self, normalized: str) -> float:
+        """SequenceMatcher.ratio contra texto já normalizado"""
+        self._matcher.set_seq2(normalized)
+        return self._matcher.ratio()
+
+    def upper_bound_normalized(self, normalized: str) -> float:
+        """Limite superior de ratio_normalized (razão de LCS, O(len) operações)"""
+        total = self._length + len(normalized)
+        if total == 0:
+            return 1.0
+
+        masks = self._char_masks
+        full = self._full_mask
+        row = full
+        for char in normalized:
+            matched = row & masks.get(char, 0)
+            row = ((row + matched) | (row - matched)) & full
+
+        lcs = self._length - bin(row).count("1")
+        return 2.0 * lcs / total
+
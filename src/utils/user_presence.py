@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+"""
+Cache de presença de usuários do Soulseek
+
+Consulta o endpoint barato de status (users.status) em vez de fazer browse
+do compartilhamento inteiro, guarda o resultado com TTL (curto para usuários
+offline/erros) e permite verificar vários usuários em paralelo com limite
+de concorrência. Uma instância é compartilhada por cliente slskd, então CLI,
+bot e processador de playlists reaproveitam o mesmo cache.
+"""
+
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+DEFAULT_ONLINE_TTL = 300
+DEFAULT_OFFLINE_TTL = 60
+DEFAULT_ERROR_TTL = 30
+DEFAULT_MAX_WORKERS = 8
+
+# Usuários "Away" continuam servindo transferências
+AVAILABLE_PRESENCES = {"online", "away"}
+
+
+class UserPresenceService:
+    """Verificação de presença com cache TTL e consultas em lote"""
+
+    def __init__(
+        self,
+        status_fn: Callable[[str], Optional[Dict]],
+        online_ttl: float = None,
+        offline_ttl: float = None,
+        error_ttl: float = None,
+        max_workers: int = None,
+    ):
+        self.status_fn = status_fn
+        self.online_ttl = online_ttl or int(
+            os.getenv("USER_PRESENCE_TTL_SECONDS", DEFAULT_ONLINE_TTL)
+        )
+        self.offline_ttl = offline_ttl or int(
+            os.getenv("USER_PRESENCE_OFFLINE_TTL_SECONDS", DEFAULT_OFFLINE_TTL)
+        )
+        self.error_ttl = error_ttl or DEFAULT_ERROR_TTL
+        self.max_workers = max_workers or int(
+            os.getenv("USER_PRESENCE_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+        )
+
+        # username -> (disponível: True/False/None em erro, expira_em)
+        self._cache: Dict[str, Tuple[Optional[bool], float]] = {}
+        self._lock = threading.Lock()
+
+    def is_online(self, username: str, default: bool = False) -> bool:
+        """Verifica se usuário está disponível (usa cache quando válido).
+
+        `default` é retornado quando não foi possível consultar o status.
+        """
+        hit, available = self._cached(username)
+        if not hit:
+            available = self._lookup(username)
+
+        return default if available is None else available
+
+    def filter_online(self, usernames: Iterable[str], default: bool = False) -> Set[str]:
+        """Retorna os usuários disponíveis, consultando os não cacheados em paralelo"""
+        unique = {u for u in usernames if u}
+        online = set()
+        missing = []
+
+        for username in unique:
+            hit, available = self._cached(username)
+            if not hit:
+                missing.append(username)
+            elif (default if available is None else available):
+                online.add(username)
+
+        if missing:
+            workers = min(self.max_workers, len(missing))
+            if workers <= 1:
+                results = [self._lookup(u) for u in missing]
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="presence"
+                ) as executor:
+                    results = list(executor.map(self._lookup, missing))
+
+            for username, available in zip(missing, results):
+                if default if available is None else available:
+                    online.add(username)
+
+        return online
+
+    def invalidate(self, username: str = None):
+        """Remove usuário (ou todos) do cache"""
+        with self._lock:
+            if username is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(username, None)
+
+    def _cached(self, username: str) -> Tuple[bool, Optional[bool]]:
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(username)
+            if entry is None:
+                return False, None
+            available, expires_at = entry
+            if expires_at <= now:
+                del self._cache[username]
+                return False, None
+            return True, available
+
+    def _lookup(self, username: str) -> Optional[bool]:
+        """Consulta status no servidor e grava no cache"""
+        try:
+            status = self.status_fn(username)
+            presence = (status or {}).get("presence", "") or ""
+            available = presence.lower() in AVAILABLE_PRESENCES
+            ttl = self.online_ttl if available else self.offline_ttl
+        except Exception as e:
+            print(f"⚠️ Erro ao obter status do usuário {username}: {e}")
+            available = None
+            ttl = self.error_ttl
+
+        with self._lock:
+            self._cache[username] = (available, time.time() + ttl)
+
+        return available
+
+
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+
+def get_presence_service(slskd) -> UserPresenceService:
+    """Retorna o serviço de presença compartilhado para um cliente slskd_api"""
+    with _services_lock:
+        try:
+            service = _services.get(slskd)
+            if service is None:
+                service = UserPresenceService(slskd.users.status)
+                _services[slskd] = service
+        except TypeError:
+            # Cliente sem suporte a weakref: cache apenas local
+            service = UserPresenceService(slskd.users.status)
+
+        return service
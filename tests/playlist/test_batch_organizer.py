@@ -0,0 +1,115 @@
+import pytest
+import tempfile
+import os
+from pathlib import Path
+from unittest.mock import patch
+from src.playlist.batch_organizer import BatchOrganizer
+from src.playlist.database_manager import DatabaseManager
+from src.playlist.file_index import FileIndex
+from src.playlist.file_organizer import FileOrganizer
+
+def parse_file_line(file_line):
+    parts = file_line.split(' - ')
+    return (parts[0], parts[1], ' - '.join(parts[2:])) if len(parts) >= 3 else ("", "", "")
+
+class TestBatchOrganizer:
+    
+    @pytest.fixture
+    def env(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            slskd = Path(temp_dir) / "slskd"
+            music = Path(temp_dir) / "music"
+            (slskd / "user1" / "Album").mkdir(parents=True)
+            music.mkdir()
+            for name in ("01 - One.flac", "02 - Two.flac", "03 - Three.flac"):
+                (slskd / "user1" / "Album" / name).write_bytes(b"x")
+            
+            organizer = FileOrganizer(slskd_path=str(slskd), music_path=str(music))
+            batch = BatchOrganizer(organizer.slskd_index, str(music), organizer._sanitize_name, max_workers=2)
+            downloads = [
+                {'filename': 'user1\\Album\\01 - One.flac', 'file_line': 'Artist - Album - One'},
+                {'filename': 'user1\\Album\\02 - Two.flac', 'file_line': 'Artist - Album - Two'},
+                {'filename': 'user1\\Album\\03 - Three.flac', 'file_line': 'Other - Disc: 2 - Three'},
+                {'filename': 'user1\\Album\\01 - One.flac', 'file_line': 'Artist - Album - One'},
+                {'filename': 'user1\\Album\\04 - Gone.flac', 'file_line': 'Artist - Album - Gone'},
+                {'filename': 'user1\\Album\\05.flac', 'file_line': 'sem separador'},
+            ]
+            yield slskd, music, batch, downloads
+    
+    def test_plan_groups_by_target_directory(self, env):
+        """Testa planejamento agrupado por pasta, com repetidas, ausentes e inválidas"""
+        slskd, music, batch, downloads = env
+        
+        plan = batch.plan(downloads, parse_file_line)
+        
+        assert {Path(d).relative_to(music).as_posix(): len(g) for d, g in plan['groups'].items()} == {
+            'Artist/Album': 2,
+            'Other/Disc_ 2': 1,
+        }
+        assert plan['in_place'] == 1
+        assert len(plan['missing']) == 1
+        assert len(plan['invalid']) == 1
+    
+    def test_execute_moves_with_rename(self, env):
+        """Testa movimentação em pool usando os.rename no mesmo sistema de arquivos"""
+        slskd, music, batch, downloads = env
+        
+        plan = batch.plan(downloads, parse_file_line)
+        with patch('src.playlist.batch_organizer.os.makedirs', wraps=os.makedirs) as mock_makedirs:
+            stats = batch.execute(plan)
+        
+        assert stats == {'moved': 3, 'renamed': 3, 'failed': 0}
+        # Uma criação por pasta de destino (chamadas internas criam os pais)
+        created = [call.args[0] for call in mock_makedirs.call_args_list]
+        assert sorted(d for d in created if d in plan['groups']) == sorted(plan['groups'])
+        assert (music / "Artist" / "Album" / "01 - One.flac").exists()
+        assert (music / "Other" / "Disc_ 2" / "03 - Three.flac").exists()
+        assert not list((slskd / "user1" / "Album").iterdir())
+    
+    def test_repeated_run_skips_without_lookup(self, env):
+        """Testa que arquivos já organizados são pulados sem consultar o índice"""
+        slskd, music, batch, downloads = env
+        batch.execute(batch.plan(downloads, parse_file_line))
+        
+        fresh = BatchOrganizer(FileIndex(str(slskd)), str(music), lambda name: name.replace(':', '_'))
+        with patch.object(fresh.source_index, 'find', wraps=fresh.source_index.find) as mock_find:
+            plan = fresh.plan(downloads[:4], parse_file_line)
+        
+        assert plan['groups'] == {}
+        assert plan['in_place'] == 4
+        mock_find.assert_not_called()
+    
+    def test_recorded_locations_use_stat_only_fast_path(self, env):
+        """Testa que locais gravados na base evitam buscas e corrigem só o necessário"""
+        slskd, music, _, downloads = env
+        db = DatabaseManager(str(music.parent / "downloads.db"))
+        for download in downloads[:3]:
+            db.save_download(download, 'SUCCESS')
+        
+        organizer = FileOrganizer(slskd_path=str(slskd), music_path=str(music))
+        batch = BatchOrganizer(organizer.slskd_index, str(music), organizer._sanitize_name, db_manager=db)
+        batch.execute(batch.plan(db.get_successful_downloads(), parse_file_line))
+        rows = db.get_successful_downloads()
+        assert all(row['library_path'] and os.path.isfile(row['library_path']) for row in rows)
+        
+        # Um arquivo foi movido à mão para fora do lugar
+        moved = music / "Artist" / "Album" / "02 - Two.flac"
+        stray = music / "Stray" / "02 - Two.flac"
+        stray.parent.mkdir()
+        os.rename(moved, stray)
+        db.set_library_locations([
+            (row['id'], str(stray), row['library_size'], row['library_mtime'])
+            for row in rows if row['library_path'] == str(moved)
+        ])
+        
+        fresh = BatchOrganizer(FileIndex(str(slskd)), str(music), organizer._sanitize_name, db_manager=db)
+        with patch.object(fresh.source_index, 'find') as mock_find:
+            plan = fresh.plan(db.get_successful_downloads(), parse_file_line)
+            stats = fresh.execute(plan)
+        
+        mock_find.assert_not_called()
+        assert plan['in_place'] == 2
+        assert stats['moved'] == 1
+        assert moved.exists() and not stray.exists()
+        assert str(moved) in {row['library_path'] for row in db.get_successful_downloads()}
+        db.close()
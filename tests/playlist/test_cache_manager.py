@@ -1,6 +1,7 @@
 import pytest
 import tempfile
 import os
+import time
 from unittest.mock import patch
 from src.playlist.database_manager import DatabaseManager
 from src.playlist.cache_manager import CacheManager
@@ -137,9 +138,16 @@ class TestCacheManager:
             cache_manager_auto = CacheManager(cache_manager.db_manager)
             
             with patch.object(cache_manager_auto, 'cleanup_expired') as mock_cleanup:
-                # get_cached_results deve triggerar cleanup
+                # get_cached_results deve iniciar a limpeza em segundo plano
                 cache_manager_auto.get_cached_results("test")
+                cache_manager_auto.get_cached_results("test")
+                
+                deadline = time.time() + 2
+                while not mock_cleanup.called and time.time() < deadline:
+                    time.sleep(0.01)
+                cache_manager_auto.stop_sweeper()
                 
+                # Uma única varredura por intervalo, fora do caminho da consulta
                 mock_cleanup.assert_called_once()
     
     def test_auto_cleanup_disabled(self, cache_manager):
@@ -152,3 +160,115 @@ class TestCacheManager:
                 cache_manager_manual.get_cached_results("test")
                 
                 mock_cleanup.assert_not_called()
+    
+    def test_memory_tier_hit(self, cache_manager):
+        """Testa que a segunda leitura vem da memória, sem consultar o SQLite"""
+        cache_manager.save_results("query1", [{'test': '1'}])
+        cache_manager.memory.clear()
+        
+        with patch.object(cache_manager.db_manager, 'get_cached_search_entry',
+                          wraps=cache_manager.db_manager.get_cached_search_entry) as db_lookup:
+            assert cache_manager.get_cached_results("query1") == [{'test': '1'}]
+            assert cache_manager.get_cached_results("query1") == [{'test': '1'}]
+            assert db_lookup.call_count == 1
+        
+        stats = cache_manager.get_cache_stats()
+        assert stats['memory_hits'] == 1
+        assert stats['db_hits'] == 1
+        assert stats['hit_ratio'] == 1.0
+    
+    def test_memory_tier_byte_budget(self, cache_manager):
+        """Testa evicção LRU pelo orçamento de bytes"""
+        cache_manager.save_results("query1", [{'filename': 'a' * 30}])
+        # Cabem duas entradas, mas não três
+        budget = int(cache_manager.memory.current_bytes * 2.5)
+        cache_manager.memory.max_bytes = budget
+        cache_manager.save_results("query2", [{'filename': 'b' * 30}])
+        cache_manager.get_cached_results("query1")
+        cache_manager.save_results("query3", [{'filename': 'c' * 30}])
+        
+        assert cache_manager.memory.current_bytes <= budget
+        assert cache_manager.memory.get(cache_manager.get_query_hash("query2")) is None
+        assert cache_manager.memory.get(cache_manager.get_query_hash("query1")) is not None
+        assert cache_manager.memory.evictions == 1
+        # Entrada descartada da memória continua no SQLite
+        assert cache_manager.get_cached_results("query2") == [{'filename': 'b' * 30}]
+    
+    def test_expired_entry_not_served_from_memory(self, cache_manager):
+        """Testa que a camada em memória respeita o TTL"""
+        cache_manager.save_results("query1", [{'test': '1'}], ttl_hours=1)
+        query_hash = cache_manager.get_query_hash("query1")
+        value, _, size = cache_manager.memory._entries[query_hash]
+        cache_manager.memory._entries[query_hash] = (value, time.time() - 1, size)
+        
+        assert cache_manager.memory.get(query_hash) is None
+        assert cache_manager.memory.expirations == 1
+    
+    def test_cached_fields_same_on_hit_and_miss(self, cache_manager):
+        """Testa que apenas os campos configurados são cacheados e retornados"""
+        cache = CacheManager(cache_manager.db_manager, fields=['username', 'filename'])
+        raw = [{'username': 'u1', 'filename': 'a.flac', 'length': 200, 'extension': 'flac'}]
+        
+        miss = cache.search_with_cache("pruned query", lambda q: raw)
+        cache.memory.clear()
+        hit = cache.get_cached_results("pruned query")
+        
+        assert miss == hit == [{'username': 'u1', 'filename': 'a.flac'}]
+    
+    def test_eviction_by_entry_limit_keeps_valuable(self, cache_manager):
+        """Testa evicção das entradas antigas e sem hits ao exceder o limite"""
+        cache_manager.max_entries = 3
+        
+        for i in range(3):
+            cache_manager.save_results(f"query{i}", [{'test': str(i)}])
+        # query0 é antiga, mas muito usada
+        for _ in range(3):
+            cache_manager.get_cached_results("query0")
+        
+        cache_manager.save_results("query3", [{'test': '3'}])
+        
+        db = cache_manager.db_manager
+        assert db.get_cache_usage()['entries'] == 3
+        assert db.get_cached_search(cache_manager.get_query_hash("query1")) is None
+        assert db.get_cached_search(cache_manager.get_query_hash("query0")) == [{'test': '0'}]
+        assert cache_manager.get_cache_stats()['evictions'] == 1
+        assert cache_manager.memory.get(cache_manager.get_query_hash("query1")) is None
+    
+    def test_eviction_by_size_limit(self, cache_manager):
+        """Testa limite total em bytes do SQLite"""
+        cache_manager.save_results("query0", [{'filename': 'x' * 500}])
+        entry_bytes = cache_manager.db_manager.get_cache_usage()['bytes']
+        cache_manager.max_bytes = entry_bytes * 2
+        
+        cache_manager.save_results("query1", [{'filename': 'y' * 500}])
+        cache_manager.save_results("query2", [{'filename': 'z' * 500}])
+        
+        assert cache_manager.db_manager.get_cache_usage()['bytes'] <= entry_bytes * 2
+        assert cache_manager.db_manager.get_cached_search(cache_manager.get_query_hash("query0")) is None
+    
+    def test_true_hit_ratio_in_metrics(self, cache_manager):
+        """Testa que o MetricsCollector reporta hits/misses reais"""
+        from src.playlist.metrics_collector import MetricsCollector
+        
+        cache_manager.save_results("query1", [{'test': '1'}])
+        cache_manager.get_cached_results("query1")
+        cache_manager.get_cached_results("query1")
+        cache_manager.get_cached_results("missing")
+        cache_manager.flush_access_stats()
+        
+        top = cache_manager.db_manager.get_top_cached_queries(1)
+        assert top[0]['query'] == "query1"
+        assert top[0]['hits'] == 2
+        
+        metrics = MetricsCollector(cache_manager.db_manager.db_path).collect_database_metrics()
+        assert metrics['cache_hits'] == 2
+        assert metrics['cache_misses'] == 1
+        assert metrics['cache_hit_rate'] == round(2 / 3, 3)
+    
+    def test_equivalent_queries_share_entry(self, cache_manager):
+        """Testa que variações equivalentes da busca usam a mesma entrada"""
+        cache_manager.save_results("Artist - Song *.flac", [{'filename': 'song.flac'}])
+        
+        assert cache_manager.get_cached_results("artist  -  song *.flac") == [{'filename': 'song.flac'}]
+        assert cache_manager.get_cached_results('"Song" Artist *.FLAC') == [{'filename': 'song.flac'}]
+        assert cache_manager.get_cached_results("Artist - Song *.flac -mp3") is None
@@ -1,5 +1,6 @@
 import pytest
 import tempfile
+import json
 import os
 import time
 from datetime import datetime, timedelta
@@ -74,6 +75,42 @@ class TestDatabaseManager:
         temp_db.save_search_cache('expired', 'old query', [], -1)
         assert temp_db.get_cached_search('expired') is None
     
+    def test_search_cache_compressed_columns(self, temp_db):
+        """Testa formato colunar comprimido com poda de campos"""
+        results = [
+            {'username': f'user{i % 5}', 'filename': f'Music\\Artist\\{i:02d} - Song.flac',
+             'size': 1000 + i, 'bitRate': 0, 'extension': 'flac', 'isLocked': i % 7 == 0}
+            for i in range(200)
+        ]
+        results[3].pop('isLocked')
+        
+        temp_db.save_search_cache('full', 'full query', results, 24)
+        assert temp_db.get_cached_search('full') == results
+        
+        fields = ['username', 'filename', 'size', 'isLocked']
+        temp_db.save_search_cache('pruned', 'pruned query', results, 24, fields=fields)
+        cached = temp_db.get_cached_search('pruned')
+        assert cached[0] == {k: results[0][k] for k in fields}
+        assert 'isLocked' not in cached[3]
+        
+        stored = temp_db.get_connection().execute(
+            "SELECT results FROM search_cache WHERE query_hash = 'full'"
+        ).fetchone()[0]
+        assert isinstance(stored, bytes)
+        assert len(stored) * 5 < len(json.dumps(results))
+    
+    def test_search_cache_reads_legacy_json(self, temp_db):
+        """Testa leitura de entradas gravadas como JSON (formato anterior)"""
+        results = [{'filename': 'old.flac', 'username': 'user1'}]
+        with temp_db.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO search_cache (query_hash, query_text, results, expires_at) VALUES (?, ?, ?, ?)",
+                ('legacy', 'legacy query', json.dumps(results),
+                 (datetime.now() + timedelta(hours=1)).isoformat())
+            )
+        
+        assert temp_db.get_cached_search('legacy') == results
+    
     def test_cleanup_operations(self, temp_db):
         """Testa operações de limpeza"""
         # Adicionar cache expirado
@@ -136,3 +173,140 @@ class TestDatabaseManager:
         stats = temp_db.get_stats()
         assert stats['SUCCESS'] == 10
         assert stats['cache_entries'] == 10
+    
+    def test_connection_reused_per_thread(self, temp_db):
+        """Testa que cada thread reutiliza uma conexão própria"""
+        import threading
+        
+        conn_main = temp_db.get_connection()
+        assert temp_db.get_connection() is conn_main
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(temp_db.get_connection()))
+        thread.start()
+        thread.join()
+        
+        assert other[0] is not conn_main
+        
+        journal_mode = conn_main.execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode.lower() == 'wal'
+    
+    def test_connections_closed_when_threads_exit(self, temp_db):
+        """Testa que conexões de threads encerradas são fechadas"""
+        import sqlite3
+        import threading
+        
+        temp_db.get_connection()
+        opened = []
+        
+        def worker():
+            temp_db.is_downloaded('Artist - Song')
+            opened.append(temp_db.get_connection())
+        
+        for _ in range(50):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        
+        assert len(temp_db._connections) == 1
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+        
+        temp_db.release_connection()
+        assert temp_db._connections == []
+        assert temp_db.is_downloaded('Artist - Song') == False
+    
+    def test_concurrent_writers_threads(self, temp_db):
+        """Testa escrita simultânea de várias threads sem 'database is locked'"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        def worker(n):
+            for i in range(20):
+                temp_db.save_download({'id': f'{n}-{i}', 'file_line': f'Thread {n} - Song {i}'}, 'SUCCESS')
+                temp_db.is_downloaded(f'Thread {n} - Song {i}')
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(worker, range(4)))
+        
+        assert temp_db.get_stats()['SUCCESS'] == 80
+        temp_db.close()
+    
+    def test_library_location_columns(self, temp_db):
+        """Testa gravação do local final do arquivo na biblioteca"""
+        download_id = temp_db.save_download(
+            {'filename': 'song.flac', 'file_line': 'Artist - Album - Song'}, 'SUCCESS'
+        )
+        temp_db.set_library_locations([(download_id, '/media/music/Artist/Album/song.flac', 1024, 1700000000.5)])
+        
+        row = temp_db.get_successful_downloads()[0]
+        assert row['id'] == download_id
+        assert row['library_path'] == '/media/music/Artist/Album/song.flac'
+        assert row['library_size'] == 1024
+        assert row['library_mtime'] == 1700000000.5
+    
+    def test_migrates_downloads_without_library_columns(self):
+        """Testa migração de bancos antigos sem as colunas de local"""
+        import sqlite3
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'old.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE downloads (
+                    id TEXT PRIMARY KEY, username TEXT, filename TEXT,
+                    filename_normalized TEXT, file_line TEXT, status TEXT,
+                    file_size INTEGER, file_hash TEXT, requested_at DATETIME,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("INSERT INTO downloads (id, file_line, status) VALUES ('old', 'A - B - C', 'SUCCESS')")
+            conn.commit()
+            conn.close()
+            
+            db = DatabaseManager(db_path)
+            row = db.get_successful_downloads()[0]
+            assert row['id'] == 'old'
+            assert row['library_path'] is None
+            db.close()
+    
+    def test_file_hashes_by_library_path(self, temp_db):
+        """Testa gravação de impressão e hash pelos arquivos da biblioteca"""
+        download_id = temp_db.save_download({'file_line': 'Artist - Album - Song'}, 'SUCCESS')
+        temp_db.set_library_locations([(download_id, '/media/music/a.flac', 10, 1.5)])
+        
+        temp_db.set_file_hashes([('/media/music/a.flac', 10, 1.5, '10:abc', 'full')])
+        temp_db.set_file_hashes([('/media/music/a.flac', 10, 1.5, '10:abc', None)])
+        
+        assert temp_db.get_library_files() == {
+            '/media/music/a.flac': {
+                'size': 10, 'mtime': 1.5, 'fingerprint': '10:abc', 'file_hash': 'full', 'audio_hash': None
+            }
+        }
+        assert temp_db.is_duplicate_hash('full') == True
+        
+        temp_db.set_audio_hashes([('/media/music/a.flac', 10, 1.5, 'flac:123')])
+        assert temp_db.get_library_files()['/media/music/a.flac']['audio_hash'] == 'flac:123'
+        assert temp_db.is_duplicate_audio_hash('flac:123') == True
+        assert temp_db.is_duplicate_audio_hash('flac:456') == False
+    
+    def test_changed_file_drops_stale_hashes(self, temp_db):
+        """Testa que arquivo alterado perde os hashes antigos e grava tamanho/mtime atuais"""
+        download_id = temp_db.save_download({'file_line': 'Artist - Album - Song'}, 'SUCCESS')
+        temp_db.set_library_locations([(download_id, '/media/music/a.flac', 10, 1.5)])
+        temp_db.set_file_hashes([('/media/music/a.flac', 10, 1.5, '10:abc', 'full')])
+        temp_db.set_audio_hashes([('/media/music/a.flac', 10, 1.5, 'flac:123')])
+        
+        # Arquivo mudou: nova impressão, hash completo ainda não calculado
+        temp_db.set_file_hashes([('/media/music/a.flac', 12, 2.5, '12:def', None)])
+        
+        assert temp_db.get_library_files() == {
+            '/media/music/a.flac': {
+                'size': 12, 'mtime': 2.5, 'fingerprint': '12:def', 'file_hash': None, 'audio_hash': None
+            }
+        }
+        assert temp_db.is_duplicate_hash('full') == False
+        assert temp_db.is_duplicate_audio_hash('flac:123') == False
+        
+        # Modo áudio com arquivo alterado de novo descarta a impressão antiga
+        temp_db.set_audio_hashes([('/media/music/a.flac', 14, 3.5, 'flac:456')])
+        files = temp_db.get_library_files()['/media/music/a.flac']
+        assert (files['size'], files['mtime'], files['fingerprint'], files['audio_hash']) == (14, 3.5, None, 'flac:456')
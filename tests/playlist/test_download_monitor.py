@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import Mock
+
+from src.playlist.download_monitor import (
+    RESULT_QUEUE_TIMEOUT,
+    RESULT_TIMEOUT,
+    DownloadMonitor,
+)
+
+
+def _queue(*files):
+    """Monta resposta de transfers.get_all_downloads()"""
+    users = {}
+    for username, filename, state in files:
+        users.setdefault(username, []).append(
+            {"id": f"id-{filename}", "filename": filename, "state": state}
+        )
+    return [
+        {"username": username, "directories": [{"files": user_files}]}
+        for username, user_files in users.items()
+    ]
+
+
+class TestDownloadMonitor:
+
+    @pytest.fixture
+    def client(self):
+        return Mock()
+
+    @pytest.fixture
+    def monitor(self, client):
+        monitor = DownloadMonitor(client, poll_interval=0.01)
+        # Ciclos controlados manualmente pelo teste
+        monitor._thread = Mock(is_alive=Mock(return_value=True))
+        return monitor
+
+    def test_single_queue_poll_for_many_downloads(self, monitor, client):
+        """Testa que vários downloads usam uma consulta à fila por ciclo"""
+        client.get_download_queue.return_value = _queue(
+            ("user1", "a.flac", "InProgress"),
+            ("user1", "b.flac", "InProgress"),
+            ("user2", "c.flac", "InProgress"),
+        )
+        futures = [
+            monitor.watch({"id": f"{user}:{name}", "username": user, "filename": name}, 60)
+            for user, name in [("user1", "a.flac"), ("user1", "b.flac"), ("user2", "c.flac")]
+        ]
+
+        assert monitor.poll_once() == 3
+        assert client.get_download_queue.call_count == 1
+        assert not any(f.done() for f in futures)
+
+        client.get_download_queue.return_value = _queue(
+            ("user1", "a.flac", "Completed, Succeeded"),
+            ("user1", "b.flac", "Completed, Errored"),
+            ("user2", "c.flac", "InProgress"),
+        )
+
+        assert monitor.poll_once() == 1
+        assert client.get_download_queue.call_count == 2
+        assert futures[0].result(timeout=0) == "Completed, Succeeded"
+        assert futures[1].result(timeout=0) == "Completed, Errored"
+        assert not futures[2].done()
+
+    def test_state_callback_on_change(self, monitor, client):
+        """Testa callback chamado apenas quando o estado muda"""
+        states = []
+        client.get_download_queue.return_value = _queue(("user1", "a.flac", "InProgress"))
+        monitor.watch({"id": "id-a.flac"}, 60, on_state=states.append)
+
+        monitor.poll_once()
+        monitor.poll_once()
+
+        assert states == ["InProgress"]
+
+    def test_queue_stall_timeout(self, client):
+        """Testa desistência quando fica parado em 'Queued, Remotely'"""
+        monitor = DownloadMonitor(client, poll_interval=0.01, queue_stall_seconds=0)
+        monitor._thread = Mock(is_alive=Mock(return_value=True))
+        client.get_download_queue.return_value = _queue(("user1", "a.flac", "Queued, Remotely"))
+        future = monitor.watch({"id": "user1:a.flac"}, 60)
+
+        monitor.poll_once()
+        monitor.poll_once()
+
+        assert future.result(timeout=0) == RESULT_QUEUE_TIMEOUT
+
+    def test_overall_timeout(self, monitor, client):
+        """Testa timeout geral quando o download some da fila"""
+        client.get_download_queue.return_value = []
+        future = monitor.watch({"id": "user1:a.flac"}, 0)
+
+        assert monitor.poll_once() == 0
+        assert future.result(timeout=0) == RESULT_TIMEOUT
+
+    def test_background_thread_resolves_future(self, client):
+        """Testa resolução pela thread de monitoramento"""
+        client.get_download_queue.return_value = _queue(
+            ("user1", "a.flac", "Completed, Succeeded")
+        )
+        monitor = DownloadMonitor(client, poll_interval=0.01)
+
+        future = monitor.watch({"id": "user1:a.flac"}, 60)
+
+        assert future.result(timeout=5) == "Completed, Succeeded"
+        assert monitor.active_count() == 0
@@ -63,6 +63,39 @@ class TestDuplicateDetector:
         assert detector.fuzzy_match_song("Led Zeppelin", "Stairway to Heaven", 0.8) == False
         assert detector.fuzzy_match_song("Pink Floyd", "Different Song", 0.8) == False
     
+    def test_fuzzy_match_uses_trigram_index(self, detector):
+        """Testa que o índice de trigramas mantém a semântica do SequenceMatcher"""
+        from difflib import SequenceMatcher
+        
+        lines = [
+            'Pink Floyd - Comfortably Numb',
+            'Pink Floyd - Comfortably Dumb',
+            'Pink Floyd - The Wall - Another Brick',
+            'Led Zeppelin - Stairway to Heaven',
+            'Metallica - Master of Puppets',
+        ]
+        for i, line in enumerate(lines):
+            detector.db_manager.save_download({'id': f'id-{i}', 'file_line': line}, 'SUCCESS')
+        
+        queries = [("Pink Floyd", "Comfortably Numb"), ("Metallica", "Master of Puppet"), ("Queen", "Bohemian")]
+        for artist, song in queries:
+            search_text = f"{artist} {song}".lower()
+            expected = [l for l in lines if SequenceMatcher(None, search_text, l.lower()).ratio() >= 0.85]
+            assert sorted(detector.fuzzy_match_song(artist, song)) == sorted(expected)
+        
+        # Apenas poucos candidatos chegam ao SequenceMatcher
+        candidates = detector.db_manager.find_song_candidates("metallica master of puppets", 0.85)
+        assert candidates == ['Metallica - Master of Puppets']
+    
+    def test_trigram_index_follows_status(self, detector):
+        """Testa que o índice remove downloads que deixam de ser SUCCESS"""
+        db = detector.db_manager
+        db.save_download({'id': 'x', 'file_line': 'Artist - Song Title'}, 'SUCCESS')
+        assert db.find_song_candidates("artist - song title", 0.85) == ['Artist - Song Title']
+        
+        db.save_download({'id': 'x', 'file_line': 'Artist - Song Title'}, 'ERROR')
+        assert db.find_song_candidates("artist - song title", 0.85) == []
+    
     def test_calculate_file_hash(self, detector):
         """Testa cálculo de hash MD5"""
         with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
@@ -0,0 +1,152 @@
+import pytest
+import tempfile
+import hashlib
+import os
+from pathlib import Path
+from unittest.mock import patch
+from src.playlist import file_hasher
+from src.playlist.file_hasher import FileHasher, audio_hash, fingerprint, full_hash, iter_library
+
+class TestFileHasher:
+
+    @pytest.fixture
+    def library(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "Artist" / "Album").mkdir(parents=True)
+            (root / "Other").mkdir()
+
+            content = os.urandom(300 * 1024)
+            (root / "Artist" / "Album" / "01 - Song.flac").write_bytes(content)
+            (root / "Other" / "01 - Song (copy).flac").write_bytes(content)
+            # Mesmo tamanho, início e fim iguais: só o meio difere
+            changed = bytearray(content)
+            changed[150 * 1024] ^= 0xFF
+            (root / "Other" / "Middle.flac").write_bytes(bytes(changed))
+            # Difere fora dos blocos amostrados: mesma impressão, hash diferente
+            hidden = bytearray(content)
+            hidden[40 * 1024 * 2 + 10] ^= 0xFF
+            (root / "Other" / "Hidden.flac").write_bytes(bytes(hidden))
+            (root / "Artist" / "Album" / "02 - Unique.flac").write_bytes(os.urandom(200 * 1024))
+            (root / "Artist" / "cover.jpg").write_bytes(b"jpg")
+            yield root
+
+    def test_fingerprint_and_full_hash(self, library):
+        """Testa impressão digital por amostragem e hash completo"""
+        song = library / "Artist" / "Album" / "01 - Song.flac"
+        data = song.read_bytes()
+
+        assert full_hash(str(song), buffer_size=4096) == hashlib.md5(data).hexdigest()
+        assert fingerprint(str(song), 16 * 1024).startswith(f"{len(data)}:")
+        assert fingerprint(str(song), 16 * 1024) == fingerprint(str(library / "Other" / "01 - Song (copy).flac"), 16 * 1024)
+        assert fingerprint(str(song), 16 * 1024) != fingerprint(str(library / "Other" / "Middle.flac"), 16 * 1024)
+        assert fingerprint(str(song), 16 * 1024) == fingerprint(str(library / "Other" / "Hidden.flac"), 16 * 1024)
+
+    def test_iter_library_only_audio(self, library):
+        """Testa varredura da biblioteca apenas com arquivos de áudio"""
+        names = sorted(os.path.basename(path) for path in iter_library(str(library)))
+
+        assert names == ['01 - Song (copy).flac', '01 - Song.flac', '02 - Unique.flac', 'Hidden.flac', 'Middle.flac']
+
+    def test_full_hash_only_on_collisions(self, library):
+        """Testa que o hash completo só é calculado para impressões repetidas"""
+        hasher = FileHasher(max_workers=3, block_size=16 * 1024)
+
+        with patch.object(file_hasher, 'full_hash', wraps=full_hash) as mock_full:
+            results = hasher.hash_files(iter_library(str(library)))
+
+        hashed = sorted(os.path.basename(call.args[0]) for call in mock_full.call_args_list)
+        assert hashed == ['01 - Song (copy).flac', '01 - Song.flac', 'Hidden.flac']
+        assert hasher.fingerprinted == 5
+        assert hasher.fully_hashed == 3
+        assert results[str(library / "Artist" / "Album" / "02 - Unique.flac")]['file_hash'] is None
+
+        groups = hasher.duplicate_groups(results)
+        assert [[os.path.basename(path) for path in group] for group in groups] == [
+            ['01 - Song.flac', '01 - Song (copy).flac']
+        ]
+
+    def test_reuses_known_fingerprints(self, library):
+        """Testa reaproveitamento de impressões quando tamanho e mtime não mudaram"""
+        hasher = FileHasher(max_workers=2, block_size=16 * 1024)
+        paths = list(iter_library(str(library)))
+        known = hasher.hash_files(paths)
+
+        again = FileHasher(max_workers=2, block_size=16 * 1024)
+        with patch.object(file_hasher, 'fingerprint') as mock_fingerprint, \
+             patch.object(file_hasher, 'full_hash') as mock_full:
+            results = again.hash_files(paths, known)
+
+        mock_fingerprint.assert_not_called()
+        mock_full.assert_not_called()
+        assert again.duplicate_groups(results) == hasher.duplicate_groups(known)
+
+def flac_bytes(md5: bytes, comment: bytes, padding: int, frames: bytes) -> bytes:
+    """FLAC mínimo: STREAMINFO, VORBIS_COMMENT, PADDING (último) e frames"""
+    def block(block_type, data, last=False):
+        return bytes([block_type | (0x80 if last else 0)]) + len(data).to_bytes(3, 'big') + data
+    streaminfo = bytes(18) + md5
+    return (b"fLaC" + block(0, streaminfo) + block(4, comment)
+            + block(1, bytes(padding), last=True) + frames)
+
+class TestAudioHash:
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield Path(temp_dir)
+
+    def test_flac_streaminfo_md5_ignores_tags(self, temp_dir):
+        """Testa uso do MD5 do STREAMINFO, independente de tags e padding"""
+        md5 = bytes(range(1, 17))
+        a = temp_dir / "a.flac"
+        b = temp_dir / "b.flac"
+        a.write_bytes(flac_bytes(md5, b"peer one tags", 100, b"\xff\xf8frames"))
+        b.write_bytes(flac_bytes(md5, b"other peer, other tags", 4096, b"\xff\xf8frames"))
+
+        assert audio_hash(str(a)) == audio_hash(str(b)) == f"flac:{md5.hex()}"
+        assert full_hash(str(a)) != full_hash(str(b))
+
+    def test_flac_without_md5_hashes_frames(self, temp_dir):
+        """Testa hash dos frames quando o STREAMINFO não tem MD5"""
+        frames = os.urandom(5000)
+        a = temp_dir / "a.flac"
+        b = temp_dir / "b.flac"
+        c = temp_dir / "c.flac"
+        a.write_bytes(flac_bytes(bytes(16), b"tags", 10, frames))
+        b.write_bytes(b"ID3\x03\x00\x00\x00\x00\x00\x05" + b"12345" + flac_bytes(bytes(16), b"x", 8192, frames))
+        c.write_bytes(flac_bytes(bytes(16), b"tags", 10, frames[:-1] + b"\x00"))
+
+        assert audio_hash(str(a)) == audio_hash(str(b)) == f"frames:{hashlib.md5(frames).hexdigest()}"
+        assert audio_hash(str(a)) != audio_hash(str(c))
+
+    def test_mp3_ignores_id3_tags(self, temp_dir):
+        """Testa MP3 sem as tags ID3v2 (início) e ID3v1 (fim)"""
+        frames = os.urandom(4000)
+        a = temp_dir / "a.mp3"
+        b = temp_dir / "b.mp3"
+        a.write_bytes(frames)
+        b.write_bytes(b"ID3\x04\x00\x00\x00\x00\x00\x03" + b"abc" + frames + b"TAG" + bytes(125))
+
+        assert audio_hash(str(a)) == audio_hash(str(b))
+        assert audio_hash(str(temp_dir / "a.mp3")).startswith("frames:")
+
+        other = temp_dir / "c.ogg"
+        other.write_bytes(b"OggS" + frames)
+        assert audio_hash(str(other)) is None
+
+    def test_hash_audio_groups_cross_source_copies(self, temp_dir):
+        """Testa varredura em modo áudio agrupando cópias com tags diferentes"""
+        md5 = os.urandom(16)
+        (temp_dir / "Artist").mkdir()
+        (temp_dir / "Artist" / "song.flac").write_bytes(flac_bytes(md5, b"a", 10, b"frames"))
+        (temp_dir / "song (1).flac").write_bytes(flac_bytes(md5, b"bb", 20, b"frames"))
+        (temp_dir / "other.flac").write_bytes(flac_bytes(os.urandom(16), b"a", 10, b"frames"))
+
+        hasher = FileHasher(max_workers=2)
+        results = hasher.hash_audio(iter_library(str(temp_dir)))
+
+        assert hasher.audio_hashed == 3
+        assert hasher.duplicate_groups(results) == []
+        assert [sorted(os.path.basename(path) for path in group)
+                for group in hasher.duplicate_groups(results, key='audio_hash')] == [['song (1).flac', 'song.flac']]
@@ -0,0 +1,90 @@
+import pytest
+import tempfile
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+from src.playlist.file_index import FileIndex
+from src.playlist.file_organizer import FileOrganizer
+
+class TestFileIndex:
+    
+    @pytest.fixture
+    def tree(self):
+        """Árvore temporária no formato de /media/slskd"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "slskd"
+            album = root / "user1" / "Album (2020)"
+            album.mkdir(parents=True)
+            (album / "01 - Song.flac").write_bytes(b"a")
+            (album / "cover.jpg").write_bytes(b"b")
+            (root / "user2").mkdir()
+            (root / "user2" / "02 - Other_639000000000000000.flac").write_bytes(b"c")
+            yield root
+    
+    def test_exact_and_suffix_lookup(self, tree):
+        """Testa busca por nome exato e por sufixo (como find -name *nome)"""
+        index = FileIndex(str(tree))
+        
+        assert index.find("@@user1\\Music\\Album\\01 - Song.flac") == str(tree / "user1" / "Album (2020)" / "01 - Song.flac")
+        assert index.find("Other_639000000000000000.flac") == str(tree / "user2" / "02 - Other_639000000000000000.flac")
+        assert index.find("missing.flac") is None
+        assert len(index) == 3
+    
+    def test_refresh_rescans_only_changed_dirs(self, tree):
+        """Testa que apenas pastas com mtime alterado são relidas"""
+        index = FileIndex(str(tree))
+        index.build()
+        scanned = index.scanned_dirs
+        
+        time.sleep(0.01)
+        new_album = tree / "user3" / "New"
+        new_album.mkdir(parents=True)
+        (new_album / "03 - New.flac").write_bytes(b"d")
+        os.remove(tree / "user2" / "02 - Other_639000000000000000.flac")
+        
+        assert index.find("03 - New.flac") == str(new_album / "03 - New.flac")
+        # raiz e user2 relidas, user3 e New lidas pela primeira vez
+        assert index.scanned_dirs - scanned == 4
+        assert index.find("Other_639000000000000000.flac", refresh=False) is None
+    
+    def test_removed_directory_is_forgotten(self, tree):
+        """Testa remoção de pasta inteira entre leituras"""
+        index = FileIndex(str(tree))
+        index.build()
+        
+        album = tree / "user1" / "Album (2020)"
+        for name in os.listdir(album):
+            os.remove(album / name)
+        album.rmdir()
+        
+        assert index.find("01 - Song.flac") is None
+        assert len(index) == 1
+    
+    def test_move_updates_index(self, tree):
+        """Testa add/remove/move sem reler a árvore"""
+        index = FileIndex(str(tree))
+        index.build()
+        
+        source = tree / "user1" / "Album (2020)" / "01 - Song.flac"
+        target_dir = tree / "Artist" / "Album"
+        target_dir.mkdir(parents=True)
+        target = target_dir / "01 - Song.flac"
+        os.rename(source, target)
+        index.move(str(source), str(target))
+        
+        with patch.object(index, 'refresh') as mock_refresh:
+            assert index.find("01 - Song.flac") == str(target)
+            mock_refresh.assert_not_called()
+    
+    def test_organizer_uses_index(self, tree):
+        """Testa que o FileOrganizer não roda find a cada arquivo"""
+        music = tree.parent / "music"
+        organizer = FileOrganizer(slskd_path=str(tree), music_path=str(music))
+        
+        with patch('subprocess.run') as mock_run:
+            assert organizer.organize_file("user1\\Album (2020)\\01 - Song.flac", "Artist", "Album")
+            mock_run.assert_not_called()
+        
+        assert (music / "Artist" / "Album" / "01 - Song.flac").exists()
+        assert organizer.slskd_index.find("01 - Song.flac", refresh=False) is None
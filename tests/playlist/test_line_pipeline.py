@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from src.playlist.line_pipeline import Finished, LinePipeline, PeerLimiter
+
+
+class TestLinePipeline:
+
+    def test_map_keeps_input_order(self):
+        """Testa que os resultados voltam na ordem de entrada"""
+        pipeline = LinePipeline([
+            ("double", lambda x: x * 2, 3),
+            ("sleep", lambda x: time.sleep(0.01 * (10 - x % 10)) or x + 1, 4),
+        ])
+
+        assert pipeline.map(range(20)) == [x * 2 + 1 for x in range(20)]
+
+    def test_finished_skips_later_stages(self):
+        """Testa que Finished encerra o item sem passar pelos próximos estágios"""
+        later = []
+        pipeline = LinePipeline([
+            ("check", lambda x: Finished("skip") if x % 2 else x, 1),
+            ("work", lambda x: later.append(x) or "done", 2),
+        ])
+
+        assert pipeline.map(range(4)) == ["done", "skip", "done", "skip"]
+        assert sorted(later) == [0, 2]
+
+    def test_stage_errors_use_on_error(self):
+        """Testa que exceções de um estágio viram o valor de on_error"""
+        errors = []
+
+        def fail_on_two(x):
+            if x == 2:
+                raise ValueError("boom")
+            return x
+
+        pipeline = LinePipeline(
+            [("work", fail_on_two, 2)],
+            on_error=lambda item, exc: errors.append((item, str(exc))) or -1,
+        )
+
+        assert pipeline.map(range(4)) == [0, 1, -1, 3]
+        assert errors == [(2, "boom")]
+
+    def test_stage_pool_and_queues_are_bounded(self):
+        """Testa que cada estágio respeita seu número de workers e a fila limita o adiantamento"""
+        lock = threading.Lock()
+        state = {'slow': 0, 'slow_peak': 0, 'fed': 0, 'done': 0, 'ahead': 0}
+
+        def fast(x):
+            with lock:
+                state['fed'] += 1
+                state['ahead'] = max(state['ahead'], state['fed'] - state['done'])
+            return x
+
+        def slow(x):
+            with lock:
+                state['slow'] += 1
+                state['slow_peak'] = max(state['slow_peak'], state['slow'])
+            time.sleep(0.01)
+            with lock:
+                state['slow'] -= 1
+                state['done'] += 1
+            return x
+
+        pipeline = LinePipeline([("fast", fast, 1), ("slow", slow, 2)], queue_size=2)
+        assert pipeline.map(range(30)) == list(range(30))
+
+        assert state['slow_peak'] <= 2
+        # Workers lentos + fila + item no worker rápido
+        assert state['ahead'] <= 2 + 2 + 1
+
+    def test_run_reports_completion(self):
+        """Testa on_result chamado para cada item e contagem de itens"""
+        seen = []
+        pipeline = LinePipeline([("upper", str.upper, 2)])
+
+        total = pipeline.run(iter(["a", "b", "c"]), lambda index, item, value: seen.append((index, item, value)))
+
+        assert total == 3
+        assert sorted(seen) == [(0, "a", "A"), (1, "b", "B"), (2, "c", "C")]
+
+    def test_peer_limiter(self):
+        """Testa limite de downloads simultâneos por usuário"""
+        limiter = PeerLimiter(1)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with limiter.slot("peer1"):
+                entered.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait(5)
+
+        acquired = []
+
+        def try_same_peer():
+            with limiter.slot("peer1"):
+                acquired.append("peer1")
+
+        waiter = threading.Thread(target=try_same_peer)
+        waiter.start()
+        with limiter.slot("peer2"):
+            acquired.append("peer2")
+        time.sleep(0.05)
+        assert acquired == ["peer2"]
+
+        release.set()
+        thread.join()
+        waiter.join()
+        assert acquired == ["peer2", "peer1"]
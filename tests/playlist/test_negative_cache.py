@@ -0,0 +1,93 @@
+import pytest
+import tempfile
+import os
+import time
+from unittest.mock import patch
+from src.playlist.database_manager import DatabaseManager
+from src.playlist.cache_manager import CacheManager
+from src.playlist.negative_cache import NegativeCache
+
+class TestNegativeCache:
+    
+    @pytest.fixture
+    def db(self):
+        """Banco temporário"""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        
+        yield DatabaseManager(db_path)
+        
+        if os.path.exists(db_path):
+            os.unlink(db_path)
+    
+    def test_ttl_grows_exponentially(self, db):
+        """Testa TTL dobrando a cada falha até o máximo"""
+        cache = NegativeCache(db, base_ttl_minutes=10, max_ttl_hours=1)
+        
+        ttls = [cache.record_miss("Artist - Song *.flac") for _ in range(5)]
+        
+        assert ttls == [600, 1200, 2400, 3600, 3600]
+        assert cache.is_negative("Artist - Song *.flac")
+        assert not cache.is_negative("Artist - Song *.flac", kind="line")
+    
+    def test_expired_entry_allows_retry(self, db):
+        """Testa que a busca volta a ser permitida após o TTL"""
+        cache = NegativeCache(db, base_ttl_minutes=10)
+        cache.record_miss("query")
+        
+        with patch('src.playlist.negative_cache.time.time', return_value=time.time() + 601):
+            assert not cache.is_negative("query")
+        
+        cache.clear("query")
+        assert db.get_negative_cache(cache.get_key("query")) is None
+    
+    def test_disabled_with_zero_ttl(self, db):
+        """Testa desativação com TTL 0"""
+        cache = NegativeCache(db, base_ttl_minutes=0)
+        
+        assert cache.record_miss("query") == 0
+        assert not cache.is_negative("query")
+    
+    def test_legacy_failure_seeded_from_created_at(self, db):
+        """Testa linha com falha antiga sem entrada: prazo conta do registro"""
+        cache = NegativeCache(db, base_ttl_minutes=60)
+        line = "Artist - Album - Song"
+        seed = lambda: db.get_last_failure(line)
+        
+        assert db.get_last_failure(line) is None
+        assert not cache.is_negative(line, "line", seed=seed)
+        
+        db.save_download({"file_line": line, "filename": "", "username": ""}, "ERROR")
+        count, failed_at = db.get_last_failure(line)
+        assert count == 1
+        assert abs(failed_at - time.time()) < 60
+        
+        assert cache.is_negative(line, "line", seed=seed)
+        assert db.get_negative_cache(cache.get_key(line, "line"))['miss_count'] == 1
+        
+        # Falha antiga demais: entrada criada já vencida
+        with patch.object(db, 'get_last_failure', return_value=(2, time.time() - 3 * 3600)):
+            cache.clear(line, "line")
+            assert not cache.is_negative(line, "line", seed=seed)
+        # Próxima falha continua a contagem
+        assert cache.record_miss(line, "line") == 4 * 3600
+    
+    def test_search_with_cache_skips_recent_empty_query(self, db):
+        """Testa que busca vazia recente não chama o slskd de novo"""
+        with patch.dict(os.environ, {'NEGATIVE_CACHE_TTL_MINUTES': '30'}):
+            cache_manager = CacheManager(db)
+        calls = []
+        
+        def search(q):
+            calls.append(q)
+            return [] if len(calls) == 1 else [{'filename': 'found.flac'}]
+        
+        assert cache_manager.search_with_cache("obscure song", search) == []
+        assert cache_manager.search_with_cache("obscure song", search) == []
+        assert len(calls) == 1
+        
+        # Bloqueio vencido: busca de novo e limpa o cache negativo
+        with patch('src.playlist.negative_cache.time.time', return_value=time.time() + 1801):
+            assert cache_manager.search_with_cache("obscure song", search) == [{'filename': 'found.flac'}]
+        assert len(calls) == 2
+        assert not cache_manager.negative.is_negative("obscure song")
@@ -0,0 +1,72 @@
+import pytest
+import tempfile
+import os
+import stat
+from pathlib import Path
+from src.playlist.playlist_file import PlaylistLineSource, RemainingLinesWriter, write_lines_atomic
+
+class TestPlaylistFile:
+    
+    @pytest.fixture
+    def playlist(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield Path(temp_dir) / "lastfm.txt"
+    
+    def test_line_source_tracks_offsets(self, playlist):
+        """Testa leitura linha a linha com offset em bytes"""
+        playlist.write_bytes("Björk - Jóga\n\n  Low - Words  \r\nAir - Playground Love".encode("utf-8"))
+        source = PlaylistLineSource(str(playlist))
+        
+        seen = []
+        for line in source:
+            seen.append((line, source.offset, source.line_number))
+        
+        assert seen == [
+            ("Björk - Jóga", 15, 1),
+            ("Low - Words", 33, 2),
+            ("Air - Playground Love", 54, 3),
+        ]
+        assert source.progress == 1.0
+        assert source.has_lines()
+    
+    def test_line_source_empty_file(self, playlist):
+        """Testa arquivo só com linhas em branco"""
+        playlist.write_text("\n   \n")
+        
+        assert not PlaylistLineSource(str(playlist)).has_lines()
+    
+    def test_remaining_writer_replaces_on_success(self, playlist):
+        """Testa que o temporário só substitui o original ao fim do bloco"""
+        playlist.write_text("A\nB\nC\n")
+        
+        with RemainingLinesWriter(str(playlist)) as writer:
+            for line in PlaylistLineSource(str(playlist)):
+                if line != "B":
+                    writer.write(line)
+            assert playlist.read_text() == "A\nB\nC\n"
+        
+        assert writer.count == 2
+        assert playlist.read_text() == "A\nC\n"
+        assert os.listdir(playlist.parent) == ["lastfm.txt"]
+    
+    def test_remaining_writer_keeps_file_mode(self, playlist):
+        """Testa que a compactação mantém as permissões da playlist"""
+        playlist.write_text("A\nB\n")
+        os.chmod(playlist, 0o664)
+        
+        assert write_lines_atomic(str(playlist), ["A"]) == 1
+        
+        assert playlist.read_text() == "A\n"
+        assert stat.S_IMODE(playlist.stat().st_mode) == 0o664
+    
+    def test_remaining_writer_discards_on_error(self, playlist):
+        """Testa que erro no meio da escrita mantém o original"""
+        playlist.write_text("A\nB\n")
+        
+        with pytest.raises(RuntimeError):
+            with RemainingLinesWriter(str(playlist)) as writer:
+                writer.write("A")
+                raise RuntimeError("queda")
+        
+        assert playlist.read_text() == "A\nB\n"
+        assert os.listdir(playlist.parent) == ["lastfm.txt"]
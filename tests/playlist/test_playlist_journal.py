@@ -0,0 +1,111 @@
+import pytest
+import tempfile
+import os
+from pathlib import Path
+from unittest.mock import Mock, patch
+from src.playlist.database_manager import DatabaseManager
+from src.playlist.line_pipeline import Finished
+from src.playlist.playlist_file import PlaylistLineSource, write_lines_atomic
+from src.playlist.playlist_journal import PlaylistJournal
+
+class TestPlaylistJournal:
+    
+    @pytest.fixture
+    def temp_env(self):
+        """Banco e pasta de playlists temporários"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            yield {
+                'db': DatabaseManager(str(temp_path / "test.db")),
+                'playlist': temp_path / "rock.txt",
+            }
+    
+    def test_record_and_periodic_compaction(self, temp_env):
+        """Testa que linhas concluídas com sucesso saem do arquivo a cada N linhas"""
+        playlist = temp_env['playlist']
+        playlist.write_text("A - 1\nB - 2\nC - 3\nD - 4\n")
+        journal = PlaylistJournal(temp_env['db'], str(playlist), compact_every_lines=2, compact_interval=0)
+        
+        journal.record("A - 1", True)
+        journal.record("B - 2", False)
+        assert playlist.read_text() == "A - 1\nB - 2\nC - 3\nD - 4\n"
+        
+        journal.record("C - 3", True)
+        assert playlist.read_text() == "B - 2\nD - 4\n"
+        assert temp_env['db'].get_playlist_journal(str(playlist)) == {
+            "A - 1": True, "B - 2": False, "C - 3": True
+        }
+    
+    def test_compaction_scales_with_file_size(self, temp_env):
+        """Testa que arquivos grandes não são reescritos a cada N linhas"""
+        playlist = temp_env['playlist']
+        lines = [f"Artist {i} - Album - Song {i}" for i in range(2000)]
+        playlist.write_text("\n".join(lines) + "\n")
+        journal = PlaylistJournal(temp_env['db'], str(playlist), compact_every_lines=25,
+                                  compact_interval=0, compact_fraction=0.1)
+        
+        for line in journal.pending(PlaylistLineSource(str(playlist))):
+            journal.record(line, True)
+        
+        # 10% do tamanho atual por reescrita: ~log(2000)/log(1/0.9), não 2000/25
+        assert journal.compactions < 40
+        journal.compact()
+        assert playlist.read_text() == ""
+    
+    def test_resume_after_crash(self, temp_env):
+        """Testa que um novo diário retoma as linhas registradas antes da queda"""
+        playlist = temp_env['playlist']
+        playlist.write_text("A - 1\nB - 2\nC - 3\n")
+        journal = PlaylistJournal(temp_env['db'], str(playlist), compact_every_lines=0, compact_interval=0)
+        journal.record("A - 1", True)
+        journal.record("B - 2", False)
+        
+        # Nova execução após a queda (arquivo ainda não compactado)
+        resumed = PlaylistJournal(temp_env['db'], str(playlist), compact_every_lines=0, compact_interval=0)
+        assert resumed.resumed
+        assert resumed.outcome("A - 1") is True
+        assert resumed.outcome("B - 2") is False
+        assert list(resumed.pending(PlaylistLineSource(str(playlist)))) == ["C - 3"]
+        
+        assert resumed.compact() == 2
+        assert playlist.read_text() == "B - 2\nC - 3\n"
+        
+        resumed.clear()
+        assert temp_env['db'].get_playlist_journal(str(playlist)) == {}
+    
+    def test_atomic_write_keeps_original_on_failure(self, temp_env):
+        """Testa que falha na escrita não corrompe o arquivo original"""
+        playlist = temp_env['playlist']
+        playlist.write_text("A - 1\nB - 2\n")
+        
+        def lines():
+            yield "A - 1"
+            raise IOError("disco cheio")
+        
+        with pytest.raises(IOError):
+            write_lines_atomic(str(playlist), lines())
+        
+        assert playlist.read_text() == "A - 1\nB - 2\n"
+        assert not [name for name in os.listdir(playlist.parent) if name.endswith(".tmp")]
+    
+    def test_processor_resumes_file(self, temp_env):
+        """Testa que o processador não reprocessa linhas do diário"""
+        from src.playlist.playlist_processor import PlaylistProcessor
+        
+        playlist = temp_env['playlist']
+        playlist.write_text("A - 1\nB - 2\nC - 3\nD - 4\n")
+        temp_env['db'].record_playlist_line(str(playlist), "A - 1", True)
+        temp_env['db'].record_playlist_line(str(playlist), "B - 2", False)
+        
+        with patch('src.playlist.playlist_processor.DatabaseManager', return_value=temp_env['db']), \
+             patch('src.playlist.playlist_processor.SlskdApiClient'), \
+             patch('src.playlist.playlist_processor.ProcessLock'):
+            processor = PlaylistProcessor()
+        
+        check = Mock(side_effect=lambda line: Finished(line == "C - 3"))
+        with patch.object(processor, '_check_line', check):
+            processor.process_playlist_file(str(playlist))
+        
+        assert sorted(call.args[0] for call in check.call_args_list) == ["C - 3", "D - 4"]
+        assert playlist.read_text() == "B - 2\nD - 4\n"
+        assert temp_env['db'].get_playlist_journal(str(playlist)) == {}
@@ -4,6 +4,7 @@ import os
 import time
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
+from src.playlist.line_pipeline import Finished
 from src.playlist.playlist_processor import PlaylistProcessor
 
 class TestPlaylistProcessor:
@@ -154,6 +155,28 @@ class TestPlaylistProcessor:
         assert result['processed_files'] == 2
         assert result['processed_lines'] == 2
     
+    def test_cache_hits_flushed_on_shutdown(self, mock_processor, temp_env):
+        """Testa que hits sem save posterior chegam ao banco ao fim da execução"""
+        from src.playlist.cache_manager import CacheManager
+        from src.playlist.database_manager import DatabaseManager
+        processor, mocks = mock_processor
+        
+        db = DatabaseManager(temp_env['db_path'])
+        cache = CacheManager(db)
+        cache.save_results("query1", [{'filename': 'a.flac'}])
+        cache.get_cached_results("query1")
+        cache.get_cached_results("query1")
+        cache.get_cached_results("missing")
+        processor.slskd_client.cache_manager = cache
+        
+        # Sem playlists: termina logo, como uma execução curta do cron
+        processor.process_all_playlists()
+        
+        counters = db.get_cache_counters()
+        assert counters['hits'] == 2
+        assert counters['misses'] == 1
+        assert db.get_top_cached_queries(1)[0]['hits'] == 2
+    
     def test_parse_file_line(self, mock_processor):
         """Testa parsing de linha do arquivo"""
         processor, mocks = mock_processor
@@ -418,33 +441,6 @@ class TestPlaylistProcessor:
         not_found = processor._find_existing_download(queue, 'user1', 'nonexistent.flac')
         assert not_found is None
     
-    def test_wait_for_queue_change_success(self, mock_processor):
-        """Testa aguardar mudança de status da fila com sucesso"""
-        processor, mocks = mock_processor
-        
-        # Mock status mudando de "Queued, Remotely" para "InProgress"
-        mocks['api'].get_download_status.side_effect = [
-            {'state': 'Queued, Remotely'},
-            {'state': 'InProgress'}
-        ]
-        
-        result = processor._wait_for_queue_change('download-123', 30)
-        
-        assert result == True
-        assert mocks['api'].get_download_status.call_count == 2
-    
-    def test_wait_for_queue_change_timeout(self, mock_processor):
-        """Testa timeout na mudança de status da fila"""
-        processor, mocks = mock_processor
-        
-        # Mock status sempre "Queued, Remotely"
-        mocks['api'].get_download_status.return_value = {'state': 'Queued, Remotely'}
-        
-        with patch('time.sleep'):  # Acelerar teste
-            result = processor._wait_for_queue_change('download-123', 1)  # 1 segundo timeout
-        
-        assert result == False
-    
     def test_handle_download_success(self, mock_processor):
         """Testa tratamento de sucesso do download"""
         processor, mocks = mock_processor
@@ -507,3 +503,110 @@ class TestPlaylistProcessor:
                 
         finally:
             os.unlink(temp_path)
+
+    def test_process_lines_concurrent_keeps_order(self, mock_processor):
+        """Testa processamento paralelo mantendo a ordem das linhas"""
+        processor, _ = mock_processor
+        processor.max_concurrent_downloads = 3
+
+        lines = [f"Artist - Song {i}" for i in range(6)]
+        with patch.object(processor, '_check_line',
+                          side_effect=lambda line: Finished(line.endswith(('0', '2', '4')))):
+            results = processor._process_lines(lines)
+
+        assert results == [True, False, True, False, True, False]
+        assert processor.stats['lines_processed'] == 6
+
+    def test_monitor_download_uses_shared_monitor(self, mock_processor):
+        """Testa que o monitoramento usa o DownloadMonitor compartilhado"""
+        processor, mocks = mock_processor
+        mocks['api'].get_download_queue.return_value = [{
+            'username': 'user1',
+            'directories': [{'files': [{'id': 'abc', 'filename': 'song.flac',
+                                        'state': 'Completed, Errored'}]}]
+        }]
+
+        download_info = {'id': 'user1:song.flac', 'username': 'user1', 'filename': 'song.flac'}
+        result = processor._monitor_download('Artist - Song', download_info, {})
+
+        assert result == "ERROR"
+        mocks['db'].save_download.assert_called_once()
+    
+    def test_failed_line_skipped_while_negative_cached(self, mock_processor):
+        """Testa que linha NOT_FOUND recente é pulada sem buscar no slskd"""
+        processor, mocks = mock_processor
+        mocks['dup'].extract_artist_song.return_value = ("Artist", "Song")
+        mocks['db'].is_downloaded.return_value = False
+        mocks['db'].is_failed_download.return_value = True
+        
+        with patch.object(processor.negative_cache, 'is_negative', return_value=True):
+            with patch.object(processor, '_search_and_download') as mock_search:
+                assert processor._process_single_line("Artist - Album - Song") == False
+                mock_search.assert_not_called()
+        
+        # Cache negativo vencido: tenta de novo e aumenta o prazo
+        with patch.object(processor.negative_cache, 'is_negative', return_value=False):
+            with patch.object(processor.negative_cache, 'record_miss', return_value=7200) as mock_miss:
+                with patch.object(processor, '_search_and_download', return_value="NOT_FOUND") as mock_search:
+                    assert processor._process_single_line("Artist - Album - Song") == False
+                    mock_search.assert_called_once()
+                    mock_miss.assert_called_once_with("Artist - Album - Song", "line")
+
+    def test_error_line_records_negative_cache(self, mock_processor):
+        """Testa que linha com ERROR também espera o cache negativo"""
+        processor, mocks = mock_processor
+        mocks['dup'].extract_artist_song.return_value = ("Artist", "Song")
+        mocks['db'].is_downloaded.return_value = False
+        mocks['db'].is_failed_download.return_value = False
+        
+        with patch.object(processor.negative_cache, 'record_miss', return_value=3600) as mock_miss:
+            with patch.object(processor, '_search_and_download', return_value="ERROR"):
+                assert processor._process_single_line("Artist - Album - Song") == False
+        mock_miss.assert_called_once_with("Artist - Album - Song", "line")
+    
+    def test_pipeline_limits_downloads_per_peer(self, mock_processor):
+        """Testa que o pipeline remove linhas repetidas e respeita o limite por usuário"""
+        processor, mocks = mock_processor
+        processor.max_concurrent_downloads = 3
+        mocks['dup'].extract_artist_song.side_effect = lambda line: tuple(line.split(" - ", 1))
+        mocks['db'].is_downloaded.return_value = False
+        mocks['db'].is_failed_download.return_value = False
+
+        results = {'a': [{'username': 'peer1', 'filename': 'a.flac'}],
+                   'b': [{'username': 'peer1', 'filename': 'b.flac'}]}
+        active = []
+        peak = []
+
+        def initiate(file_line, result):
+            active.append(result['username'])
+            peak.append(active.count('peer1'))
+            time.sleep(0.05)
+            active.remove(result['username'])
+            return "SUCCESS"
+
+        lines = ["Artist - a", "Artist - b", "artist -  a"]
+        with patch.object(processor, '_find_results', side_effect=lambda line, artist, song: ("FOUND", results[song.strip()])), \
+             patch.object(processor, '_get_sorted_results', side_effect=lambda r, *args: r), \
+             patch.object(processor, '_initiate_download', side_effect=initiate) as mock_initiate:
+            assert processor._process_lines(lines) == [True, True, True]
+
+        assert mock_initiate.call_count == 2
+        assert max(peak) == 1
+        assert processor.stats['duplicates_found'] == 1
+
+    def test_process_stream_skips_exact_repeats_in_flight(self, mock_processor):
+        """Testa que linhas repetidas em andamento são processadas uma vez"""
+        processor, _ = mock_processor
+        processor.max_concurrent_downloads = 2
+
+        check = Mock(side_effect=lambda line: time.sleep(0.05) or Finished(line == "A - 1"))
+        finished = []
+        with patch.object(processor, '_check_line', check):
+            count = processor._process_stream(
+                iter(["A - 1", "B - 2", "A - 1"]),
+                on_line=lambda line, success: finished.append((line, success)),
+            )
+
+        assert count == 2
+        assert check.call_count == 2
+        assert sorted(finished) == [("A - 1", True), ("B - 2", False)]
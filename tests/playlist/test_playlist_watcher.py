@@ -0,0 +1,112 @@
+import pytest
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+from src.playlist.playlist_watcher import InotifyBackend, PlaylistWatcher, PollingBackend
+
+class TestPlaylistWatcher:
+    
+    @pytest.fixture
+    def playlist_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield Path(temp_dir)
+    
+    def test_polling_detects_new_and_modified_files(self, playlist_dir):
+        """Testa detecção por mtime/tamanho sem inotify"""
+        existing = playlist_dir / "old.txt"
+        existing.write_text("A - 1\n")
+        backend = PollingBackend(str(playlist_dir), interval=0.01)
+        
+        (playlist_dir / "new.txt").write_text("B - 2\n")
+        existing.write_text("A - 1\nC - 3\n")
+        
+        assert backend.wait(0.01) == {"new.txt", "old.txt"}
+        assert backend.wait(0.01) == set()
+    
+    def test_inotify_detects_new_files(self, playlist_dir):
+        """Testa eventos do inotify (quando disponível no sistema)"""
+        try:
+            backend = InotifyBackend(str(playlist_dir))
+        except (OSError, AttributeError):
+            pytest.skip("inotify indisponível")
+        
+        try:
+            (playlist_dir / "rock.txt").write_text("A - 1\n")
+            assert "rock.txt" in backend.wait(1.0)
+        finally:
+            backend.close()
+    
+    def test_debounce_and_priority(self, playlist_dir):
+        """Testa que arquivos só ficam prontos sem alterações e menores saem primeiro"""
+        watcher = PlaylistWatcher(
+            str(playlist_dir), debounce=0.2,
+            backend=PollingBackend(str(playlist_dir), interval=0.02),
+        )
+        
+        (playlist_dir / "big.txt").write_text("A - 1\n" * 100)
+        (playlist_dir / "small.txt").write_text("B - 2\n")
+        
+        # Ainda dentro do debounce
+        assert watcher.next_ready(timeout=0.1) is None
+        
+        assert watcher.next_ready(timeout=1.0).endswith("small.txt")
+        assert watcher.next_ready(timeout=1.0).endswith("big.txt")
+        assert watcher.next_ready(timeout=0.1) is None
+    
+    def test_own_rewrites_are_ignored(self, playlist_dir):
+        """Testa que arquivos sem alteração desde o processamento não voltam"""
+        playlist = playlist_dir / "rock.txt"
+        playlist.write_text("A - 1\nB - 2\n")
+        watcher = PlaylistWatcher(
+            str(playlist_dir), debounce=0,
+            backend=PollingBackend(str(playlist_dir), interval=0.02),
+        )
+        watcher.enqueue_all()
+        assert watcher.next_ready(timeout=0.1) == str(playlist)
+        
+        # Compactação feita pelo próprio processador
+        playlist.write_text("B - 2\n")
+        watcher.mark_processed(str(playlist))
+        assert watcher.next_ready(timeout=0.1) is None
+        
+        # Alteração externa volta para a fila
+        playlist.write_text("B - 2\nC - 3\n")
+        assert watcher.next_ready(timeout=0.5) == str(playlist)
+    
+    def test_processor_daemon_processes_new_files(self, playlist_dir):
+        """Testa o modo daemon processando arquivos conforme aparecem"""
+        from src.playlist.playlist_processor import PlaylistProcessor
+        
+        with patch.dict('os.environ', {'PLAYLIST_PATH': str(playlist_dir),
+                                       'FILE_PROCESSING_PAUSE_SECONDS': '0'}), \
+             patch('src.playlist.playlist_processor.DatabaseManager'), \
+             patch('src.playlist.playlist_processor.SlskdApiClient'), \
+             patch('src.playlist.playlist_processor.ProcessLock'):
+            processor = PlaylistProcessor()
+        processor.process_lock = Mock(__enter__=Mock(), __exit__=Mock(return_value=None))
+        
+        watcher = PlaylistWatcher(
+            str(playlist_dir), debounce=0.05,
+            backend=PollingBackend(str(playlist_dir), interval=0.02),
+        )
+        stop_event = threading.Event()
+        processed = []
+        
+        def process(file_path):
+            processed.append(Path(file_path).name)
+            if len(processed) == 2:
+                stop_event.set()
+        
+        (playlist_dir / "first.txt").write_text("A - 1\n")
+        with patch.object(processor, 'process_playlist_file', side_effect=process), \
+             patch.object(processor, '_print_final_stats'):
+            thread = threading.Thread(target=processor.watch_playlists, args=(stop_event, watcher))
+            thread.start()
+            time.sleep(0.3)
+            (playlist_dir / "second.txt").write_text("B - 2\n")
+            thread.join(5)
+        
+        assert not thread.is_alive()
+        assert processed == ["first.txt", "second.txt"]
@@ -0,0 +1,66 @@
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.playlist.search_watcher import SearchCompletionWatcher
+
+
+class TestSearchCompletionWatcher:
+
+    @pytest.fixture
+    def api(self):
+        return Mock()
+
+    def test_resolves_shortly_after_completion(self, api):
+        """Testa que o Future é resolvido logo após isComplete"""
+        completed_at = time.time() + 0.3
+
+        def state(search_id):
+            return {"id": search_id, "isComplete": time.time() >= completed_at, "fileCount": 5}
+
+        api.searches.state.side_effect = state
+        watcher = SearchCompletionWatcher(api, min_interval=0.05, max_interval=0.2)
+
+        result = watcher.wait("s1", timeout=5)
+
+        assert result["isComplete"] is True
+        assert time.time() - completed_at < 1
+        api.searches.get_all.assert_not_called()
+
+    def test_backoff_grows_until_max(self, api):
+        """Testa backoff adaptativo entre consultas"""
+        api.searches.state.return_value = {"id": "s1", "isComplete": False}
+        watcher = SearchCompletionWatcher(api, min_interval=0.1, max_interval=0.3)
+        watcher._thread = Mock(is_alive=Mock(return_value=True))
+        watcher.watch("s1", timeout=60)
+
+        intervals = []
+        for _ in range(5):
+            watcher._pending[0].next_poll = 0
+            watcher.poll_once()
+            intervals.append(round(watcher._pending[0].interval, 3))
+
+        assert intervals == [0.15, 0.225, 0.3, 0.3, 0.3]
+
+    def test_shared_snapshot_for_many_searches(self, api):
+        """Testa listagem única compartilhada com muitas buscas pendentes"""
+        api.searches.get_all.return_value = [
+            {"id": f"s{i}", "isComplete": i % 2 == 0} for i in range(4)
+        ]
+        watcher = SearchCompletionWatcher(api, snapshot_threshold=4)
+        watcher._thread = Mock(is_alive=Mock(return_value=True))
+        futures = [watcher.watch(f"s{i}", timeout=60) for i in range(4)]
+
+        watcher.poll_once()
+
+        assert api.searches.get_all.call_count == 1
+        api.searches.state.assert_not_called()
+        assert [f.done() for f in futures] == [True, False, True, False]
+
+    def test_timeout(self, api):
+        """Testa TimeoutError quando a busca não completa"""
+        api.searches.state.return_value = {"id": "s1", "isComplete": False}
+        watcher = SearchCompletionWatcher(api, min_interval=0.01, max_interval=0.02)
+
+        with pytest.raises(TimeoutError):
+            watcher.wait("s1", timeout=0.1)
@@ -0,0 +1,114 @@
+"""
+Testes unitários para o enfileiramento de álbuns em lote.
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from cli import main as cli_main
+from utils.download_history import DownloadHistoryStore
+
+
+class TestAlbumEnqueue:
+    """Testes para enqueue_album_tracks."""
+
+    @pytest.fixture
+    def store(self):
+        """Histórico em diretório temporário"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = DownloadHistoryStore(os.path.join(temp_dir, 'download_history.json'))
+            with patch.object(cli_main, 'get_download_history_store', return_value=store):
+                yield store
+
+    @pytest.fixture
+    def album_info(self):
+        files = [
+            {'filename': f'Music\\Artist\\Album\\{i:02d} - Track.mp3', 'size': 1000 + i}
+            for i in range(1, 5)
+        ]
+        return {'username': 'user1', 'files': files, 'directory': 'Music\\Artist\\Album',
+                'total_size': sum(f['size'] for f in files)}
+
+    def _slskd(self, presence='Online'):
+        slskd = Mock()
+        slskd.users.status.return_value = {'presence': presence}
+        return slskd
+
+    @pytest.mark.unit
+    def test_single_enqueue_and_status_check(self, store, album_info):
+        """Testa um único enqueue e uma única verificação do usuário"""
+        slskd = self._slskd()
+        slskd.transfers.enqueue.return_value = True
+
+        result = cli_main.enqueue_album_tracks(slskd, album_info, 'Artist - Album',
+                                               record_album=True)
+
+        slskd.transfers.enqueue.assert_called_once()
+        username, files = slskd.transfers.enqueue.call_args[0]
+        assert username == 'user1'
+        assert [f['size'] for f in files] == [1001, 1002, 1003, 1004]
+        assert slskd.users.status.call_count == 1
+        slskd.users.browse.assert_not_called()
+
+        assert result['successful'] == 4
+        assert result['album_recorded'] is True
+        # 4 faixas + entrada do álbum
+        assert len(store) == 5
+
+    @pytest.mark.unit
+    def test_batch_failure_reports_per_file(self, store, album_info):
+        """Testa fallback por arquivo quando o lote é recusado"""
+        slskd = self._slskd()
+        slskd.transfers.get_downloads.return_value = {'username': 'user1', 'directories': []}
+        slskd.transfers.enqueue.side_effect = [
+            Exception('batch rejected'), True, Exception('file locked'), True, True,
+        ]
+
+        result = cli_main.enqueue_album_tracks(slskd, album_info, 'Artist - Album')
+
+        assert [r['success'] for r in result['results']] == [True, False, True, True]
+        assert result['results'][1]['error'] == 'file locked'
+        assert result['failed'] == 1
+        assert len(store) == 3
+
+    @pytest.mark.unit
+    def test_partial_batch_not_enqueued_twice(self, store, album_info):
+        """Testa que arquivos aceitos antes do erro do lote não são reenviados"""
+        slskd = self._slskd()
+        files = album_info['files']
+        slskd.transfers.get_downloads.return_value = {
+            'username': 'user1',
+            'directories': [{'directory': 'Music\\Artist\\Album', 'files': [
+                {'filename': files[0]['filename'], 'state': 'Queued, Remotely'},
+                {'filename': files[1]['filename'], 'state': 'Requested'},
+                # Transferência antiga finalizada não conta como na fila
+                {'filename': files[2]['filename'], 'state': 'Completed, Errored'},
+            ]}],
+        }
+        slskd.transfers.enqueue.side_effect = [Exception('timeout'), True, True]
+
+        result = cli_main.enqueue_album_tracks(slskd, album_info, 'Artist - Album')
+
+        slskd.transfers.get_downloads.assert_called_once_with('user1')
+        retried = [call.args[1][0]['filename'] for call in slskd.transfers.enqueue.call_args_list[1:]]
+        assert retried == [files[2]['filename'], files[3]['filename']]
+        assert result['successful'] == 4
+        assert result['failed'] == 0
+
+    @pytest.mark.unit
+    def test_offline_user_skips_enqueue(self, store, album_info):
+        """Testa que usuário offline não gera enqueue"""
+        slskd = self._slskd(presence='Offline')
+
+        result = cli_main.enqueue_album_tracks(slskd, album_info, 'Artist - Album')
+
+        slskd.transfers.enqueue.assert_not_called()
+        assert result['successful'] == 0
+        assert len(store) == 0
@@ -0,0 +1,117 @@
+"""
+Testes unitários para o store indexado do histórico de downloads.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from utils.download_history import DownloadHistoryStore
+
+
+class TestDownloadHistoryStore:
+    """Testes para o DownloadHistoryStore."""
+
+    @pytest.fixture
+    def history_file(self):
+        """Diretório temporário com caminho do histórico"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield os.path.join(temp_dir, 'download_history.json')
+
+    def _entry(self, search):
+        return {'original_search': search, 'filename': f'{search}.flac', 'date': '2024-01-01T00:00:00'}
+
+    @pytest.mark.unit
+    def test_put_and_get(self, history_file):
+        """Testa gravação e leitura pelo hash"""
+        store = DownloadHistoryStore(history_file)
+        store.put('abc', self._entry('Artist - Song'))
+
+        assert store.get('abc')['original_search'] == 'Artist - Song'
+        assert store.contains('abc')
+        assert store.get('missing') is None
+
+    @pytest.mark.unit
+    def test_append_does_not_rewrite_snapshot(self, history_file):
+        """Testa que adições vão para o log, não para o JSON"""
+        store = DownloadHistoryStore(history_file, compact_every=100)
+        store.put('abc', self._entry('Artist - Song'))
+
+        assert not os.path.exists(history_file)
+        assert os.path.getsize(f'{history_file}.log') > 0
+
+    @pytest.mark.unit
+    def test_persistence_between_instances(self, history_file):
+        """Testa que outra instância enxerga snapshot + log"""
+        store = DownloadHistoryStore(history_file)
+        store.put('a', self._entry('A'))
+        store.put('b', self._entry('B'))
+        store.delete('a')
+
+        other = DownloadHistoryStore(history_file)
+        assert other.get('a') is None
+        assert other.get('b')['original_search'] == 'B'
+
+    @pytest.mark.unit
+    def test_sees_appends_from_other_instance(self, history_file):
+        """Testa que instâncias concorrentes aplicam o log incrementalmente"""
+        first = DownloadHistoryStore(history_file)
+        second = DownloadHistoryStore(history_file)
+        assert len(second) == 0
+
+        first.put('a', self._entry('A'))
+        assert second.contains('a')
+
+    @pytest.mark.unit
+    def test_compaction_writes_legacy_json(self, history_file):
+        """Testa que a compactação gera o JSON legado e zera o log"""
+        store = DownloadHistoryStore(history_file, compact_every=3)
+        for key in ('a', 'b', 'c'):
+            store.put(key, self._entry(key.upper()))
+
+        with open(history_file, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+
+        assert set(snapshot) == {'a', 'b', 'c'}
+        assert os.path.getsize(f'{history_file}.log') == 0
+        assert DownloadHistoryStore(history_file).get('c')['original_search'] == 'C'
+
+    @pytest.mark.unit
+    def test_imports_legacy_json(self, history_file):
+        """Testa leitura de um download_history.json existente"""
+        with open(history_file, 'w', encoding='utf-8') as f:
+            json.dump({'legacy': self._entry('Legacy')}, f)
+
+        store = DownloadHistoryStore(history_file)
+        assert store.get('legacy')['original_search'] == 'Legacy'
+
+    @pytest.mark.unit
+    def test_replace_all_and_clear(self, history_file):
+        """Testa importação completa e limpeza"""
+        store = DownloadHistoryStore(history_file)
+        store.put('old', self._entry('Old'))
+        store.replace_all({'new': self._entry('New')})
+
+        assert store.all() == {'new': self._entry('New')}
+        assert DownloadHistoryStore(history_file).get('old') is None
+
+        store.clear()
+        assert len(store) == 0
+        assert not os.path.exists(history_file)
+
+    @pytest.mark.unit
+    def test_ignores_truncated_log_line(self, history_file):
+        """Testa que linha incompleta no final do log é ignorada"""
+        store = DownloadHistoryStore(history_file)
+        store.put('a', self._entry('A'))
+
+        with open(f'{history_file}.log', 'a', encoding='utf-8') as f:
+            f.write('{"op": "put", "key": "b"')
+
+        assert DownloadHistoryStore(history_file).all() == {'a': self._entry('A')}
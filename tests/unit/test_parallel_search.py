@@ -0,0 +1,142 @@
+"""
+Testes unitários para a busca de variações em paralelo do CLI.
+"""
+
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from cli import main as cli_main
+from utils.search_singleflight import SearchSingleFlight
+
+GOOD_FILE = {'filename': 'Artist - Song.mp3', 'size': 8 * 1024 * 1024, 'bitRate': 320}
+
+
+class TestParallelSearch:
+    """Testes para iter_parallel_search_results e smart_mp3_search_parallel."""
+
+    def _slskd(self, responses):
+        """slskd falso: responses mapeia termo -> respostas (ou callable)"""
+        slskd = Mock()
+        slskd.searches.api_url = 'http://slskd:5030/api/v0'
+        terms = {}
+
+        def search_text(query):
+            search_id = f'id-{query}'
+            terms[search_id] = query
+            return {'id': search_id}
+
+        def search_responses(search_id):
+            value = responses.get(terms[search_id], [])
+            return value() if callable(value) else value
+
+        slskd.searches.search_text.side_effect = search_text
+        slskd.searches.search_responses.side_effect = search_responses
+        return slskd
+
+    def _best(self, search_responses, query):
+        """Pontuação falsa: qualquer resposta com arquivos é adequada"""
+        for response in search_responses:
+            if response.get('files'):
+                return response['files'][0], response['username'], 50.0
+        return None, None, 0.0
+
+    def _deleted(self, slskd):
+        return sorted(call.args[0] for call in slskd.searches.delete.call_args_list)
+
+    @pytest.mark.unit
+    def test_first_good_result_cancels_other_variations(self):
+        """Testa que o primeiro resultado bom interrompe e remove as demais buscas"""
+        slskd = self._slskd({
+            'b': [{'username': 'peer', 'files': [GOOD_FILE]}],
+            'c': [{'username': 'slow', 'files': []}],
+        })
+
+        with patch.object(cli_main, 'get_search_flights', return_value=SearchSingleFlight()), \
+             patch.object(cli_main, 'find_best_mp3', side_effect=self._best), \
+             patch.object(cli_main, 'smart_download_with_fallback', return_value=True) as mock_download:
+            assert cli_main.smart_mp3_search_parallel(slskd, 'Artist - Song', ['a', 'b', 'c', 'd'], 3)
+
+        mock_download.assert_called_once()
+        assert mock_download.call_args.args[2] == GOOD_FILE
+        # 'd' nunca começou; as ativas foram interrompidas e removidas
+        assert [call.args[0] for call in slskd.searches.search_text.call_args_list] == ['a', 'b', 'c']
+        assert sorted(call.args[0] for call in slskd.searches.stop.call_args_list) == ['id-a', 'id-b', 'id-c']
+        assert self._deleted(slskd) == ['id-a', 'id-b', 'id-c']
+
+    @pytest.mark.unit
+    def test_failed_download_waits_for_other_variations(self):
+        """Testa que falha no download continua com as outras variações"""
+        slskd = self._slskd({
+            'a': [{'username': 'peer1', 'files': [GOOD_FILE]}],
+            'b': [{'username': 'peer2', 'files': [GOOD_FILE]}],
+        })
+
+        with patch.object(cli_main, 'get_search_flights', return_value=SearchSingleFlight()), \
+             patch.object(cli_main, 'find_best_mp3', side_effect=self._best), \
+             patch.object(cli_main, 'smart_download_with_fallback', side_effect=[False, True]) as mock_download:
+            assert cli_main.smart_mp3_search_parallel(slskd, 'Artist - Song', ['a', 'b'], 2)
+
+        assert [call.args[3] for call in mock_download.call_args_list] == ['peer1', 'peer2']
+        assert self._deleted(slskd) == ['id-a', 'id-b']
+
+    @pytest.mark.unit
+    def test_max_wait_ends_searches_without_results(self):
+        """Testa que buscas sem resposta terminam em max_wait e são removidas"""
+        slskd = self._slskd({})
+
+        started = time.time()
+        with patch.object(cli_main, 'get_search_flights', return_value=SearchSingleFlight()):
+            results = list(cli_main.iter_parallel_search_results(
+                slskd, ['a', 'b', 'c'], 'Artist - Song', 2, 15,
+                max_wait=0.2, check_interval=0.02,
+            ))
+        elapsed = time.time() - started
+
+        assert results == []
+        # Dois lotes (a+b, depois c), cada um limitado por max_wait
+        assert 0.4 <= elapsed < 2
+        assert self._deleted(slskd) == ['id-a', 'id-b', 'id-c']
+        slskd.searches.stop.assert_not_called()
+
+    @pytest.mark.unit
+    def test_single_variation_setting_keeps_serial_search(self):
+        """Testa que PARALLEL_SEARCH_VARIATIONS=1 mantém a busca sequencial"""
+        order = []
+
+        with patch.dict(os.environ, {'PARALLEL_SEARCH_VARIATIONS': '1', 'SEARCH_WAIT_TIME': '1'}), \
+             patch.object(cli_main, 'is_album_search', return_value=False), \
+             patch.object(cli_main, 'is_duplicate_download', return_value=False), \
+             patch.object(cli_main, 'check_existing_download_in_queue', return_value=False), \
+             patch.object(cli_main, 'create_search_variations', return_value=['a', 'b']), \
+             patch.object(cli_main, 'start_search', side_effect=lambda slskd, term: order.append(term) or f'id-{term}'), \
+             patch.object(cli_main, 'wait_for_search_completion', side_effect=lambda *args, **kwargs: order.append('wait') or []), \
+             patch.object(cli_main, 'cleanup_search', side_effect=lambda slskd, search_id: order.append(f'cleanup {search_id}')), \
+             patch.object(cli_main, 'smart_mp3_search_parallel') as mock_parallel:
+            assert cli_main.smart_mp3_search(Mock(), 'Artist - Song') is False
+
+        mock_parallel.assert_not_called()
+        # Uma variação por vez: busca, espera e limpa antes da próxima
+        assert order == ['a', 'wait', 'cleanup id-a', 'b', 'wait', 'cleanup id-b']
+
+    @pytest.mark.unit
+    def test_parallel_setting_uses_parallel_search(self):
+        """Testa que PARALLEL_SEARCH_VARIATIONS>1 usa o modo paralelo"""
+        with patch.dict(os.environ, {'PARALLEL_SEARCH_VARIATIONS': '3'}), \
+             patch.object(cli_main, 'is_album_search', return_value=False), \
+             patch.object(cli_main, 'is_duplicate_download', return_value=False), \
+             patch.object(cli_main, 'check_existing_download_in_queue', return_value=False), \
+             patch.object(cli_main, 'create_search_variations', return_value=['a', 'b']), \
+             patch.object(cli_main, 'start_search') as mock_start, \
+             patch.object(cli_main, 'smart_mp3_search_parallel', return_value=True) as mock_parallel:
+            slskd = Mock()
+            assert cli_main.smart_mp3_search(slskd, 'Artist - Song') is True
+
+        mock_parallel.assert_called_once_with(slskd, 'Artist - Song', ['a', 'b'], 3)
+        mock_start.assert_not_called()
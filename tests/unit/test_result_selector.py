@@ -0,0 +1,118 @@
+"""
+Testes unitários para a seleção top-k dos resultados de busca.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from utils.result_selector import ResponseSelector, TopK
+
+
+class TestTopK:
+    """Testes para o heap limitado."""
+
+    @pytest.mark.unit
+    def test_keeps_k_best_in_order(self):
+        """Testa que apenas os k maiores ficam, em ordem decrescente"""
+        top = TopK(3)
+        for score in [5, 1, 9, 7, 3, 8]:
+            top.push(score, f"item{score}")
+
+        assert top.items() == [(9, "item9"), (8, "item8"), (7, "item7")]
+        assert len(top) == 3
+
+    @pytest.mark.unit
+    def test_first_wins_on_tie(self):
+        """Testa que em empate o primeiro inserido é mantido"""
+        top = TopK(2)
+        for name in ["a", "b", "c"]:
+            top.push(1, name)
+
+        assert [item for _, item in top.items()] == ["a", "b"]
+
+    @pytest.mark.unit
+    def test_dedupe_by_key_keeps_highest(self):
+        """Testa deduplicação por chave mantendo o maior score"""
+        top = TopK(2, key=lambda item: item[0])
+        top.push(5, ("user1", "low"))
+        top.push(7, ("user1", "high"))
+        top.push(6, ("user2", "x"))
+        top.push(1, ("user1", "lower"))
+
+        assert top.items() == [(7, ("user1", "high")), (6, ("user2", "x"))]
+
+    @pytest.mark.unit
+    def test_dedupe_replaces_only_on_replace_key(self):
+        """Testa que repetido com mesmo bitrate e tamanho maior não substitui"""
+        top = TopK(3, key=lambda item: item[0], replace_key=lambda score: score[0])
+        top.push((320, 8000000), ("user1:song.mp3", "first"))
+        top.push((320, 8000004), ("user1:song.mp3", "same bitrate"))
+        top.push((256, 9000000), ("user2:song.mp3", "other"))
+
+        assert [item for _, item in top.items()] == [
+            ("user1:song.mp3", "first"), ("user2:song.mp3", "other")
+        ]
+
+        top.push((1411, 30000000), ("user1:song.mp3", "flac"))
+        assert [item[1] for _, item in top.items()] == ["flac", "other"]
+
+    @pytest.mark.unit
+    def test_memory_stays_bounded(self):
+        """Testa que o heap não cresce com o número de itens"""
+        top = TopK(5, key=lambda item: item % 7)
+        for i in range(10000):
+            top.push(i, i)
+
+        assert len(top) == 5
+        assert len(top._heap) <= 2 * 5 + 16
+
+    @pytest.mark.unit
+    def test_min_score(self):
+        """Testa que itens abaixo do mínimo não entram"""
+        top = TopK(3, min_score=10)
+        top.push(10, "equal")
+        top.push(11, "above")
+
+        assert top.items() == [(11, "above")]
+
+
+class TestResponseSelector:
+    """Testes para a seleção sobre respostas do slskd."""
+
+    def _bonus(self, file_info):
+        return None if not file_info["filename"].endswith(".flac") else file_info.get("bonus", 0)
+
+    @pytest.mark.unit
+    def test_best_and_top_from_one_pass(self):
+        """Testa melhor arquivo e top N na mesma passada"""
+        responses = [
+            {"username": "u1", "files": [
+                {"filename": "Artist\\Album\\01 - Song.flac", "bonus": 10},
+                {"filename": "Artist\\Album\\01 - Song.mp3", "bonus": 50},
+            ]},
+            {"username": "u2", "files": [
+                {"filename": "Other\\Thing.flac", "bonus": 0},
+                {"filename": "Artist - Song.flac", "bonus": 10},
+            ]},
+        ]
+        selector = ResponseSelector("Artist - Song", self._bonus, limit=2)
+        selector.add_responses(responses)
+
+        file_info, username, score = selector.best()
+        assert (username, file_info["filename"]) == ("u2", "Artist - Song.flac")
+        assert [r["username"] for r in selector.results()] == ["u2", "u1"]
+        assert selector.total_files == 4
+        assert selector.eligible_files == 3
+
+    @pytest.mark.unit
+    def test_no_result_above_min_score(self):
+        """Testa retorno vazio quando nada pontua"""
+        selector = ResponseSelector("abc", lambda f: -500)
+        selector.add_responses([{"username": "u1", "files": [{"filename": "abc.flac"}]}])
+
+        assert selector.best() == (None, None, 0)
@@ -0,0 +1,66 @@
+"""
+Testes unitários para a forma canônica dos termos de busca.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from cli import main as cli_main
+from utils.search_query import canonicalize_query
+
+
+class TestSearchQuery:
+    """Testes para canonicalize_query."""
+
+    @pytest.mark.unit
+    def test_equivalent_variations_share_key(self):
+        """Testa caixa, espaços, aspas e ordem dos termos"""
+        variants = [
+            "Artist - Song *.flac",
+            "artist  -  song *.flac",
+            '"Artist - Song" *.flac',
+            "Song Artist *.flac",
+            "*.flac ARTIST song",
+        ]
+        keys = {canonicalize_query(variant) for variant in variants}
+        assert keys == {"*.flac artist song"}
+
+    @pytest.mark.unit
+    def test_exclusions_and_wildcards(self):
+        """Testa exclusões ao final e curingas normalizados"""
+        assert canonicalize_query("Song *.flac -wav -MP3") == "*.flac song -mp3 -wav"
+        assert canonicalize_query("-mp3 song -wav *.flac") == "*.flac song -mp3 -wav"
+        assert canonicalize_query("**arti** *.flac") == "*.flac *arti"
+        # Exclusão não é confundida com termo
+        assert canonicalize_query("song -live") != canonicalize_query("song live")
+
+    @pytest.mark.unit
+    def test_cli_variations_skip_same_canonical(self):
+        """Testa que o CLI não gera duas buscas com a mesma forma canônica"""
+        variations = cli_main.create_search_variations("Pink Floyd - Comfortably Numb")
+        canonical = [canonicalize_query(v) for v in variations]
+        assert len(set(canonical)) == len(canonical)
+        assert "Comfortably Numb *.flac" in variations
+        assert '"Comfortably Numb" *.flac' not in variations
+        assert "Pink Floyd Comfortably Numb *.flac" in variations
+        assert "Comfortably Numb Pink Floyd *.flac" not in variations
+        assert '"Pink Floyd" "Comfortably Numb" *.flac' not in variations
+
+    @pytest.mark.unit
+    def test_inner_apostrophes_kept(self):
+        """Testa que só aspas nas bordas do termo são removidas"""
+        assert canonicalize_query("Don't Stop Me Now *.flac") == "*.flac don't me now stop"
+        assert canonicalize_query('"Don\'t Stop Me Now" *.flac') == "*.flac don't me now stop"
+        assert canonicalize_query("'Rock 'n' Roll' -'live'") == "n rock roll -live"
+        assert canonicalize_query("Guns N’ Roses") == "guns n roses"
+
+    @pytest.mark.unit
+    def test_punctuation_only_query_kept(self):
+        """Testa que buscas só com pontuação não viram chave vazia"""
+        assert canonicalize_query(" - ") == "-"
+        assert canonicalize_query("*") == "*"
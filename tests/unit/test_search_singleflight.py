@@ -0,0 +1,182 @@
+"""
+Testes unitários para a deduplicação de buscas em andamento.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from cli import main as cli_main
+from utils.search_singleflight import SearchSingleFlight
+
+
+class TestSearchSingleFlight:
+    """Testes para SearchSingleFlight e sua integração com o CLI."""
+
+    def _slskd(self, api_url='http://slskd:5030/api/v0'):
+        slskd = Mock()
+        slskd.searches.api_url = api_url
+
+        def search_text(query):
+            time.sleep(0.05)
+            return {'id': f'id-{slskd.searches.search_text.call_count}'}
+
+        slskd.searches.search_text.side_effect = search_text
+        return slskd
+
+    @pytest.mark.unit
+    def test_concurrent_callers_share_one_search(self):
+        """Testa que chamadas concorrentes da mesma busca geram um único search_text"""
+        flights = SearchSingleFlight()
+        slskd = self._slskd()
+        barrier = threading.Barrier(4)
+
+        def acquire(query):
+            barrier.wait()
+            return flights.acquire(slskd, query)
+
+        queries = ['Artist - Song', 'artist -  song', 'ARTIST - SONG ', 'Artist - Song']
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ids = list(executor.map(acquire, queries))
+
+        assert slskd.searches.search_text.call_count == 1
+        assert set(ids) == {'id-1'}
+        assert flights.joined_searches == 3
+
+    @pytest.mark.unit
+    def test_release_only_last_consumer_cleans_up(self):
+        """Testa contagem de referências entre clientes do mesmo servidor"""
+        flights = SearchSingleFlight()
+        bot_client = self._slskd()
+        playlist_client = self._slskd()
+        results = []
+
+        def consumer():
+            search_id = flights.acquire(playlist_client, 'Artist - Song')
+            results.append(flights.release(playlist_client, search_id))
+
+        search_id = flights.acquire(bot_client, 'Artist - Song')
+        thread = threading.Thread(target=consumer)
+        thread.start()
+        thread.join()
+
+        assert results == [False]
+        # Último consumidor libera a busca (outro cliente, mesmo servidor)
+        assert flights.release(playlist_client, search_id) is True
+        assert flights.active_count() == 0
+        playlist_client.searches.search_text.assert_not_called()
+
+    @pytest.mark.unit
+    def test_shared_waits_once(self):
+        """Testa que a espera pelas respostas é feita uma única vez"""
+        flights = SearchSingleFlight()
+        slskd = self._slskd()
+        compute = Mock(side_effect=lambda: time.sleep(0.05) or [{'username': 'u1'}])
+
+        def consume():
+            search_id = flights.acquire(slskd, 'Artist - Song')
+            return flights.shared(slskd, search_id, 'responses', compute)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(lambda _: consume(), range(3)))
+
+        assert compute.call_count == 1
+        assert results == [[{'username': 'u1'}]] * 3
+
+    @pytest.mark.unit
+    def test_stale_search_not_joined(self):
+        """Testa que buscas antigas não recebem novos consumidores"""
+        flights = SearchSingleFlight(max_age=0)
+        slskd = self._slskd()
+
+        first = flights.acquire(slskd, 'Artist - Song')
+        time.sleep(0.01)
+        second = flights.acquire(slskd, 'Artist - Song')
+
+        assert first != second
+        assert flights.release(slskd, first) is True
+        assert flights.release(slskd, second) is True
+
+    @pytest.mark.unit
+    def test_cli_cleanup_deletes_after_last_consumer(self):
+        """Testa que cleanup_search só remove a busca no último consumidor"""
+        flights = SearchSingleFlight()
+        slskd = self._slskd()
+
+        joined = threading.Event()
+        main_released = threading.Event()
+
+        def other_consumer():
+            search_id = cli_main.start_search(slskd, 'Artist - Song')
+            joined.set()
+            main_released.wait(5)
+            cli_main.cancel_search(slskd, search_id)
+
+        with patch.object(cli_main, 'get_search_flights', return_value=flights):
+            search_id = cli_main.start_search(slskd, 'Artist - Song')
+            thread = threading.Thread(target=other_consumer)
+            thread.start()
+            joined.wait(5)
+
+            cli_main.cleanup_search(slskd, search_id)
+            slskd.searches.delete.assert_not_called()
+
+            main_released.set()
+            thread.join()
+
+        slskd.searches.search_text.assert_called_once()
+        slskd.searches.stop.assert_called_once_with(search_id)
+        slskd.searches.delete.assert_called_once_with(search_id)
+
+    @pytest.mark.unit
+    def test_in_use_message_only_when_shared(self, capsys):
+        """Testa que o aviso de busca em uso só aparece se outra thread a usa"""
+        flights = SearchSingleFlight()
+        slskd = self._slskd()
+
+        with patch.object(cli_main, 'get_search_flights', return_value=flights):
+            # Mesma thread segura duas referências (variações equivalentes)
+            first = cli_main.start_search(slskd, 'Artist - Song')
+            second = cli_main.start_search(slskd, 'artist  -  song')
+            cli_main.cancel_search(slskd, first)
+            assert 'ainda em uso' not in capsys.readouterr().out
+
+            joined = threading.Event()
+            done = threading.Event()
+
+            def other_consumer():
+                cli_main.start_search(slskd, 'Artist - Song')
+                joined.set()
+                done.wait(5)
+
+            thread = threading.Thread(target=other_consumer)
+            thread.start()
+            joined.wait(5)
+            cli_main.cancel_search(slskd, second)
+            assert 'ainda em uso' in capsys.readouterr().out
+            done.set()
+            thread.join()
+
+        slskd.searches.delete.assert_not_called()
+
+    @pytest.mark.unit
+    def test_audiobook_options_release_search_on_error(self):
+        """Testa que erro durante a espera não deixa a busca presa no slskd"""
+        flights = SearchSingleFlight()
+        slskd = self._slskd()
+
+        with patch.object(cli_main, 'get_search_flights', return_value=flights), \
+             patch.object(cli_main, 'create_audiobook_search_variations', return_value=['Author Book']), \
+             patch.object(cli_main, 'wait_for_search_completion', side_effect=RuntimeError('timeout')):
+            assert cli_main.list_audiobook_options(slskd, 'Author Book') == []
+
+        assert flights.active_count() == 0
+        slskd.searches.delete.assert_called_once_with('id-1')
@@ -0,0 +1,103 @@
+"""
+Testes unitários para o motor de similaridade das buscas.
+"""
+
+import os
+import random
+import re
+import sys
+from difflib import SequenceMatcher
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from cli import main as cli_main
+from utils.text_similarity import QueryMatcher, normalize_text
+
+ARTISTS = ["Pink Floyd", "Radiohead", "Daft Punk", "Massive Attack", "Björk",
+           "The Beatles", "Led Zeppelin", "Nirvana", "Portishead", "Boards of Canada"]
+SONGS = ["Comfortably Numb", "Karma Police", "One More Time", "Teardrop", "Hyperballad",
+         "Let It Be", "Kashmir", "Lithium", "Glory Box", "Roygbiv", "Wish You Were Here"]
+ALBUMS = ["Greatest Hits", "OK Computer", "Live at Pompeii", "Mezzanine", "Dummy"]
+PATTERNS = [
+    "{root}\\{artist}\\{album}\\{track:02d} - {song}.flac",
+    "{root}\\{artist} - {album} ({year})\\{track:02d}. {artist} - {song}.flac",
+    "{root}\\{album}\\{song}.mp3",
+    "{root}\\{artist}\\{year} - {album} [FLAC 24-96]\\{track:02d} {song} (sample).flac",
+]
+
+
+def _legacy_similarity(search_text, filename):
+    """Cálculo original com difflib (referência)"""
+    a = re.sub(r"[^\w\s]", "", search_text.lower())
+    b = re.sub(r"[^\w\s]", "", filename.lower())
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _legacy_find_best(search_responses, search_text):
+    """find_best_mp3 original: avalia todos os arquivos em ordem"""
+    best = (None, None, 0)
+    for response in search_responses:
+        for file_info in response["files"]:
+            bonus = cli_main.mp3_file_bonus(file_info)
+            if bonus is None:
+                continue
+            score = max(0, _legacy_similarity(search_text, file_info["filename"]) * 100 + bonus)
+            if score > best[2]:
+                best = (file_info, response["username"], score)
+    return best
+
+
+def _corpus(seed, queries=40, users=12, files_per_user=15):
+    """Gera buscas e respostas determinísticas no formato do slskd"""
+    rng = random.Random(seed)
+    for _ in range(queries):
+        artist, song = rng.choice(ARTISTS), rng.choice(SONGS)
+        query = rng.choice([f"{artist} - {song}", f"{artist} {song}", song])
+        responses = []
+        for u in range(users):
+            files = []
+            for _ in range(files_per_user):
+                filename = rng.choice(PATTERNS).format(
+                    root=rng.choice(["@@music", "Music", "D:\\Shares"]),
+                    artist=rng.choice(ARTISTS + [artist] * 3),
+                    song=rng.choice(SONGS + [song] * 2),
+                    album=rng.choice(ALBUMS),
+                    track=rng.randint(1, 14),
+                    year=rng.randint(1970, 2020),
+                )
+                files.append({"filename": filename, "size": rng.randint(400000, 60000000),
+                              "bitRate": rng.choice([0, 128, 192, 256, 320])})
+            responses.append({"username": f"user{u}", "files": files})
+        yield query, responses
+
+
+class TestTextSimilarity:
+    """Testes para QueryMatcher e a seleção do melhor arquivo."""
+
+    @pytest.mark.unit
+    def test_similarity_matches_difflib(self):
+        """Testa que a similaridade exata é a mesma do difflib"""
+        matcher = QueryMatcher("Pink Floyd - Comfortably Numb")
+        for filename in ["Music\\Pink Floyd\\The Wall\\06 - Comfortably Numb.flac", "x", ""]:
+            assert matcher.similarity(filename) == _legacy_similarity(matcher.query, filename)
+            assert cli_main.calculate_similarity(matcher.query, filename) == matcher.similarity(filename)
+
+    @pytest.mark.unit
+    def test_upper_bound_never_below_ratio(self):
+        """Testa que o limite LCS nunca é menor que o ratio do difflib"""
+        for query, responses in _corpus(seed=7, queries=10):
+            matcher = QueryMatcher(query)
+            for response in responses:
+                for file_info in response["files"]:
+                    normalized = normalize_text(file_info["filename"])
+                    assert matcher.upper_bound_normalized(normalized) >= matcher.ratio_normalized(normalized)
+
+    @pytest.mark.unit
+    def test_find_best_mp3_regression_corpus(self):
+        """Testa que o melhor arquivo é o mesmo do cálculo original"""
+        for query, responses in _corpus(seed=42):
+            expected = _legacy_find_best(responses, query)
+            assert cli_main.find_best_mp3(responses, query) == expected
@@ -0,0 +1,82 @@
+"""
+Testes unitários para o cache de presença de usuários.
+"""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+# Adiciona o diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from utils.user_presence import UserPresenceService, get_presence_service
+
+
+class TestUserPresenceService:
+    """Testes para o UserPresenceService."""
+
+    @pytest.mark.unit
+    def test_cached_within_ttl(self):
+        """Testa que o status é consultado uma vez dentro do TTL"""
+        status_fn = Mock(return_value={'presence': 'Online'})
+        service = UserPresenceService(status_fn, online_ttl=60)
+
+        assert service.is_online('user1')
+        assert service.is_online('user1')
+        assert status_fn.call_count == 1
+
+    @pytest.mark.unit
+    def test_negative_cache_expires_sooner(self):
+        """Testa que usuário offline é cacheado com TTL próprio"""
+        status_fn = Mock(return_value={'presence': 'Offline'})
+        service = UserPresenceService(status_fn, online_ttl=60, offline_ttl=0.05)
+
+        assert not service.is_online('user1')
+        assert not service.is_online('user1')
+        assert status_fn.call_count == 1
+
+        time.sleep(0.06)
+        status_fn.return_value = {'presence': 'Away'}
+        assert service.is_online('user1')
+        assert status_fn.call_count == 2
+
+    @pytest.mark.unit
+    def test_error_uses_default(self):
+        """Testa valor padrão quando a consulta falha"""
+        service = UserPresenceService(Mock(side_effect=Exception('timeout')))
+
+        assert service.is_online('user1', default=True)
+        assert not service.is_online('user1')
+
+    @pytest.mark.unit
+    def test_filter_online_concurrent(self):
+        """Testa consultas em paralelo limitadas por max_workers"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def status_fn(username):
+            with lock:
+                active.append(username)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(username)
+            return {'presence': 'Online' if username.startswith('on') else 'Offline'}
+
+        service = UserPresenceService(status_fn, max_workers=3)
+        users = [f'on{i}' for i in range(5)] + [f'off{i}' for i in range(5)] + ['', 'on0']
+
+        assert service.filter_online(users) == {f'on{i}' for i in range(5)}
+        assert 1 < max(peak) <= 3
+
+    @pytest.mark.unit
+    def test_shared_service_per_client(self):
+        """Testa que o mesmo cliente slskd reutiliza o mesmo cache"""
+        client = Mock()
+        assert get_presence_service(client) is get_presence_service(client)
+        assert get_presence_service(client) is not get_presence_service(Mock())